@@ -1,28 +1,44 @@
 # ... (all your existing imports)
 import uvicorn
 from fastapi import FastAPI, HTTPException, Depends, Form, UploadFile, File, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Callable, List, Optional, Literal, Set
 from pathlib import Path
 from rich.console import Console
 import sys
 import shutil
 import base64
+import hmac
 import os
+import logging
 import time
 import json
+import asyncio
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
 from crewai import CrewOutput, TaskOutput
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
 
 
 # Ensure src directory is in the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from peer_discovery import PeerDiscovery
+from peer_heartbeat import PEER_HEARTBEAT_TOKEN, PEER_TOKEN_HEADER
 from src.distributed_router import DistributedRouter
 from ai_crew import AICrewManager
-from cache_manager import cache
+from cache_manager import cache, make_cache_key
+from semantic_cache import semantic_cache
+from single_flight import SingleFlight
+from crew_pool import CrewWorkerPool, PoolSaturated
+from job_queue import JobStore, JobRunner, JobCancelled, TERMINAL_STATES
+# Same module as the router's LLM clients, so the stream set here is the one their tokens are published to
+from src.crew_stream import StreamChannel, streaming_to
+from request_logging import RequestLoggingMiddleware
+from log_pipeline import get_logger
+from metrics import metrics, CONTENT_TYPE_LATEST
 
 
 
@@ -42,62 +58,52 @@ os.environ['CREWAI_DISABLE_TELEMETRY'] = "true"
 
 
 console = Console()
+logger = get_logger("api")
 
 peer_discovery_instance = PeerDiscovery()
 distributed_router = DistributedRouter(peer_discovery_instance)
+# Identical crew requests that arrive while one is running share its result
+crew_flight = SingleFlight()
+# Crew runs execute on a bounded pool; requests beyond its queue are rejected with 503 + Retry-After
+crew_pool = CrewWorkerPool()
+CREW_REQUESTS = metrics.counter("zeroai_crew_requests", "Crew requests answered, by cache outcome", ["cache"])
+CREW_POOL = metrics.gauge("zeroai_crew_pool", "Crew worker pool occupancy", ["state"])
+CREW_POOL.set_function(lambda: {(state,): value for state, value in crew_pool.stats().items()
+                                if state in ("running", "queued")})
+CREW_REJECTIONS = metrics.counter("zeroai_crew_rejections", "Crew requests rejected with 503 because the pool was full")
+# Job progress: truncate step events, poll the store for new events, and comment-ping idle streams
+JOB_STEP_EVENT_MAX_CHARS = 2000
+JOB_EVENTS_POLL_INTERVAL = 0.5
+JOB_EVENTS_KEEPALIVE = 15
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start this worker process's background threads (after gunicorn has forked it) and stop
+    them on shutdown. Models are preloaded on their peers so the first requests do not pay
+    model load time; a job still running at exit is requeued once its lease expires.
+    """
+    distributed_router.start_warmup()
+    job_runner.start()
+    try:
+        yield
+    finally:
+        await run_in_threadpool(job_runner.stop)
+        await run_in_threadpool(distributed_router.stop_warmup)
+        await run_in_threadpool(peer_discovery_instance.stop_discovery_service)
+
 
 app = FastAPI(
     title="CrewAI Endpoint API",
     description="API to expose CrewAI crews as endpoints.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
-# Add a logging middleware to inspect all requests and responses
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    console.print(f"[bold yellow]--- Incoming Request ---[/bold yellow]")
-    console.print(f"[yellow]Path:[/yellow] {request.url.path}")
-    console.print(f"[yellow]Method:[/yellow] {request.method}")
-    console.print(f"[yellow]Headers:[/yellow] {dict(request.headers)}")
-
-    if request.url.path == "/run_crew_ai_json/":
-        try:
-            body_bytes = await request.body()
-            body_decoded = body_bytes.decode("utf-8")
-            console.print(f"[yellow]Body:[/yellow] {body_decoded}")
-
-            async def receive() -> dict:
-                return {"type": "http.request", "body": body_bytes}
-
-            request._receive = receive
-        except Exception as e:
-            console.print(f"[yellow]Body:[/yellow] Error decoding body: {e}", style="dim")
-
-    response = await call_next(request)
-
-    process_time = time.time() - start_time
-    response_body = b""
-    async for chunk in response.body_iterator:
-        response_body += chunk
-
-    try:
-        response_data = json.loads(response_body.decode("utf-8"))
-        console.print(f"[bold green]--- Outgoing Response ---[/bold green]")
-        console.print(f"[green]Status Code:[/green] {response.status_code}")
-        console.print(f"[green]Processing Time:[/green] {process_time:.4f}s")
-        console.print(f"[green]Response Body:[/green] {json.dumps(response_data, indent=2)}")
-        console.print(f"[bold yellow]-------------------------[/bold yellow]")
-        return JSONResponse(content=response_data, status_code=response.status_code)
-    except (json.JSONDecodeError, UnicodeDecodeError):
-        console.print(f"[bold green]--- Outgoing Response ---[/bold green]")
-        console.print(f"[green]Status Code:[/green] {response.status_code}")
-        console.print(f"[green]Processing Time:[/green] {process_time:.4f}s")
-        console.print(f"[green]Response Body:[/green] {response_body.decode('utf-8', errors='ignore')}")
-        console.print(f"[bold yellow]-------------------------[/bold yellow]")
-        return JSONResponse(content=response_body.decode('utf-8', errors='ignore'), status_code=response.status_code,
-                            media_type="text/plain")
+# Access log for every request; bodies pass through unbuffered and are only copied when sampled
+app.add_middleware(RequestLoggingMiddleware)
 
 
 class FileData(BaseModel):
@@ -108,6 +114,20 @@ class FileData(BaseModel):
 
 class CrewRequest(BaseModel):
     inputs: Dict[str, Any]
+    # use = serve a cached result when present, refresh = always run and overwrite the cache,
+    # bypass = run without reading or writing the cache
+    cache_policy: Literal["use", "refresh", "bypass"] = "use"
+
+
+class JobRequest(CrewRequest):
+    output_format: str = "raw"
+
+
+class PeerHeartbeat(BaseModel):
+    name: str
+    ip: Optional[str] = None
+    full: bool = False
+    capabilities: Dict[str, Any] = {}
 
 
 def get_distributed_router():
@@ -172,40 +192,74 @@ def format_crew_output(crew_output: CrewOutput, output_format: str) -> Dict[str,
     }
 
     if output_format == "json" and hasattr(crew_output, 'json_dict') and crew_output.json_dict:
-        console.print("✅ Returning JSON dictionary output.", style="blue")
+        logger.debug("✅ Returning JSON dictionary output.", extra={"style": "blue"})
         response_data["final_result"] = crew_output.json_dict
     elif output_format == "pydantic" and hasattr(crew_output, 'pydantic') and crew_output.pydantic:
-        console.print("✅ Returning Pydantic output as a dictionary.", style="blue")
+        logger.debug("✅ Returning Pydantic output as a dictionary.", extra={"style": "blue"})
         response_data["final_result"] = jsonable_encoder(crew_output.pydantic)
     else:  # Fallback to raw output
-        console.print("✅ Returning raw string output with parsing.", style="blue")
+        logger.debug("✅ Returning raw string output with parsing.", extra={"style": "blue"})
         response_data["final_result"] = response_data["raw_output"]
 
     return response_data
 
 
-def handle_crew_result(crew_result: Any, cache_key: str, output_format: str):
+def handle_crew_result(crew_result: Any, cache_key: Optional[str], output_format: str,
+                       category: Optional[str] = None):
     """
     Standardizes the handling of AI crew results, ensuring a JSON-serializable
-    dictionary is always returned and cached.
+    dictionary is always returned and cached (unless cache_key is None).
     """
     if isinstance(crew_result, CrewOutput):
-        console.print(f"🔄 Converting CrewOutput to dictionary for serialization.", style="yellow")
+        logger.debug("🔄 Converting CrewOutput to dictionary for serialization.", extra={"style": "yellow"})
         response_data = format_crew_output(crew_result, output_format)
-        cache.set(cache_key, "crew_result", response_data)
+        if cache_key is not None:
+            cache.put(cache_key, response_data, category=category)
         return response_data
     elif isinstance(crew_result, dict):
-        console.print(f"✅ Cached data is already a dictionary.", style="blue")
+        logger.debug("✅ Cached data is already a dictionary.", extra={"style": "blue"})
         return crew_result
     else:
         # Fallback for unexpected data types
-        console.print(f"❌ Unexpected data type from cache: {type(crew_result)}", style="red")
+        logger.error("❌ Unexpected data type from cache: %s", type(crew_result), extra={"style": "red"})
         return {"result": str(crew_result)}
 
 
-def process_crew_request(inputs: Dict[str, Any], uploaded_files_paths: List[str], output_format: str):
+def crew_request_error(e: BaseException) -> BaseException:
+    """Map a failed crew request to the exception its caller sees (503 when saturated, else 500)"""
+    if isinstance(e, (JobCancelled, HTTPException)) or not isinstance(e, Exception):
+        return e
+    if isinstance(e, PoolSaturated):
+        CREW_REJECTIONS.inc()
+        logger.warning("⏳ Rejecting crew request, workers saturated: %s", crew_pool.stats(), extra={"style": "yellow"})
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    logger.error("❌ Error during crew execution API: %s", e, extra={"style": "red"})
+    return HTTPException(status_code=500, detail=str(e))
+
+
+def resolved_future(value: Any) -> Future:
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def start_crew_request(inputs: Dict[str, Any], uploaded_files_paths: List[str], output_format: str,
+                       cache_policy: str = "use", step_callback=None,
+                       wait_for_worker: Optional[Callable[[], None]] = None, coalesce: bool = True) -> Future:
     """
-    Handles the core logic for running the AI crew and returns output based on format.
+    Handles the core logic for running the AI crew; returns a Future of the formatted output.
+
+    With cache_policy "use" a cached result for the same request is returned without building
+    a crew; "refresh" always runs the crew and overwrites the cached result; "bypass" runs the
+    crew without touching the cache. The response carries the outcome under "cache".
+
+    Cache lookups run on the calling thread. On a miss the crew is queued on the crew pool (or
+    an identical run in flight is joined) and the Future settles when it finishes, so async
+    endpoints await it without holding a thread. step_callback is attached to the crew (job
+    progress). A full pool rejects the request with 503, unless wait_for_worker is given: the
+    crew then waits for a free slot (job workers), and wait_for_worker is called while waiting
+    and may raise to give up. coalesce=False never shares a run with other callers, for runs
+    that can be cancelled (a cancelled run has no result to share).
     """
     try:
        # from ai_crew import AICrewManager
@@ -224,34 +278,105 @@ def process_crew_request(inputs: Dict[str, Any], uploaded_files_paths: List[str]
                     with open(file_path, 'r') as f:
                         file_contents.append(f.read())
                 except Exception as e:
-                    console.print(f"❌ Error reading file {file_path}: {e}", style="red")
+                    logger.error("❌ Error reading file %s: %s", file_path, e, extra={"style": "red"})
                     file_contents.append(f"Error reading uploaded file: {os.path.basename(file_path)}")
             inputs['file_content'] = "\n\n".join(file_contents)
 
         inputs['files'] = uploaded_files_paths
 
-        console.print(f"✅ Received API Request:", style="green")
-        console.print(f"   Topic: {topic}")
-        console.print(f"   Category: {category}")
-        console.print(f"   AI Provider: {inputs.get('ai_provider')}")
-        console.print(f"   Model Name: {inputs.get('model_name')}")
-        console.print(f"   Uploaded Files: {[os.path.basename(f) for f in uploaded_files_paths]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✅ Received API Request:\n   Topic: %s\n   Category: %s\n   AI Provider: %s\n"
+                        "   Model Name: %s\n   Uploaded Files: %s",
+                        topic, category, inputs.get('ai_provider'), inputs.get('model_name'),
+                        [os.path.basename(f) for f in uploaded_files_paths], extra={"style": "green"})
+
+        # Key on the request as received, before the crew adds its own fields to inputs
+        cache_key = make_cache_key(category, topic, inputs.get('model_name'),
+                                   {**inputs, "output_format": output_format})
+
+        # Paraphrases share a scope key over everything except the topic
+        semantic_scope = make_cache_key(category, None, inputs.get('model_name'),
+                                        {**inputs, "output_format": output_format}) if semantic_cache else None
+
+        if cache_policy == "use":
+            cached = cache.get_entry(cache_key)
+            if isinstance(cached, dict):
+                logger.info("⚡ Serving cached crew result %s", cache_key[:12], extra={"style": "green"})
+                CREW_REQUESTS.inc(cache="hit")
+                return resolved_future({**cached, "cache": {"status": "hit", "key": cache_key}})
+
+            if semantic_cache is not None:
+                match = semantic_cache.lookup(category, semantic_scope, topic)
+                if match:
+                    similar_key, similarity = match
+                    cached = cache.get_entry(similar_key)
+                    if isinstance(cached, dict):
+                        logger.info("⚡ Serving semantically cached crew result %s (similarity %.3f)",
+                                    similar_key[:12], similarity, extra={"style": "green"})
+                        CREW_REQUESTS.inc(cache="semantic_hit")
+                        return resolved_future({**cached, "cache": {"status": "semantic_hit", "key": similar_key,
+                                                                    "similarity": round(similarity, 4)}})
+                    semantic_cache.forget(similar_key)
+
+        def run_crew() -> Dict[str, Any]:
+            inputs.setdefault('category', category)
+            manager = AICrewManager(distributed_router, inputs=inputs, category=category,
+                                    step_callback=step_callback)
+
+            # NOTE: The AICrewManager's execute_crew now returns the full CrewOutput object.
+            crew_result = manager.execute_crew(distributed_router, inputs)
+
+            # We handle the caching and serialization here. execute_crew reports a failed run as an
+            # "Error: ..." output (manager.error is set); it is returned but never cached or indexed
+            cacheable = cache_policy != "bypass" and manager.error is None
+            response_data = handle_crew_result(crew_result, cache_key if cacheable else None,
+                                               output_format, category)
+            if semantic_cache is not None and cacheable and isinstance(crew_result, CrewOutput):
+                semantic_cache.add(category, semantic_scope, topic, cache_key)
+            return response_data
+
+        status = {"use": "miss", "refresh": "refreshed", "bypass": "bypass"}.get(cache_policy, "miss")
+        if wait_for_worker is None:
+            start = lambda: crew_pool.submit(run_crew)
+        else:
+            start = lambda: crew_pool.submit_waiting(run_crew, check=wait_for_worker)
+        if cache_policy == "bypass" or not coalesce:
+            # An explicit bypass asks for its own run, and so does a run that may be cancelled
+            crew_future = start()
+        else:
+            # Only the leader of a coalesced group takes a crew worker; followers share its future
+            crew_future, shared = crew_flight.submit(cache_key, start)
+            if shared:
+                logger.info("🔗 Coalesced with in-flight crew run %s", cache_key[:12], extra={"style": "green"})
+                status = "coalesced"
+    except Exception as e:
+        raise crew_request_error(e)
 
-        manager = AICrewManager(distributed_router, inputs=inputs, category=category)
+    response = Future()
+    # Already underway: a waiter that gives up (a disconnected stream) cannot cancel it for the others
+    response.set_running_or_notify_cancel()
 
-        # NOTE: The AICrewManager's execute_crew now returns the full CrewOutput object.
-        # This is where we call the new method.
-        crew_result = manager.execute_crew(category, topic)
+    def respond(done: Future) -> None:
+        try:
+            response_data = done.result()
+        except BaseException as e:
+            response.set_exception(crew_request_error(e))
+        else:
+            CREW_REQUESTS.inc(cache=status)
+            response.set_result({**response_data, "cache": {"status": status, "key": cache_key}})
 
-        cache_key = f"{category}_{topic}_{inputs.get('context', '')}_{inputs.get('research_focus', '')}_{inputs.get('ai_provider', '')}_{inputs.get('model_name', '')}"
+    crew_future.add_done_callback(respond)
+    return response
 
-        # We handle the caching and serialization here
-        response_data = handle_crew_result(crew_result, cache_key, output_format)
 
-        return response_data
-    except Exception as e:
-        console.print(f"❌ Error during crew execution API: {e}", style="red")
-        raise HTTPException(status_code=500, detail=str(e))
+def process_crew_request(inputs: Dict[str, Any], uploaded_files_paths: List[str], output_format: str,
+                         cache_policy: str = "use", step_callback=None,
+                         wait_for_worker: Optional[Callable[[], None]] = None,
+                         coalesce: bool = True) -> Dict[str, Any]:
+    """start_crew_request for callers that wait on a thread of their own (job workers)"""
+    return start_crew_request(inputs, uploaded_files_paths, output_format, cache_policy,
+                              step_callback=step_callback, wait_for_worker=wait_for_worker,
+                              coalesce=coalesce).result()
 
 
 @app.post("/run_crew_ai_json/")
@@ -263,12 +388,206 @@ async def run_crew_ai_json(
     try:
         inputs = crew_request.inputs
 
-        # Since no files were uploaded in this request, pass an empty list
-        response_data = process_crew_request(inputs, [], output_format)
+        # Since no files were uploaded in this request, pass an empty list. Only the cache lookup takes
+        # a threadpool thread; the crew runs on the bounded crew pool and is awaited on the event loop
+        crew_future = await run_in_threadpool(start_crew_request, inputs, [], output_format,
+                                              crew_request.cache_policy)
+        response_data = await asyncio.wrap_future(crew_future)
 
         return JSONResponse(content=response_data, status_code=200)
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+# Tasks publishing stream results; the event loop only keeps weak references to running tasks
+stream_publishers: Set["asyncio.Task[None]"] = set()
+
+
+def sse_event(event_type: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/run_crew_ai_stream/")
+async def run_crew_ai_stream(crew_request: CrewRequest, request: Request, output_format: str = "raw"):
+    """
+    Run a crew and stream its progress as Server-Sent Events.
+
+    Emits "accepted" at once, then "step" per agent step and "llm_start"/"token"/"llm_end" as
+    the routed Ollama models generate, and finally "result" (the /run_crew_ai_json/ body) or
+    "error". Cached and coalesced requests only receive the result.
+    """
+    if not crew_request.inputs.get("topic"):
+        raise HTTPException(status_code=422, detail="Missing required 'topic' input.")
+    channel = StreamChannel(asyncio.get_running_loop())
+
+    def start_streaming() -> Future:
+        # The crew pool runs the crew in a copy of this context, so its output reaches the channel
+        with streaming_to(channel):
+            return start_crew_request(crew_request.inputs, [], output_format, crew_request.cache_policy,
+                                      step_callback=channel.step)
+
+    async def run_and_publish() -> None:
+        try:
+            crew_future = await run_in_threadpool(start_streaming)
+            channel.publish("result", await asyncio.wrap_future(crew_future))
+        except HTTPException as e:
+            channel.publish("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            channel.publish("error", {"status_code": 500, "detail": f"An unexpected error occurred: {str(e)}"})
+        finally:
+            channel.finish()
+
+    async def event_stream():
+        publisher = asyncio.ensure_future(run_and_publish())
+        stream_publishers.add(publisher)
+        publisher.add_done_callback(stream_publishers.discard)
+        try:
+            yield sse_event("accepted", {"topic": crew_request.inputs.get("topic")})
+            async for event in channel.events(idle_timeout=JOB_EVENTS_KEEPALIVE):
+                if event is None:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(*event)
+        finally:
+            channel.close()
+            # Stop waiting for a result nobody reads; the crew keeps running, so it still reaches the cache
+            publisher.cancel()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+def run_crew_job(job: Dict[str, Any], emit, check_cancelled) -> Dict[str, Any]:
+    """Job handler: run a queued crew request, reporting each agent step as a progress event."""
+    request = job["request"]
+
+    def on_step(step_output: Any) -> None:
+        emit("step", {"output": str(step_output)[:JOB_STEP_EVENT_MAX_CHARS]})
+        # Raising here stops the crew at the step boundary
+        check_cancelled()
+
+    emit("stage", {"stage": "crew"})
+    # Jobs share the crew pool with interactive requests, waiting for a slot rather than being rejected.
+    # A job can be cancelled mid-run, so it never leads or joins a coalesced run of other callers
+    return process_crew_request(request["inputs"], [], request.get("output_format", "raw"),
+                                request.get("cache_policy", "use"), step_callback=on_step,
+                                wait_for_worker=check_cancelled, coalesce=False)
+
+
+job_store = JobStore()
+job_runner = JobRunner(job_store, run_crew_job)
+
+
+def job_to_response(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+        "cancel_requested": job["cancel_requested"],
+        "result": job["result"],
+        "error": job["error"],
+    }
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(job_request: JobRequest):
+    """Queue a crew run and return its id immediately."""
+    if not job_request.inputs.get("topic"):
+        raise HTTPException(status_code=422, detail="Missing required 'topic' input.")
+    job_id = await run_in_threadpool(job_store.submit, {
+        "inputs": job_request.inputs,
+        "output_format": job_request.output_format,
+        "cache_policy": job_request.cache_policy,
+    })
+    job_runner.notify()
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}",
+            "events_url": f"/jobs/{job_id}/events"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await run_in_threadpool(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_response(job)
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events stream of a job's progress; honours Last-Event-ID for resuming."""
+    if await run_in_threadpool(job_store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        last_seq = int(request.headers.get("last-event-id", "0"))
+    except ValueError:
+        last_seq = 0
+
+    async def event_stream():
+        nonlocal last_seq
+        idle_since = time.monotonic()
+        finished = False
+        while not await request.is_disconnected():
+            events = await run_in_threadpool(job_store.events_since, job_id, last_seq)
+            for event in events:
+                last_seq = event["seq"]
+                yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+            if events:
+                idle_since = time.monotonic()
+                continue
+            if finished:
+                break
+            job = await run_in_threadpool(job_store.get, job_id)
+            # One more pass after the job ends picks up its final event
+            finished = job is None or job["status"] in TERMINAL_STATES
+            if not finished:
+                if time.monotonic() - idle_since > JOB_EVENTS_KEEPALIVE:
+                    idle_since = time.monotonic()
+                    yield ": keep-alive\n\n"
+                await asyncio.sleep(JOB_EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a job; a running crew stops at its next agent step."""
+    status = await run_in_threadpool(job_store.cancel, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "status": status, "cancel_requested": True}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics of this worker process (routing, discovery, cache, crews)."""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.post("/peers/heartbeat")
+async def peer_heartbeat(heartbeat: PeerHeartbeat, request: Request):
+    """
+    Receive a capability delta pushed by a peer service.
+
+    Heartbeats steer routing (availability, load, memory), so they are refused unless
+    PEER_HEARTBEAT_TOKEN is configured and the request carries it.
+    """
+    if not PEER_HEARTBEAT_TOKEN:
+        raise HTTPException(status_code=403, detail="Peer heartbeats are disabled: PEER_HEARTBEAT_TOKEN is not set")
+    if not hmac.compare_digest(request.headers.get(PEER_TOKEN_HEADER, ""), PEER_HEARTBEAT_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid peer token")
+    peer_ip = heartbeat.ip or (request.client.host if request.client else None)
+    # Resolving a first-contact sender reads the peers config from disk
+    peer = await run_in_threadpool(peer_discovery_instance.resolve_heartbeat_peer, heartbeat.name, peer_ip)
+    if peer is None:
+        raise HTTPException(status_code=403, detail=f"Peer {heartbeat.name} is not configured")
+    peer_name, peer_ip = peer
+    accepted = peer_discovery_instance.record_heartbeat(peer_name, peer_ip, heartbeat.capabilities,
+                                                        full=heartbeat.full)
+    return {"status": "ok" if accepted else "unknown_peer", "resync": not accepted}
@@ -13,24 +13,21 @@ import threading
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from peer_discovery import PeerDiscovery
+from peer_service_metrics import register_metrics_endpoint, timed_task
+from peer_heartbeat import HeartbeatSender, capabilities_to_metrics
 
 app = Flask(__name__)
+
 peer_discovery = PeerDiscovery()
+heartbeat_sender = HeartbeatSender(peer_discovery._get_my_capabilities)
+register_metrics_endpoint(app, peer_discovery._get_my_capabilities)
 
 @app.route('/capabilities')
 def get_capabilities():
     """Return current node capabilities"""
     # Refresh capabilities
     capabilities = peer_discovery._get_my_capabilities()
-    return jsonify({
-        'cpu_cores': capabilities.cpu_cores,
-        'memory_gb': capabilities.memory_gb,
-        'gpu_memory_gb': capabilities.gpu_memory_gb,
-        'models': capabilities.models,
-        'load_avg': capabilities.load_avg,
-        'available': capabilities.available,
-        'last_seen': capabilities.last_seen
-    })
+    return jsonify(capabilities_to_metrics(capabilities))
 
 @app.route('/health')
 def health_check():
@@ -38,8 +35,12 @@ def health_check():
     return jsonify({'status': 'healthy'})
 
 @app.route('/process_task', methods=['POST'])
+@timed_task
 def process_task():
     """Process AI task from another agent"""
+    return _process_task()
+
+def _process_task():
     try:
         task_data = request.get_json()
         task_type = task_data.get('type')
@@ -101,6 +102,9 @@ def main():
     print("🌐 Starting ZeroAI Peer Service on port 8080...")
     print("📊 Exposing node capabilities at /capabilities")
     print("❤️  Health check available at /health")
+
+    # Push capability deltas to the coordinator when ZEROAI_COORDINATOR_URL is set
+    heartbeat_sender.start()
     
     # Start the service
     app.run(host='0.0.0.0', port=8080, debug=False)
@@ -6,17 +6,8 @@ import subprocess
 import json
 import ollama
 
-# Mapping model names to their approximate system memory requirements in GB
-# (This map needs to be kept up-to-date with your models)
-MODEL_MEMORY_MAP = {
-    "llama3.1:8b": 5.6,
-    "llama3.2:latest": 3.0,
-    "llama3.2:1b": 2.3,
-    "codellama:13b": 8.0,
-    "codellama:7b": 5.0,
-    "gemma2:2b": 3.5,
-    "llava:7b": 5.0,
-}
+# Approximate memory requirements in GB, shared with the router
+from src.model_footprint import DEFAULT_MODEL_FOOTPRINTS as MODEL_MEMORY_MAP
 
 # The host of the local Ollama instance
 OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://ollama:11434")
@@ -18,23 +18,26 @@ from rich.panel import Panel
 # Add the src directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
+try:
+    from learning.event_store import LearningEventStore, LEARNING_DB
+except ImportError:
+    from src.learning.event_store import LearningEventStore, LEARNING_DB
+
 console = Console()
 
 def load_learning_data():
     """Load learning data from files."""
     try:
         metrics_file = Path("knowledge/learning/learning_metrics.json")
-        outcomes_file = Path("knowledge/learning/task_outcomes.json")
 
-        if not metrics_file.exists() or not outcomes_file.exists():
+        if not metrics_file.exists() or not Path(LEARNING_DB).exists():
             console.print("❌ Learning data files not found", style="red")
             return None, None
 
         with open(metrics_file, 'r') as f:
             metrics = json.load(f)
 
-        with open(outcomes_file, 'r') as f:
-            outcomes = json.load(f)
+        outcomes = [outcome for _, outcome in LearningEventStore(LEARNING_DB).since(0)]
 
         return metrics, outcomes
 
@@ -261,12 +264,22 @@ def main():
             try:
                 metrics_file = Path("knowledge/learning/learning_metrics.json")
                 outcomes_file = Path("knowledge/learning/task_outcomes.json")
+                events_db = Path(LEARNING_DB)
 
                 # Backup files first
                 if metrics_file.exists():
                     metrics_file.rename(metrics_file.with_suffix(".json.bak"))
                 if outcomes_file.exists():
                     outcomes_file.rename(outcomes_file.with_suffix(".json.bak"))
+                if events_db.exists():
+                    # API, peer and daemon processes may have the store open: back it up through SQLite
+                    # (WAL contents included) and empty it in place instead of moving the files
+                    store = LearningEventStore(LEARNING_DB)
+                    try:
+                        store.backup(events_db.with_suffix(events_db.suffix + ".bak"))
+                        store.reset()
+                    finally:
+                        store.close()
 
                 # Create new empty files
                 Path("knowledge/learning").mkdir(parents=True, exist_ok=True)
@@ -278,9 +291,6 @@ def main():
                         "tokens": {}
                     }, f)
 
-                with open(outcomes_file, 'w') as f:
-                    json.dump([], f)
-
                 console.print("✅ Learning data has been reset", style="green")
             except Exception as e:
                 console.print(f"❌ Error resetting learning data: {e}", style="red")
@@ -14,9 +14,14 @@ import json as json_lib
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from peer_discovery import PeerDiscovery
+from peer_heartbeat import HeartbeatSender
+from peer_service_metrics import register_metrics_endpoint, timed_task
 
 app = Flask(__name__)
+
 peer_discovery = PeerDiscovery()
+heartbeat_sender = HeartbeatSender(peer_discovery._get_my_capabilities)
+register_metrics_endpoint(app, peer_discovery._get_my_capabilities)
 
 @app.route('/capabilities')
 def get_capabilities():
@@ -37,8 +42,12 @@ def health_check():
     return jsonify({'status': 'healthy'})
 
 @app.route('/process_task', methods=['POST'])
+@timed_task
 def process_task():
     """Process AI task from another agent"""
+    return _process_task()
+
+def _process_task():
     try:
         task_data = request.get_json()
         task_type = task_data.get('type')
@@ -95,4 +104,6 @@ Code:"""
         return jsonify({'success': False, 'error': str(e)})
 
 if __name__ == "__main__":
+    # Push capability deltas to the coordinator when ZEROAI_COORDINATOR_URL is set
+    heartbeat_sender.start()
     app.run(host='0.0.0.0', port=8080, debug=False)
@@ -17,6 +17,8 @@ from src.config import config
 from agents.base_agents import create_researcher, create_writer, create_analyst
 from tasks.base_tasks import create_research_task, create_writing_task, create_analysis_task
 from src.distributed_router import DistributedRouter
+from src.task_classifier import TaskClassifier, TASK_CATEGORIES
+from src.metrics import metrics
 
 # --- Specialized crew imports ---
 from crews.classifier.agents import create_classifier_agent
@@ -50,6 +52,16 @@ except ImportError:
         return True
 
 
+# --- Local pre-classifier in front of the LLM classifier crew, trained from recorded outcomes ---
+task_classifier = TaskClassifier(
+    outcomes=feedback_loop.recent_outcomes if has_learning else None,
+    outcome_count=(lambda: feedback_loop.outcome_count) if has_learning else None,
+)
+
+CREW_SECONDS = metrics.histogram("zeroai_crew_execution_seconds", "Crew kickoff duration by crew, category and outcome",
+                                 ["crew", "category", "outcome"])
+
+
 # --- Needed for CrewOutput token_usage compatibility ---
 class UsageMetrics(BaseModel):
     total_tokens: Optional[int] = 0
@@ -171,6 +183,12 @@ class AICrewManager:
         self.start_time = None
         self.model_used = "unknown"
         self.peer_used = "unknown"
+        # Optional per-step hook (progress reporting, cancellation); raising from it aborts the crew
+        self.step_callback = kwargs.get('step_callback')
+        # Set when execute_crew caught a failure and returned an "Error: ..." output
+        self.error: Optional[str] = None
+        # Exception raised by step_callback, re-raised from execute_crew instead of reported as a failed run
+        self.aborted: Optional[BaseException] = None
 
         logging.info(f"AICrewManager.__init__: self.inputs type={type(self.inputs)}, content={self.inputs}")
         logging.info(f"AICrewManager.__init__: self.router instance stored. Type: {type(self.router)}")
@@ -213,15 +231,21 @@ class AICrewManager:
 
         # Create the crew
         crew = self.create_crew_for_category(self.router, inputs)
+        if self.step_callback is not None:
+            crew.step_callback = self._on_step
 
         # Execute the crew with error handling
         try:
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore", DeprecationWarning)
                 result = crew.kickoff()
+                if self.aborted is not None:
+                    # crewai swallowed the exception raised by the step callback and finished anyway
+                    raise self.aborted
 
                 # Record successful execution
                 end_time = time.time()
+                CREW_SECONDS.observe(end_time - self.start_time, crew="ai_crew", category=category, outcome="success")
 
                 # Extract token usage
                 token_usage = None
@@ -246,12 +270,28 @@ class AICrewManager:
 
                 return result
         except Exception as e:
+            if self.aborted is not None:
+                # Stopped by the caller (e.g. a cancelled job): neither a result nor a failure of the crew
+                CREW_SECONDS.observe(time.time() - self.start_time, crew="ai_crew", category=category,
+                                     outcome="aborted")
+                raise self.aborted
+            CREW_SECONDS.observe(time.time() - self.start_time, crew="ai_crew", category=category, outcome="error")
             console.print(f"❌ Error during crew execution AI : {e}", style="red")
 
             # Record failed execution
             self._record_failure(prompt, category, str(e))
 
-            return CrewOutput(tasks_output=[], raw=f"Error: {e}", token_usage=UsageMetrics())
+            self.error = str(e)
+            # A plain dict validates against both the old (dict) and new (UsageMetrics) CrewOutput.token_usage
+            return CrewOutput(tasks_output=[], raw=f"Error: {e}", token_usage=UsageMetrics().model_dump())
+
+    def _on_step(self, output: Any) -> None:
+        try:
+            self.step_callback(output)
+        except Exception as e:
+            # Remember it: crewai may wrap or swallow exceptions raised inside the agent loop
+            self.aborted = e
+            raise
 
     def _record_failure(self, prompt: str, category: str, error_message: str) -> None:
         """Record a failed task execution."""
@@ -296,17 +336,27 @@ class AICrewManager:
             return create_customer_service_crew(router, inputs)
 
     def _classify_task(self, inputs: Dict[str, Any]) -> Optional[str]:
+        """
+        Classify the task topic, answering from the cache or the local classifier when it is
+        confident and only running the LLM classification crew for ambiguous topics.
+        """
+        category, source = task_classifier.classify(inputs.get('topic', ''),
+                                                    lambda: self._classify_with_crew(inputs))
+        console.print(f"🏷️ Task classified as '{category}' ({source})", style="dim")
+        return category or "general"
+
+    def _classify_with_crew(self, inputs: Dict[str, Any]) -> Optional[str]:
         """
         Helper method to run the classification crew and return the category.
         """
-        logging.info(f"AICrewManager._classify_task: inputs type={type(inputs)}, content={inputs}")
+        logging.info(f"AICrewManager._classify_with_crew: inputs type={type(inputs)}, content={inputs}")
         logging.info(
-            f"AICrewManager._classify_task: router instance check before agent creation. Type: {type(self.router)}")
+            f"AICrewManager._classify_with_crew: router instance check before agent creation. Type: {type(self.router)}")
         if not isinstance(self.router, DistributedRouter):
             console.print(
                 "⚠️ Failed to get optimal LLM for classifier via router: 'self.router' is not a DistributedRouter instance.",
                 style="yellow")
-            return "general"
+            return None
         try:
             # Get preferred models for classifier
             preferred_models = get_model_preferences_for_category("general")
@@ -352,11 +402,13 @@ class AICrewManager:
                     if hasattr(classifier_agent.llm, "base_url"):
                         self.peer_used = classifier_agent.llm.base_url
 
-                    return last_task_output.raw.strip().lower()
-            return "general"
+                    answer = last_task_output.raw.strip().lower()
+                    # Models like to add punctuation or a sentence around the category word
+                    return next((c for c in TASK_CATEGORIES if c in answer), answer)
+            return None
         except Exception as e:
             console.print(f"❌ Error during classification: {e}", style="red")
-            return "general"
+            return None
 
 # Export the function for individual use
 def run_ai_crew_securely(router: DistributedRouter, inputs: Dict[str, Any]) -> CrewOutput:
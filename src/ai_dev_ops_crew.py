@@ -1,5 +1,6 @@
 import os
 import sys
+import logging
 import signal
 import uuid
 import time
@@ -32,9 +33,15 @@ from src.crews.internal.tools.docker_tool import DockerTool
 from src.crews.internal.tools.git_tool import GitTool, FileTool, create_git_tool
 from tool_factory import dynamic_github_tool
 from src.utils.custom_logger_callback import CustomLogger
+from src.log_pipeline import get_logger
+from src.metrics import metrics
 
 # Configure console
 console = Console()
+logger = get_logger("devops")
+
+CREW_SECONDS = metrics.histogram("zeroai_crew_execution_seconds", "Crew kickoff duration by crew, category and outcome",
+                                 ["crew", "category", "outcome"])
 
 # Global flag for graceful shutdown
 shutdown_requested = False
@@ -432,11 +439,15 @@ class AIOpsCrewManager:
                             repo_token = repo_token.get_secret_value()
 
                 # --- Enhanced debugging ---
-                console.print(f"DEBUG: Token key from Company_Details: {repo_token_key}", style="magenta")
-                console.print(f"DEBUG: Using final_repo_url: {final_repo_url}", style="magenta")
-                console.print(f"DEBUG: Retrieved repo_token: {'***' if repo_token else 'None'}", style="magenta")
-                console.print(f"DEBUG: Environment check - {repo_token_key}: {'SET' if os.getenv(repo_token_key) else 'NOT SET'}", style="magenta")
-                console.print(f"DEBUG: Available env vars: {[k for k in os.environ.keys() if 'TOKEN' in k or 'GH_' in k]}", style="magenta")
+                if logger.isEnabledFor(logging.DEBUG):
+                    debug_style = {"style": "magenta"}
+                    logger.debug("DEBUG: Token key from Company_Details: %s", repo_token_key, extra=debug_style)
+                    logger.debug("DEBUG: Using final_repo_url: %s", final_repo_url, extra=debug_style)
+                    logger.debug("DEBUG: Retrieved repo_token: %s", '***' if repo_token else 'None', extra=debug_style)
+                    logger.debug("DEBUG: Environment check - %s: %s", repo_token_key,
+                                 'SET' if os.getenv(repo_token_key) else 'NOT SET', extra=debug_style)
+                    logger.debug("DEBUG: Available env vars: %s",
+                                 [k for k in os.environ.keys() if 'TOKEN' in k or 'GH_' in k], extra=debug_style)
                 # --- End repo logic ---
 
                 task_inputs = {
@@ -479,7 +490,15 @@ class AIOpsCrewManager:
                     console.print("Shutdown requested before crew kickoff. Aborting.", style="yellow")
                     return {"success": False, "error": "Crew kickoff aborted by user"}
                     
-                result = crew.kickoff()
+                kickoff_started = time.time()
+                try:
+                    result = crew.kickoff()
+                except Exception:
+                    CREW_SECONDS.observe(time.time() - kickoff_started, crew="devops", category=self.category,
+                                         outcome="error")
+                    raise
+                CREW_SECONDS.observe(time.time() - kickoff_started, crew="devops", category=self.category,
+                                     outcome="success" if result else "empty")
 
                 custom_logger.save_log()
 
@@ -19,6 +19,11 @@ from datetime import datetime
 # Add the src directory to the Python path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
 
+try:
+    from src.learning.event_store import LearningEventStore, LEARNING_DB
+except ImportError:
+    from learning.event_store import LearningEventStore, LEARNING_DB
+
 # Configure console for rich output
 console = Console()
 
@@ -66,13 +71,9 @@ def setup_arg_parser():
 def load_metrics():
     """Load the learning metrics."""
     try:
-        metrics_file = Path("knowledge/learning/learning_metrics.json")
-        if not metrics_file.exists():
-            console.print(f"❌ Metrics file not found at {metrics_file}", style="red")
-            return None
-
-        with open(metrics_file, 'r') as f:
-            return json.load(f)
+        # Current totals from the event store (learning_metrics.json is a periodic export)
+        feedback_loop.refresh()
+        return feedback_loop.metrics
     except Exception as e:
         console.print(f"❌ Error loading metrics: {e}", style="red")
         return None
@@ -80,21 +81,13 @@ def load_metrics():
 def load_outcomes(days=None):
     """Load the task outcomes, optionally filtered by days."""
     try:
-        outcomes_file = Path("knowledge/learning/task_outcomes.json")
-        if not outcomes_file.exists():
-            console.print(f"❌ Outcomes file not found at {outcomes_file}", style="red")
+        if not Path(LEARNING_DB).exists():
+            console.print(f"❌ Learning event log not found at {LEARNING_DB}", style="red")
             return []
 
-        with open(outcomes_file, 'r') as f:
-            outcomes = json.load(f)
-
         # Filter by days if specified
-        if days is not None:
-            now = time.time()
-            cutoff = now - (days * 24 * 60 * 60)
-            outcomes = [o for o in outcomes if o.get("timestamp", 0) >= cutoff]
-
-        return outcomes
+        cutoff = time.time() - (days * 24 * 60 * 60) if days is not None else None
+        return [outcome for _, outcome in LearningEventStore(LEARNING_DB).since(0, min_ts=cutoff)]
     except Exception as e:
         console.print(f"❌ Error loading outcomes: {e}", style="red")
         return []
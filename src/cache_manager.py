@@ -1,49 +1,312 @@
-"""Simple caching system for ZeroAI responses."""
+"""Response cache for ZeroAI crew and model outputs."""
 
-import json
 import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
 from pathlib import Path
+from threading import Lock
 from typing import Optional, Dict, Any
 
+from rich.console import Console
+
+try:
+    from src.metrics import metrics
+except ImportError:
+    from metrics import metrics
+
+console = Console()
+
+CACHE_DIR = os.getenv('ZEROAI_CACHE_DIR', 'cache')
+# Entries expire after CACHE_TTL seconds; the on-disk store is trimmed (least recently used
+# first) once it holds more than CACHE_MAX_BYTES of serialized responses
+CACHE_TTL = float(os.getenv('ZEROAI_CACHE_TTL', '86400'))
+CACHE_MAX_BYTES = int(os.getenv('ZEROAI_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+# The in-memory front holds the hottest entries, bounded by count and bytes
+CACHE_MEMORY_ITEMS = int(os.getenv('ZEROAI_CACHE_MEMORY_ITEMS', '256'))
+CACHE_MEMORY_MAX_BYTES = int(os.getenv('ZEROAI_CACHE_MEMORY_MAX_BYTES', str(32 * 1024 * 1024)))
+# Eviction trims the store down to this fraction of the limit so it does not run on every write
+EVICTION_TARGET_RATIO = 0.9
+
+CACHE_EVENTS = metrics.counter("zeroai_cache_events", "Response cache lookups and writes by outcome", ["event"])
+CACHE_BYTES = metrics.gauge("zeroai_cache_bytes", "Serialized bytes held by the response cache", ["tier"])
+
+# Inputs that do not change the answer (request bookkeeping, temp file paths, routing hints)
+VOLATILE_INPUT_KEYS = {"task_id", "files", "preferred_models", "cache_policy", "topic", "category"}
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Casefold and collapse whitespace so formatting differences map to the same key"""
+    return " ".join((text or "").split()).casefold()
+
+
+def make_cache_key(category: Optional[str], topic: Optional[str], model: Optional[str] = None,
+                   inputs: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Content-addressed key for a response.
+
+    Args:
+        category: Task category ("auto" is kept as-is, the crew result depends on it)
+        topic: The prompt or topic
+        model: Requested model name, if any
+        inputs: Remaining request inputs; volatile keys are ignored, the rest is hashed canonically
+
+    Returns:
+        A SHA-256 hex digest
+    """
+    relevant = {k: v for k, v in (inputs or {}).items() if k not in VOLATILE_INPUT_KEYS and v not in (None, "")}
+    payload = json.dumps({
+        "category": normalize_text(category),
+        "topic": normalize_text(topic),
+        "model": model or "",
+        "inputs": relevant,
+    }, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 class ResponseCache:
-    """Cache system for AI responses."""
-    
-    def __init__(self, cache_dir: str = "cache"):
+    """
+    Two-level response cache: an in-memory LRU in front of a SQLite store on disk.
+
+    Every entry carries an expiry time; expired entries are dropped on read and purged
+    during eviction. The disk store is bounded by total serialized size and evicts the
+    least recently used entries first. Hit/miss counters are available from ``stats()``
+    and are exported as metrics.
+
+    Worker processes share the disk store: its byte total is kept by triggers in the same
+    database, and a memory hit is only served while the disk row still has the same
+    creation time, so a refresh or delete in one process is seen by all of them.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES,
+                 memory_items: int = CACHE_MEMORY_ITEMS, memory_max_bytes: int = CACHE_MEMORY_MAX_BYTES):
         self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(exist_ok=True)
-        
-    def _get_cache_key(self, prompt: str, model: str) -> str:
-        """Generate cache key from prompt and model."""
-        content = f"{prompt}:{model}"
-        return hashlib.md5(content.encode()).hexdigest()
-    
-    def get(self, prompt: str, model: str) -> Optional[str]:
-        """Get cached response if exists."""
-        cache_key = self._get_cache_key(prompt, model)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
-        if cache_file.exists():
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self.memory_max_bytes = memory_max_bytes
+        self.lock = Lock()
+        # key -> (value, created, expires, size)
+        self.memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self.memory_bytes = 0
+        # Memory hits never touch the disk row; their access times are written back before eviction
+        self.touched: Dict[str, float] = {}
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0}
+
+        self.db = sqlite3.connect(str(self.cache_dir / "responses.db"), check_same_thread=False, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("BEGIN IMMEDIATE")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL,"
+            " category TEXT, model TEXT)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        # Covers the per-hit freshness check without reading the (possibly large) value
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_version ON entries (key, created)")
+        # Total size of all entries, maintained in every writer's transaction
+        self.db.execute("CREATE TABLE IF NOT EXISTS totals (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)")
+        self.db.execute("INSERT OR IGNORE INTO totals (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+        self.db.execute("CREATE TRIGGER IF NOT EXISTS entries_added AFTER INSERT ON entries"
+                        " BEGIN UPDATE totals SET bytes = bytes + NEW.size WHERE id = 0; END")
+        self.db.execute("CREATE TRIGGER IF NOT EXISTS entries_removed AFTER DELETE ON entries"
+                        " BEGIN UPDATE totals SET bytes = bytes - OLD.size WHERE id = 0; END")
+        self.db.commit()
+        self.disk_bytes = self._stored_bytes()
+        CACHE_BYTES.set_function(lambda: {("memory",): self.memory_bytes, ("disk",): self.disk_usage()})
+
+    def _count(self, event: str, amount: int = 1) -> None:
+        self.counters[event] += amount
+        if amount:
+            CACHE_EVENTS.inc(amount, event=event)
+
+    # --- Memory level ----------------------------------------------------
+
+    def _memory_put(self, key: str, value: Any, created: float, expires: float, size: int) -> None:
+        if size > self.memory_max_bytes:
+            return
+        self._memory_drop(key)
+        self.memory[key] = (value, created, expires, size)
+        self.memory_bytes += size
+        while self.memory and (len(self.memory) > self.memory_items or self.memory_bytes > self.memory_max_bytes):
+            _, (_, _, _, dropped_size) = self.memory.popitem(last=False)
+            self.memory_bytes -= dropped_size
+
+    def _memory_drop(self, key: str) -> None:
+        entry = self.memory.pop(key, None)
+        if entry is not None:
+            self.memory_bytes -= entry[3]
+
+    # --- Disk level ------------------------------------------------------
+
+    def _stored_bytes(self) -> int:
+        return self.db.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+
+    def _disk_delete(self, key: str) -> None:
+        self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _flush_touched(self) -> None:
+        if self.touched:
+            self.db.executemany("UPDATE entries SET accessed = ? WHERE key = ? AND accessed < ?",
+                                [(accessed, key, accessed) for key, accessed in self.touched.items()])
+            self.touched.clear()
+
+    def _evict(self, now: float) -> None:
+        self._flush_touched()
+        expired_count = self.db.execute("DELETE FROM entries WHERE expires <= ?", (now,)).rowcount
+        if expired_count > 0:
+            self._count("expired", expired_count)
+
+        # The stored total includes what other worker processes wrote to the same store
+        self.disk_bytes = self._stored_bytes()
+        target = self.max_bytes * EVICTION_TARGET_RATIO
+        if self.disk_bytes <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+            if self.disk_bytes <= target:
+                break
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._memory_drop(key)
+            self.disk_bytes -= size
+            evicted += 1
+        self._count("evictions", evicted)
+
+    # --- Public API ------------------------------------------------------
+
+    def get_entry(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss or when it has expired"""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                value, created, expires, _ = entry
+                if expires > now:
+                    try:
+                        # Another worker may have refreshed or deleted the entry since it was loaded
+                        row = self.db.execute("SELECT created FROM entries INDEXED BY entries_version"
+                                              " WHERE key = ?", (key,)).fetchone()
+                    except sqlite3.Error:
+                        row = None
+                    if row is not None and row[0] == created:
+                        self.memory.move_to_end(key)
+                        self.touched[key] = now
+                        self._count("memory_hits")
+                        return value
+                self._memory_drop(key)
+
+            try:
+                row = self.db.execute("SELECT value, created, expires, size FROM entries WHERE key = ?",
+                                      (key,)).fetchone()
+                if row is None:
+                    self._count("misses")
+                    return None
+                serialized, created, expires, size = row
+                if expires <= now:
+                    self._disk_delete(key)
+                    self.db.commit()
+                    self._count("expired")
+                    self._count("misses")
+                    return None
+                self.db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self.db.commit()
+                value = json.loads(serialized)
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                console.print(f"⚠️ Cache read failed for {key[:12]}: {e}", style="yellow")
+                self._count("misses")
+                return None
+
+            self._memory_put(key, value, created, expires, size)
+            self._count("disk_hits")
+            return value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None, category: Optional[str] = None,
+            model: Optional[str] = None) -> bool:
+        """Store a JSON-serializable ``value`` under ``key``; returns False if it could not be stored"""
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        try:
+            serialized = json.dumps(value, default=str)
+        except (TypeError, ValueError) as e:
+            console.print(f"⚠️ Response is not cacheable: {e}", style="yellow")
+            return False
+        size = len(serialized.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+
+        with self.lock:
             try:
-                with open(cache_file, 'r') as f:
-                    data = json.load(f)
-                    return data.get('response')
-            except:
-                pass
-        return None
-    
-    def set(self, prompt: str, model: str, response: str) -> None:
+                # Take the write lock first, so the total read during eviction cannot go stale
+                self.db.execute("BEGIN IMMEDIATE")
+                self._disk_delete(key)
+                self.db.execute(
+                    "INSERT INTO entries (key, value, size, created, expires, accessed, category, model)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, serialized, size, now, expires, now, category, model),
+                )
+                self._evict(now)
+                self.db.commit()
+            except sqlite3.Error as e:
+                self.db.rollback()
+                console.print(f"⚠️ Cache write failed for {key[:12]}: {e}", style="yellow")
+                return False
+            # Round-trip through JSON so memory hits return the same shape as disk hits
+            self._memory_put(key, json.loads(serialized), now, expires, size)
+            self._count("sets")
+            return True
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self._memory_drop(key)
+            self._disk_delete(key)
+            self.db.commit()
+            self.disk_bytes = self._stored_bytes()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.memory.clear()
+            self.memory_bytes = 0
+            self.touched.clear()
+            self.db.execute("DELETE FROM entries")
+            self.db.commit()
+            self.disk_bytes = self._stored_bytes()
+
+    def disk_usage(self) -> int:
+        """Bytes held by the shared disk store, including other worker processes' entries"""
+        with self.lock:
+            self.disk_bytes = self._stored_bytes()
+            return self.disk_bytes
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            self.disk_bytes = self._stored_bytes()
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "disk_bytes": self.disk_bytes,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+            }
+
+    # --- Prompt/model interface used by the example crews ----------------
+
+    def get(self, prompt: str, model: str) -> Optional[Any]:
+        """Get cached response if exists."""
+        return self.get_entry(make_cache_key(None, prompt, model))
+
+    def set(self, prompt: str, model: str, response: Any) -> None:
         """Cache a response."""
-        cache_key = self._get_cache_key(prompt, model)
-        cache_file = self.cache_dir / f"{cache_key}.json"
-        
-        data = {
-            'prompt': prompt,
-            'model': model,
-            'response': response
-        }
-        
-        with open(cache_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.put(make_cache_key(None, prompt, model), response, model=model)
 
 # Global cache instance
-cache = ResponseCache()
\ No newline at end of file
+cache = ResponseCache()
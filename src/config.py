@@ -48,12 +48,22 @@ class LoggingConfig(BaseModel):
     level: str = Field(default_factory=lambda: ENV.get("LOG_LEVEL"), description="Logging level")
     file: Optional[str] = Field(default="logs/ai_crew.log")
     format: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    json_file: Optional[str] = Field(default="logs/zeroai.jsonl", description="Structured JSON-lines log")
+    modules: Dict[str, str] = Field(default_factory=dict, description="Per-module levels, e.g. {router: DEBUG}")
 
     def __init__(self, **data):
         super().__init__(**data)
         # Override with .env values if present
         if ENV.get("LOG_LEVEL"):
             self.level = ENV["LOG_LEVEL"]
+        if ENV.get("LOG_JSON_FILE") is not None:
+            self.json_file = ENV["LOG_JSON_FILE"] or None
+        if ENV.get("LOG_MODULE_LEVELS"):
+            # LOG_MODULE_LEVELS=router=DEBUG,peer=WARNING
+            for item in ENV["LOG_MODULE_LEVELS"].split(","):
+                name, _, level = item.partition("=")
+                if name.strip() and level.strip():
+                    self.modules[name.strip()] = level.strip().upper()
 
 
 class CloudConfig(BaseModel):
@@ -0,0 +1,116 @@
+# src/crew_pool.py
+
+import contextvars
+import math
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore, Lock
+from typing import Any, Callable, Dict, Optional
+
+# Crews running at once per API process, and how many more may wait for a worker
+CREW_MAX_CONCURRENCY = int(os.getenv('CREW_MAX_CONCURRENCY', '2'))
+CREW_MAX_QUEUE = int(os.getenv('CREW_MAX_QUEUE', '8'))
+# Retry-After (seconds) suggested to rejected clients before any run time has been observed
+CREW_RETRY_AFTER = int(os.getenv('CREW_RETRY_AFTER', '30'))
+CREW_RETRY_AFTER_MAX = 600
+# Weight of the newest run in the average crew duration used for Retry-After
+DURATION_EWMA_ALPHA = 0.2
+# How often a caller waiting for a free slot re-checks whether it should give up
+SLOT_WAIT_POLL = 1.0
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Crew workers are saturated, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CrewWorkerPool:
+    """
+    Bounded thread pool for crew runs.
+
+    At most ``max_workers`` crews run at once and at most ``max_queue`` more wait for a
+    worker; anything beyond that is rejected immediately with PoolSaturated instead of
+    piling up, so callers can answer 503 with a Retry-After estimated from recent runs.
+    """
+
+    def __init__(self, max_workers: int = CREW_MAX_CONCURRENCY, max_queue: int = CREW_MAX_QUEUE):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crew-worker")
+        self.slots = BoundedSemaphore(self.max_workers + self.max_queue)
+        self.lock = Lock()
+        self.pending = 0
+        self.running = 0
+        self.rejected = 0
+        self.average_duration = None
+
+    def retry_after(self) -> int:
+        if self.average_duration is None:
+            return CREW_RETRY_AFTER
+        # Time until the queue ahead of a new request has drained through the workers
+        waves = (self.pending + 1) / self.max_workers
+        return max(1, min(CREW_RETRY_AFTER_MAX, math.ceil(self.average_duration * waves)))
+
+    def _run(self, fn: Callable[..., Any], args, kwargs) -> Any:
+        started = time.monotonic()
+        with self.lock:
+            self.running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.monotonic() - started
+            with self.lock:
+                self.running -= 1
+                self.average_duration = elapsed if self.average_duration is None else \
+                    DURATION_EWMA_ALPHA * elapsed + (1 - DURATION_EWMA_ALPHA) * self.average_duration
+
+    def _release(self, _future: Future) -> None:
+        with self.lock:
+            self.pending -= 1
+        self.slots.release()
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """Queue ``fn`` for a worker, or raise PoolSaturated if the queue is full"""
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise PoolSaturated(self.retry_after())
+        return self._queue(fn, args, kwargs)
+
+    def submit_waiting(self, fn: Callable[..., Any], *args, check: Optional[Callable[[], None]] = None,
+                       **kwargs) -> Future:
+        """
+        Queue ``fn`` for a worker, blocking until a queue slot frees instead of raising
+        PoolSaturated. ``check`` is called while waiting and may raise to give up.
+        """
+        while not self.slots.acquire(timeout=SLOT_WAIT_POLL):
+            if check is not None:
+                check()
+        return self._queue(fn, args, kwargs)
+
+    def _queue(self, fn: Callable[..., Any], args, kwargs) -> Future:
+        with self.lock:
+            self.pending += 1
+        # Run in a copy of the caller's context so per-request state (e.g. the stream channel) follows
+        future = self.executor.submit(contextvars.copy_context().run, self._run, fn, args, kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` on a worker and wait for its result"""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "queued": max(0, self.pending - self.running),
+                "rejected": self.rejected,
+                "average_duration": self.average_duration,
+            }
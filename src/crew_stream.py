@@ -0,0 +1,110 @@
+# src/crew_stream.py
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+from uuid import uuid4
+
+from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+
+try:
+    from src.utils.custom_logger_callback import step_to_dict
+except ImportError:
+    from utils.custom_logger_callback import step_to_dict
+
+_END = object()
+
+
+class StreamChannel:
+    """
+    Thread-to-event-loop bridge for one streaming request.
+
+    The crew runs on a worker thread and publishes step and token events; the request's
+    async generator consumes them from an asyncio queue on the event loop. Once the client
+    disconnects the channel is closed and further events are dropped.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Any]" = asyncio.Queue()
+        self.closed = False
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        if self.closed:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, (event_type, data))
+        except RuntimeError:
+            # Event loop already shut down; nobody is listening any more
+            self.closed = True
+
+    def step(self, output: Any) -> None:
+        """Crew step_callback: forward the agent step"""
+        self.publish("step", step_to_dict(output))
+
+    def finish(self) -> None:
+        if not self.closed:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, _END)
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def events(self, idle_timeout: Optional[float] = None) -> AsyncIterator[Optional[Tuple[str, Dict[str, Any]]]]:
+        """Yield (type, data) until finish(); yields None whenever ``idle_timeout`` passes without an event"""
+        while True:
+            try:
+                item = await asyncio.wait_for(self.queue.get(), idle_timeout)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if item is _END:
+                return
+            yield item
+
+
+# The channel of the request whose crew is running on this thread/context, if it streams
+current_stream: ContextVar[Optional[StreamChannel]] = ContextVar("current_stream", default=None)
+
+
+@contextmanager
+def streaming_to(channel: StreamChannel):
+    """Route token and step events produced in this context to ``channel``"""
+    token = current_stream.set(channel)
+    try:
+        yield channel
+    finally:
+        current_stream.reset(token)
+
+
+# The routed LLM call whose tokens are being produced on this thread/context, if it streams
+current_llm_run: ContextVar[Optional[str]] = ContextVar("current_llm_run", default=None)
+
+
+@contextmanager
+def streaming_llm_call(peer: str, model: str):
+    """
+    Bracket one routed LLM call with llm_start/llm_end events when the calling context streams.
+
+    Clients are pooled and shared between requests, so the stream is looked up per call instead
+    of being held by the client; calls made outside a streaming request cost one ContextVar lookup.
+    """
+    channel = current_stream.get()
+    run_id = uuid4().hex if channel is not None else None
+    token = current_llm_run.set(run_id)
+    if channel is not None:
+        channel.publish("llm_start", {"run_id": run_id, "peer": peer, "model": model})
+    try:
+        yield
+    finally:
+        current_llm_run.reset(token)
+        if channel is not None:
+            channel.publish("llm_end", {"run_id": run_id})
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def publish_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    """Forward a streamed LLM chunk to the calling request's channel (crewai runs this handler inline)"""
+    channel = current_stream.get()
+    if channel is not None and event.chunk:
+        channel.publish("token", {"run_id": current_llm_run.get() or event.call_id, "text": event.chunk})
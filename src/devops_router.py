@@ -6,15 +6,16 @@ import warnings
 import time
 from typing import Optional, List, Tuple
 from rich.console import Console
-from src.distributed_router import DistributedRouter, PeerDiscovery, MODEL_PREFERENCES, KEYWORDS_TO_CATEGORY, \
-    MODEL_MEMORY_MAP
+from src.distributed_router import DistributedRouter, PeerDiscovery, MODEL_PREFERENCES, MODEL_MEMORY_MAP
+from src.prompt_classifier import classify_prompt
+from src.log_pipeline import get_logger
 from langchain_community.llms.ollama import Ollama
 from src.config import config
 from src.config import config
 import json  # Ensure json is imported for better logging
 
 console = Console()
-logger = logging.getLogger(__name__)
+logger = get_logger("devops_router")
 
 
 class DevOpsDistributedRouter(DistributedRouter):
@@ -45,21 +46,8 @@ class DevOpsDistributedRouter(DistributedRouter):
         else:
             console.print(f"No peers found after {max_wait}s, will use local fallback if needed", style="yellow")
 
-    def _get_local_ollama_models(self) -> List[str]:
-        """Fixed method to correctly handle exceptions when loading local models"""
-        try:
-            with open("pulled_models.json", "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            console.print("⚠️ pulled_models.json not found or is invalid. Assuming no local models.", style="yellow")
-            return []
-
     def _determine_category_from_prompt(self, prompt: str) -> Optional[str]:
-        prompt_lower = prompt.lower()
-        for keyword, category in KEYWORDS_TO_CATEGORY.items():
-            if keyword in prompt_lower:
-                return category
-        return None
+        return classify_prompt(prompt, default=None)
 
     def _get_llm_with_fallback(self, prompt: str, category: Optional[str] = None,
                                model_preferences: Optional[List[str]] = None) -> Optional[Ollama]:
@@ -70,22 +58,16 @@ class DevOpsDistributedRouter(DistributedRouter):
             preference_list = model_preferences if model_preferences else MODEL_PREFERENCES.get(category,
                                                                                                 MODEL_PREFERENCES[
                                                                                                     "default"])
-            console.print(
-                f"Attempting distributed routing for category '{category}' with preferences: {preference_list}",
-                style="blue")
-            
+            logger.debug("Attempting distributed routing for category '%s' with preferences: %s",
+                         category, preference_list, extra={"style": "blue"})
+
             # Check if we have any peers before attempting to route
             if not self.peer_discovery.get_peers():
-                console.print("No peers available for routing. Using local fallback model.", style="yellow")
+                logger.warning("No peers available for routing. Using local fallback model.", extra={"style": "yellow"})
                 return self._get_local_llm(self.fallback_model_name)
 
-            # Force a peer discovery cycle to ensure we have the latest peers
-            if hasattr(self.peer_discovery, "_discovery_cycle"):
-                try:
-                    self.peer_discovery._discovery_cycle()
-                    console.print("Ran peer discovery cycle to refresh peer list", style="blue")
-                except Exception as e:
-                    console.print(f"Warning: Failed to refresh peers: {e}", style="yellow")
+            # get_peers() serves the cached snapshot and refreshes it in the background when stale,
+            # so routing never waits on a full discovery cycle here
 
             # --- PARENT METHOD CALL ---
             base_url, peer_name, model_name = None, None, None
@@ -96,41 +78,37 @@ class DevOpsDistributedRouter(DistributedRouter):
                     failed_peers=[],  # Empty list for failed peers
                     model_preference_list=preference_list  # Pass the preference list correctly
                 )
-                console.print(f"Parent method returned: base_url={base_url}, peer_name={peer_name}, model_name={model_name}")
+                logger.debug("Parent method returned: base_url=%s, peer_name=%s, model_name=%s",
+                             base_url, peer_name, model_name)
             except Exception as e:
                 # Log the specific exception from the parent method
-                console.print(f"DEBUG: Call to parent's distributed routing method failed with error: {e}", style="red")
+                logger.error("Call to parent's distributed routing method failed with error: %s", e,
+                             extra={"style": "red"})
                 # Fall back to local model on routing error
                 return self._get_local_llm(self.fallback_model_name)
             # --- END PARENT METHOD CALL ---
 
-            console.print(f"DEBUG: Distributed routing result: base_url={base_url}, model_name={model_name}",
-                          style="blue")
+            logger.debug("Distributed routing result: base_url=%s, model_name=%s", base_url, model_name,
+                         extra={"style": "blue"})
 
             if base_url and model_name:
-                prefixed_model_name = f"ollama/{model_name}"
-                llm_config = {"model": prefixed_model_name, "base_url": base_url,
-                              "temperature": config.model.temperature}
-
-
-                console.print("\n--- DEBUG: Successful Distributed Call ---", style="bold green")
-                console.print(f"  Attempting to create Ollama instance with config:")
-                console.print(f"  {json.dumps(llm_config, indent=2)}")
-                console.print("--- END DEBUG: Successful Distributed Call ---\n", style="bold green")
+                if logger.isEnabledFor(logging.DEBUG):
+                    llm_config = {"model": f"ollama/{model_name}", "base_url": base_url,
+                                  "temperature": config.model.temperature}
+                    logger.debug("Creating Ollama instance for distributed call with config:\n%s",
+                                 json.dumps(llm_config, indent=2), extra={"style": "green"})
 
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore", DeprecationWarning)
-                    return Ollama(**llm_config)
+                return self._create_llm(base_url, model_name, peer_name)
             else:
                 # Trigger fallback if no model_name was returned
-                console.print("⚠️ Distributed router failed to find a model. Falling back to local model...", style="yellow")
+                logger.warning("⚠️ Distributed router failed to find a model. Falling back to local model...",
+                               extra={"style": "yellow"})
                 return self._get_local_llm(self.fallback_model_name)
 
         except Exception as e:
-            # Catch any other, unexpected exceptions.
-            console.print(f"❌ An unexpected error occurred in _get_llm_with_fallback: {e}", style="red")
-            # Fall back to local model on any error
-            console.print("Attempting to use local fallback model...", style="yellow")
+            # Catch any other, unexpected exceptions; fall back to the local model
+            logger.error("❌ An unexpected error occurred in _get_llm_with_fallback: %s. Using local fallback model.",
+                         e, extra={"style": "red"})
             return self._get_local_llm(self.fallback_model_name)
 
     def get_llm_for_task(self, prompt: str) -> Optional[Ollama]:
@@ -154,28 +132,20 @@ class DevOpsDistributedRouter(DistributedRouter):
         return self._get_llm_with_fallback(prompt, category=role_category, model_preferences=model_preferences)
 
     def _get_local_llm(self, model_name: str) -> Optional[Ollama]:
-
-        console.print("\n--- DEBUG: Local Fallback Call ---", style="bold yellow")
-        console.print(f"  Creating Ollama instance with local config:")
-        console.print(f"  {json.dumps(llm_config, indent=2)}")
-        console.print("--- END DEBUG: Local Fallback Call ---\n", style="bold yellow")
-        try:
-            prefixed_model_name = f"ollama/{model_name}"
+        if logger.isEnabledFor(logging.DEBUG):
             llm_config = {
-                "model": prefixed_model_name,
+                "model": f"ollama/{model_name}",
                 "base_url": self.local_ollama_base_url,
                 "temperature": config.model.temperature
             }
-
-
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", DeprecationWarning)
-                console.print(
-                    f"🔗 Using local LLM for '{model_name}' at [bold green]{self.local_ollama_base_url}[/bold green]",
-                    style="blue")
-                return Ollama(**llm_config)
+            logger.debug("Creating Ollama instance for local fallback with config:\n%s",
+                         json.dumps(llm_config, indent=2), extra={"style": "yellow"})
+        try:
+            logger.info("🔗 Using local LLM for '%s' at %s", model_name, self.local_ollama_base_url,
+                        extra={"style": "blue"})
+            return self._create_llm(self.local_ollama_base_url, model_name, "local-node")
         except Exception as e:
-            console.print(f"❌ Failed to load local LLM '{model_name}': {e}", style="red")
+            logger.error("❌ Failed to load local LLM '%s': %s", model_name, e, extra={"style": "red"})
             return None
 
 
@@ -191,10 +161,10 @@ def get_router():
         timeout = 5  # Wait up to 5 seconds for initial peers
         console.print(f"Initializing DevOps router, waiting up to {timeout}s for initial peer discovery...", style="blue")
         
-        # Force a discovery cycle to be sure we have the latest peers
-        if hasattr(peer_discovery_instance, "_discovery_cycle"):
+        # Run (or join) an immediate discovery cycle to be sure we have the latest peers
+        if hasattr(peer_discovery_instance, "refresh"):
             try:
-                peer_discovery_instance._discovery_cycle()
+                peer_discovery_instance.refresh(wait=True)
                 console.print("Forced an immediate peer discovery cycle", style="blue")
             except Exception as e:
                 console.print(f"Warning: Failed to run discovery cycle: {e}", style="yellow")
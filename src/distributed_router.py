@@ -1,6 +1,7 @@
 # /opt/ZeroAI/src/distributed_router.py
 
 import sys
+import logging
 from pathlib import Path
 from typing import Optional, List, Tuple, Dict, Any
 from rich.console import Console
@@ -9,11 +10,20 @@ import time
 import litellm
 import os
 import json
-import warnings
+import random
+from collections import OrderedDict
 from functools import lru_cache
+from threading import Lock
 
 from src.peer_discovery import PeerDiscovery, PeerNode
-from langchain_community.llms.ollama import Ollama
+from src.model_inventory import get_model_inventory
+from src.inflight_tracker import InFlightTracker
+from src.model_warmup import ModelWarmer, ROUTER_WARMUP_ENABLED
+from src.model_footprint import ModelFootprintRegistry, DEFAULT_MODEL_FOOTPRINTS
+from src.prompt_classifier import KEYWORDS_TO_CATEGORY, classify_prompt
+from src.log_pipeline import get_logger, DEBUG_LEVELS, VERBOSE
+from src.metrics import metrics
+from src.routed_llm import RoutedLLM
 from src.config import config
 
 console = Console()
@@ -22,25 +32,33 @@ console = Console()
 ROUTER_DEBUG_LEVEL = int(os.getenv('ROUTER_DEBUG_LEVEL', '3'))
 ENABLE_ROUTER_LOGGING = os.getenv('ENABLE_ROUTER_LOGGING', 'true').lower() == 'true'
 
-def log_router(message: str, level: int = 3, style: str = None):
-    """Log router messages based on debug level"""
+router_logger = get_logger("router", DEBUG_LEVELS.get(min(ROUTER_DEBUG_LEVEL, 5), logging.CRITICAL))
+
+def log_router(message: str, level: int = 3, style: str = None, *args):
+    """Log router messages based on debug level; ``args`` are %-formatted only if the message is emitted"""
     if ENABLE_ROUTER_LOGGING and level <= ROUTER_DEBUG_LEVEL:
-        if style:
-            console.print(message, style=style)
-        else:
-            console.print(message)
-
-# Mapping model names to their approximate system memory requirements in GB
-MODEL_MEMORY_MAP = {
-    "llama3.1:8b": 5.6,
-    "llama3.2:latest": 3.0,
-    "llama3.2:1b": 2.3,
-    "mistral-nemo:latest":16,
-    "codellama:13b": 8.0,
-    "codellama:7b": 5.0,
-    "gemma2:2b": 3.5,
-    "llava:7b": 5.0,
-}
+        log_level = DEBUG_LEVELS.get(level, VERBOSE)
+        if router_logger.isEnabledFor(log_level):
+            router_logger.log(log_level, message, *args, extra={"style": style})
+
+# Routing mode: "best" always picks the top-scored candidate, "least_outstanding" and "p2c"
+# (power of two choices) spread requests using in-flight counts and observed latency
+ROUTER_BALANCING_MODE = os.getenv('ROUTER_BALANCING_MODE', 'best').lower()
+# Pooled LLM clients unused for this many seconds are dropped; the pool never holds more than LLM_POOL_MAX_SIZE
+LLM_POOL_IDLE_TTL = float(os.getenv('LLM_POOL_IDLE_TTL', '600'))
+LLM_POOL_MAX_SIZE = int(os.getenv('LLM_POOL_MAX_SIZE', '64'))
+# Score bonus for a peer that already has the model loaded (avoids paying Ollama's model load time)
+RESIDENT_MODEL_BONUS = 200
+
+ROUTE_SECONDS = metrics.histogram("zeroai_router_route_seconds", "Time to choose a peer and model for a request",
+                                  ["outcome"])
+ROUTES = metrics.counter("zeroai_router_routes", "Requests routed, by peer and model", ["peer", "model"])
+ROUTE_FAILURES = metrics.counter("zeroai_router_failures", "Requests for which no peer/model could be found")
+ADMISSION_OVERRIDES = metrics.counter("zeroai_router_admission_overrides",
+                                      "Requests routed to a peer without free memory because every candidate was full")
+
+# Seed memory requirements in GB; real footprints are learned by ModelFootprintRegistry
+MODEL_MEMORY_MAP = DEFAULT_MODEL_FOOTPRINTS
 
 # --- Model preference lists based on agent roles ---
 MODEL_PREFERENCES = {
@@ -55,66 +73,273 @@ MODEL_PREFERENCES = {
     "default": ["mistral-nemo:latest", "llama3.2:latest", "llama3.1:8b", "gemma2:2b", "llava:7b", "llama3.2:1b"]
 }
 
-KEYWORDS_TO_CATEGORY = {
-    "coding": "developer",
-    "php": "developer",
-    "python": "developer",
-    "javascript": "developer",
-    "html": "developer",
-    "css": "developer",
-    "sql": "developer",
-    "fix": "developer",
-    "bug": "developer",
-    "issue": "developer",
-    "research": "research",
-    "analyze": "research",
-    "documentation": "documentation",
-    "write": "documentation",
-    "orchestrator": "devops_orchestrator",
-    "maintenance": "general",
-    "health": "general",
-    "project health": "general",
-    "dependencies": "general",
-    "test suites": "general",
-    "support": "tech_support",
-    "customer": "customer_service",
-    "greeting": "customer_service"
-}
-
 peer_discovery_instance = PeerDiscovery.get_instance()
 
 
+def score_peer(peer: PeerNode) -> float:
+    """Static routing score of a peer: GPU first, then memory, then spare CPU"""
+    gpu_score = 1000 if peer.capabilities.gpu_available else 0
+    memory_score = peer.capabilities.gpu_memory * 10 + peer.capabilities.memory
+    load_score = max(0, 100 - peer.capabilities.load_avg)
+    return gpu_score + memory_score + load_score
+
+
+class ModelPeerIndex:
+    """
+    Inverted index of model -> peers that report the model and could hold it at all.
+
+    Built once per discovery snapshot (and whenever a footprint is learned); each entry list is pre-sorted by peer score so a
+    routing decision only has to take the first non-failed peer per preferred model.
+    """
+
+    def __init__(self, key: Any = None, entries: Optional[Dict[str, List[Tuple[float, PeerNode]]]] = None):
+        self.key = key
+        self.entries = entries or {}
+
+    @classmethod
+    def build(cls, key: Any, peers: List[PeerNode], local_models: List[str],
+              footprints: ModelFootprintRegistry) -> "ModelPeerIndex":
+        entries: Dict[str, List[Tuple[float, PeerNode]]] = {}
+        for peer in peers:
+            available_models = local_models if peer.name == "local-node" else peer.capabilities.models
+            if not available_models:
+                log_router("      - 🚫 Skipping peer %s: No models reported as available.", 4, "red", peer.name)
+                continue
+
+            peer_memory = peer.capabilities.gpu_memory if peer.capabilities.gpu_available else peer.capabilities.memory
+            peer_score = score_peer(peer)
+            for model in set(available_models):
+                required_memory = footprints.required_gb(model)
+                if required_memory is None:
+                    # Learn the size in the background; the index is rebuilt once it is known
+                    footprints.schedule_lookup(f"http://{peer.ip}:11434", model)
+                    log_router("      - ⚠️ Skipping model %s: memory requirements not learned yet.", 5, "yellow", model)
+                    continue
+                if required_memory > peer_memory:
+                    log_router("      - 🚫 Skipping model %s on peer %s: insufficient memory (%.1f GiB required, %s GiB available).", 5,
+                               None, model, peer.name, required_memory, peer_memory)
+                    continue
+                entries.setdefault(model, []).append((peer_score, peer))
+
+        for candidates in entries.values():
+            candidates.sort(key=lambda entry: entry[0], reverse=True)
+        return cls(key, entries)
+
+    def candidates(self, model: str) -> List[Tuple[float, PeerNode]]:
+        return self.entries.get(model, [])
+
+
+class LLMClientPool:
+    """
+    Thread-safe cache of LLM clients keyed by (base_url, model, temperature).
+
+    Agents that are routed to the same peer and model share one client instead of each
+    building their own. Clients idle for longer than ``idle_ttl`` are evicted, and the
+    least recently used client is dropped when the pool is full.
+    """
+
+    def __init__(self, factory, idle_ttl: float = LLM_POOL_IDLE_TTL, max_size: int = LLM_POOL_MAX_SIZE):
+        self.factory = factory
+        self.idle_ttl = idle_ttl
+        self.max_size = max(1, max_size)
+        self.lock = Lock()
+        self.clients: "OrderedDict[Tuple[str, str, float], List[Any]]" = OrderedDict()
+        self.last_sweep = time.monotonic()
+
+    def _sweep(self, now: float) -> None:
+        expired = [key for key, (_, last_used) in self.clients.items() if now - last_used > self.idle_ttl]
+        for key in expired:
+            del self.clients[key]
+        if expired:
+            log_router("♻️ Evicted %d idle LLM clients", 5, "dim", len(expired))
+        self.last_sweep = now
+
+    def get(self, base_url: str, model_name: str, temperature: float, peer_name: str):
+        key = (base_url, model_name, temperature)
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_sweep > min(self.idle_ttl, 60):
+                self._sweep(now)
+            entry = self.clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self.clients.move_to_end(key)
+                return entry[0]
+
+        # Build outside the lock; if another thread won the race, keep its client
+        client = self.factory(base_url, model_name, temperature, peer_name)
+        with self.lock:
+            entry = self.clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                return entry[0]
+            self.clients[key] = [client, now]
+            while len(self.clients) > self.max_size:
+                self.clients.popitem(last=False)
+            return client
+
+    def clear(self) -> None:
+        with self.lock:
+            self.clients.clear()
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+
 class DistributedRouter:
     """Manages routing logic based on network state and model requirements."""
 
     def __init__(self, peer_discovery_instance):
         self.peer_discovery = peer_discovery_instance
         self.peer_discovery.start_discovery_service()
+        self.model_inventory = get_model_inventory()
+        self.model_index = ModelPeerIndex()
+        self.model_index_lock = Lock()
+        self.inflight = InFlightTracker()
+        self.footprints = ModelFootprintRegistry(self.inflight)
+        self.llm_pool = LLMClientPool(self._build_llm)
+        self.warmer: Optional[ModelWarmer] = None
+        if ROUTER_WARMUP_ENABLED:
+            self.warmer = ModelWarmer(self, MODEL_PREFERENCES, self.footprints)
+        if hasattr(self.peer_discovery, "add_snapshot_listener"):
+            self.peer_discovery.add_snapshot_listener(self._on_peers_changed)
+
+    def start_warmup(self):
+        """Preload preferred models and keep routed models resident on their peers"""
+        if self.warmer is not None:
+            self.warmer.start()
+
+    def stop_warmup(self):
+        if self.warmer is not None:
+            self.warmer.stop()
+
+    def _on_peers_changed(self, peers: Dict[str, PeerNode]) -> None:
+        """Discovery listener: re-read which models the peers have loaded, then warm new peers"""
+        self.footprints.schedule_residency_refresh(peers.values())
+        if self.warmer is not None:
+            self.warmer.on_peers_changed(peers)
+
+    def _is_resident(self, peer_name: str, model: str) -> bool:
+        return self.footprints.is_resident(peer_name, model)
+
+    def _admits(self, peer: PeerNode, model: str) -> bool:
+        admitted, required, available = self.footprints.can_admit(peer, model)
+        if not admitted:
+            log_router("   🚫 %s cannot hold %s now (%.1f GiB needed, %.1f GiB free)", 5, "yellow",
+                       peer.name, model, required, available)
+        return admitted
+
+    def _get_model_index(self) -> ModelPeerIndex:
+        """Return the model -> peer index, rebuilding it only when discovery published a new snapshot"""
+        snapshot_version = getattr(self.peer_discovery, "snapshot_version", None)
+        all_peers = self.peer_discovery.get_peers()
+        local_ollama_models = self._get_local_ollama_models()
+        key = (snapshot_version, self.model_inventory.version, self.footprints.version)
+
+        index = self.model_index
+        if snapshot_version is not None and index.key == key:
+            return index
+
+        with self.model_index_lock:
+            if self.model_index.key != key or snapshot_version is None:
+                log_router("🗂️ Rebuilding model index for %d peers", 4, "blue", len(all_peers))
+                self.model_index = ModelPeerIndex.build(key, all_peers, local_ollama_models, self.footprints)
+            return self.model_index
 
     def _get_local_ollama_models(self) -> List[str]:
-        try:
-            with open("pulled_models.json", "r") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            log_router("⚠️ pulled_models.json not found or is invalid. Assuming no local models.", 2, "yellow")
-            return []
-
-    def get_local_llm(self, model_name: str, base_url: str = None) -> Optional[Ollama]:
+        """Local models from the in-memory inventory (pulled_models.json + live /api/tags)"""
+        return self.model_inventory.get_models()
+
+    def _build_llm(self, base_url: str, model_name: str, temperature: float, peer_name: str) -> RoutedLLM:
+        """Build a crewai LLM whose calls are counted against the peer's in-flight load and streamed to SSE clients"""
+        return RoutedLLM.build(self.inflight, peer_name, model_name, base_url, temperature)
+
+    def _create_llm(self, base_url: str, model_name: str, peer_name: str) -> RoutedLLM:
+        """Return a pooled client for this peer/model at the configured temperature"""
+        return self.llm_pool.get(base_url, model_name, config.model.temperature, peer_name)
+
+    def get_local_llm(self, model_name: str, base_url: str = None) -> Optional[RoutedLLM]:
         if model_name in self._get_local_ollama_models():
             if base_url is None:
                 base_url = os.getenv("OLLAMA_HOST", "http://ollama:11434")
-            prefixed_model_name = f"ollama/{model_name}"
-            llm_config = {
-                "model": prefixed_model_name,
-                "base_url": base_url,
-                "temperature": config.model.temperature
-            }
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", DeprecationWarning)
-                log_router(f"🔗 Using local LLM for '{model_name}' at {base_url}", 4, "blue")
-                return Ollama(**llm_config)
+            log_router("🔗 Using local LLM for '%s' at %s", 4, "blue", model_name, base_url)
+            return self._create_llm(base_url, model_name, "local-node")
         return None
 
+    def _select_best(self, index: ModelPeerIndex, model_preference_list: List[str],
+                     failed: set, admission: bool = True) -> Optional[Tuple[PeerNode, str]]:
+        """Pick the single top-scored peer/model pair, preferring peers that already have the model loaded"""
+        best = None
+        preference_count = len(model_preference_list)
+        for position, model in enumerate(model_preference_list):
+            for peer_score, peer in index.candidates(model):
+                if peer.name in failed:
+                    log_router("   🚫 Skipping failed peer: %s", 5, "yellow", peer.name)
+                    continue
+                base_score = peer_score + preference_count - position
+                # Entries are sorted by peer score, so nothing further down can win even with the bonus
+                if best is not None and base_score + RESIDENT_MODEL_BONUS <= best[0]:
+                    break
+                if admission and not self._admits(peer, model):
+                    continue
+                score = base_score + (RESIDENT_MODEL_BONUS if self._is_resident(peer.name, model) else 0)
+                if best is None or score > best[0]:
+                    best = (score, peer, model)
+        return (best[1], best[2]) if best else None
+
+    def _select_balanced(self, index: ModelPeerIndex, model_preference_list: List[str],
+                         failed: set, admission: bool = True) -> Optional[Tuple[PeerNode, str]]:
+        """
+        Spread requests across peers: every peer competes with its most preferred model, and the
+        cost of a peer is its outstanding load (plus observed latency) divided by its static score.
+        """
+        candidates: Dict[str, Tuple[float, PeerNode, str]] = {}
+        preference_count = len(model_preference_list)
+        for position, model in enumerate(model_preference_list):
+            for peer_score, peer in index.candidates(model):
+                if peer.name in failed or peer.name in candidates:
+                    continue
+                if admission and not self._admits(peer, model):
+                    continue
+                score = peer_score + preference_count - position
+                if self._is_resident(peer.name, model):
+                    score += RESIDENT_MODEL_BONUS
+                candidates[peer.name] = (score, peer, model)
+        if not candidates:
+            return None
+
+        known_latencies = [latency for _, peer, model in candidates.values()
+                           if (latency := self.inflight.latency_estimate(peer.name, model)) is not None]
+        default_latency = sum(known_latencies) / len(known_latencies) if known_latencies else 1.0
+        top_score = max(score for score, _, _ in candidates.values()) or 1.0
+
+        def cost(candidate: Tuple[float, PeerNode, str]) -> float:
+            score, peer, model = candidate
+            latency = self.inflight.latency_estimate(peer.name, model) or default_latency
+            weight = max(score, 1.0) / top_score
+            return (self.inflight.load(peer.name) + 1) * latency / weight
+
+        pool = list(candidates.values())
+        if ROUTER_BALANCING_MODE == "p2c" and len(pool) > 2:
+            pool = random.sample(pool, 2)
+        _, peer, model = min(pool, key=lambda c: (cost(c), -c[0]))
+        return peer, model
+
+    def choose_peer_and_model(self, model_preference_list: List[str],
+                              failed_peers: Optional[List[str]] = None) -> Optional[Tuple[PeerNode, str]]:
+        """Pick a peer/model pair for the preference list without recording it as a routed request"""
+        index = self._get_model_index()
+        failed = set(failed_peers or [])
+        select = self._select_balanced if ROUTER_BALANCING_MODE in ("least_outstanding", "p2c") else self._select_best
+        choice = select(index, model_preference_list, failed)
+        if choice is None:
+            # Every candidate is full right now; let Ollama evict idle models rather than fail the request
+            choice = select(index, model_preference_list, failed, admission=False)
+            if choice:
+                ADMISSION_OVERRIDES.inc()
+                log_router(f"⚠️ No peer has free memory for {model_preference_list}; using {choice[0].name} anyway", 2, "yellow")
+        return choice
+
     def get_optimal_endpoint_and_model(self, prompt: str, failed_peers: Optional[List[str]] = None,
                                        model_preference_list: Optional[List[str]] = None) -> Tuple[
         Optional[str], Optional[str], Optional[str]]:
@@ -122,94 +347,40 @@ class DistributedRouter:
             failed_peers = []
 
         if model_preference_list is None:
-            prompt_lower = prompt.lower()
-            category = next((cat for key, cat in KEYWORDS_TO_CATEGORY.items() if key in prompt_lower), "default")
+            category = classify_prompt(prompt)
             model_preference_list = MODEL_PREFERENCES.get(category, MODEL_PREFERENCES["default"])
 
-        all_peers = self.peer_discovery.get_peers()
-        all_candidates = []
-        local_ollama_models = self._get_local_ollama_models()
-        
-        log_router(f"🔎 Analyzing peers for task with model preference: {model_preference_list}", 4, "blue")
-
-        for peer in all_peers:
-            if peer.name in failed_peers:
-                log_router(f"   🚫 Skipping failed peer: {peer.name}", 4, "yellow")
-                continue
+        log_router("🔎 Analyzing peers for task with model preference: %s", 4, "blue", model_preference_list)
 
-            available_models = local_ollama_models if peer.name == "local-node" else peer.capabilities.models
-            log_router(f"   Peer {peer.name} reports available models: {available_models}", 5)
-
-            if not available_models:
-                log_router(f"      - 🚫 Skipping peer {peer.name}: No models reported as available.", 4, "red")
-                continue
+        started = time.perf_counter()
+        choice = self.choose_peer_and_model(model_preference_list, failed_peers)
 
-            for model in model_preference_list:
-                if model in available_models:
-                    required_memory = MODEL_MEMORY_MAP.get(model)
-                    if required_memory is None:
-                        log_router(f"      - ⚠️ Skipping model {model}: memory requirements unknown.", 4, "yellow")
-                        continue
-
-                    peer_memory = peer.capabilities.gpu_memory if peer.capabilities.gpu_available else peer.capabilities.memory
-                    if required_memory <= peer_memory:
-                        all_candidates.append({
-                            "peer": peer,
-                            "model": model
-                        })
-                        log_router(f"      - ✅ Candidate found: Model={model} on Peer={peer.name}", 5)
-                    else:
-                        log_router(f"      - 🚫 Skipping model {model} on peer {peer.name}: insufficient memory ({required_memory} GiB required, {peer_memory} GiB available).", 5)
-                else:
-                    log_router(f"      - 🚫 Model {model} not available on peer {peer.name}.", 5)
-
-        def get_score(candidate):
-            peer = candidate['peer']
-            gpu_score = 1000 if peer.capabilities.gpu_available else 0
-            memory_score = peer.capabilities.gpu_memory * 10 + peer.capabilities.memory
-            load_score = max(0, 100 - peer.capabilities.load_avg)
-            model_index_score = len(model_preference_list) - model_preference_list.index(candidate['model'])
-            return (gpu_score + memory_score + load_score + model_index_score)
-
-        all_candidates.sort(key=get_score, reverse=True)
-
-        if all_candidates:
-            best_candidate = all_candidates[0]
-            peer = best_candidate['peer']
-            model = best_candidate['model']
-            log_router(f"✅ Optimal Endpoint Selected: Peer={peer.name}, Model={model}", 3, "green")
+        if choice:
+            peer, model = choice
+            self.inflight.record_route(peer.name, model)
+            if self.warmer is not None:
+                self.warmer.record_route(peer.name, model)
+            ROUTE_SECONDS.observe(time.perf_counter() - started, outcome="routed")
+            ROUTES.inc(peer=peer.name, model=model)
+            log_router("✅ Optimal Endpoint Selected: Peer=%s, Model=%s", 3, "green", peer.name, model)
             return f"http://{peer.ip}:11434", peer.name, model
 
+        ROUTE_SECONDS.observe(time.perf_counter() - started, outcome="failed")
+        ROUTE_FAILURES.inc()
         log_router("❌ No suitable peer/model combination found. Routing failed.", 1, "red")
         raise RuntimeError("No suitable peer or model found. All attempts failed.")
 
-    def get_llm_for_task(self, prompt: str) -> Optional[Ollama]:
+    def get_llm_for_task(self, prompt: str) -> Optional[RoutedLLM]:
         base_url, peer_name, model_name = self.get_optimal_endpoint_and_model(prompt)
         if base_url:
-            prefixed_model_name = f"ollama/{model_name}"
-            llm_config = {
-                "model": prefixed_model_name,
-                "base_url": base_url,
-                "temperature": config.model.temperature
-            }
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", DeprecationWarning)
-                return Ollama(**llm_config)
+            return self._create_llm(base_url, model_name, peer_name)
         return None
 
-    def get_llm_for_role(self, role: str) -> Optional[Ollama]:
+    def get_llm_for_role(self, role: str) -> Optional[RoutedLLM]:
         prompt = f"LLM selection for a {role} role."
         base_url, peer_name, model_name = self.get_optimal_endpoint_and_model(prompt)
         if base_url:
-            prefixed_model_name = f"ollama/{model_name}"
-            llm_config = {
-                "model": prefixed_model_name,
-                "base_url": base_url,
-                "temperature": config.model.temperature
-            }
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore", DeprecationWarning)
-                return Ollama(**llm_config)
+            return self._create_llm(base_url, model_name, peer_name)
         return None
 
 
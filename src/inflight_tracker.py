@@ -0,0 +1,99 @@
+# src/inflight_tracker.py
+
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Deque, Dict, Optional, Set, Tuple
+
+try:
+    from src.metrics import metrics
+except ImportError:
+    from metrics import metrics
+
+# Weight of the newest sample in the per (peer, model) latency moving average
+LATENCY_EWMA_ALPHA = 0.2
+# Routing decisions younger than this still count as (half) load, so a burst of agent
+# creations is spread before any of them has actually started calling the LLM
+ROUTE_WINDOW_SECONDS = float(os.getenv('ROUTER_ROUTE_WINDOW', '10'))
+RECENT_ROUTE_WEIGHT = 0.5
+
+LLM_CALL_SECONDS = metrics.histogram("zeroai_llm_call_seconds", "Duration of routed LLM calls",
+                                     ["peer", "model", "outcome"])
+LLM_INFLIGHT = metrics.gauge("zeroai_llm_inflight", "Outstanding routed LLM calls per peer", ["peer"])
+
+
+class InFlightTracker:
+    """Thread-safe counters of outstanding LLM requests and recent latency per peer and model."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.inflight: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.peer_inflight: Dict[str, int] = defaultdict(int)
+        self.latency: Dict[Tuple[str, str], float] = {}
+        self.recent_routes: Dict[str, Deque[Tuple[float, Optional[str]]]] = defaultdict(deque)
+        LLM_INFLIGHT.set_function(lambda: {(peer,): count for peer, count in list(self.peer_inflight.items())})
+
+    def record_route(self, peer: str, model: Optional[str] = None) -> None:
+        with self.lock:
+            self.recent_routes[peer].append((time.monotonic(), model))
+
+    def _expire_routes(self, peer: str, now: float) -> Optional[Deque[Tuple[float, Optional[str]]]]:
+        routes = self.recent_routes.get(peer)
+        while routes and now - routes[0][0] > ROUTE_WINDOW_SECONDS:
+            routes.popleft()
+        return routes
+
+    def start(self, peer: str, model: str) -> float:
+        with self.lock:
+            self.inflight[(peer, model)] += 1
+            self.peer_inflight[peer] += 1
+        return time.monotonic()
+
+    def finish(self, peer: str, model: str, started: float, success: bool = True) -> float:
+        elapsed = time.monotonic() - started
+        with self.lock:
+            self.inflight[(peer, model)] = max(0, self.inflight[(peer, model)] - 1)
+            self.peer_inflight[peer] = max(0, self.peer_inflight[peer] - 1)
+            if success:
+                previous = self.latency.get((peer, model))
+                self.latency[(peer, model)] = elapsed if previous is None else \
+                    LATENCY_EWMA_ALPHA * elapsed + (1 - LATENCY_EWMA_ALPHA) * previous
+        LLM_CALL_SECONDS.observe(elapsed, peer=peer, model=model, outcome="success" if success else "error")
+        return elapsed
+
+    @contextmanager
+    def track(self, peer: str, model: str):
+        """Count a request against ``peer``/``model`` for the duration of the block."""
+        started = self.start(peer, model)
+        success = False
+        try:
+            yield
+            success = True
+        finally:
+            self.finish(peer, model, started, success)
+
+    def outstanding(self, peer: str) -> int:
+        return self.peer_inflight.get(peer, 0)
+
+    def load(self, peer: str) -> float:
+        """Outstanding requests plus a partial weight for requests routed in the last window"""
+        now = time.monotonic()
+        with self.lock:
+            routes = self._expire_routes(peer, now)
+            recent = len(routes) if routes else 0
+            return self.peer_inflight.get(peer, 0) + RECENT_ROUTE_WEIGHT * recent
+
+    def active_models(self, peer: str) -> Set[str]:
+        """Models with requests running on, or recently routed to, ``peer``"""
+        now = time.monotonic()
+        with self.lock:
+            routes = self._expire_routes(peer, now)
+            models = {model for _, model in routes or () if model}
+            models.update(model for (p, model), count in self.inflight.items() if p == peer and count > 0)
+            return models
+
+    def latency_estimate(self, peer: str, model: str) -> Optional[float]:
+        return self.latency.get((peer, model))
+
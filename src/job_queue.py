@@ -0,0 +1,315 @@
+# src/job_queue.py
+
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+
+console = Console()
+
+JOBS_DB_PATH = os.getenv('ZEROAI_JOBS_DB', 'jobs/jobs.db')
+# Job worker threads per API process (0 = this process only accepts jobs)
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+JOB_POLL_INTERVAL = 1.0
+# Running jobs refresh a lease; a job whose lease is older than this is requeued (its worker died)
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '120'))
+JOB_LEASE_REFRESH = 15.0
+# Finished jobs and their events are deleted after this many seconds
+JOB_RETENTION_SECONDS = float(os.getenv('JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+TERMINAL_STATES = {JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+class JobStore:
+    """
+    SQLite-backed job queue shared by every API process on the host.
+
+    Jobs are claimed atomically, so any number of worker threads in any number of
+    processes can pull from the same queue; progress events are appended per job with a
+    sequence number so clients can resume an event stream.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, result TEXT, error TEXT,"
+            " created REAL NOT NULL, started REAL, finished REAL, lease REAL, worker TEXT,"
+            " cancel_requested INTEGER NOT NULL DEFAULT 0)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS job_events ("
+            " job_id TEXT NOT NULL, seq INTEGER NOT NULL, ts REAL NOT NULL, type TEXT NOT NULL, data TEXT,"
+            " PRIMARY KEY (job_id, seq))"
+        )
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def submit(self, request: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.db.execute("INSERT INTO jobs (id, status, request, created) VALUES (?, ?, ?, ?)",
+                            (job_id, JOB_QUEUED, json.dumps(request, default=str), now))
+        self.add_event(job_id, "queued", {})
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim_next(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to running and return it"""
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (JOB_QUEUED,)).fetchone()
+                if row is None:
+                    self.db.execute("COMMIT")
+                    return None
+                self.db.execute("UPDATE jobs SET status = ?, started = ?, lease = ?, worker = ? WHERE id = ?",
+                                (JOB_RUNNING, now, now, worker, row["id"]))
+                self.db.execute("COMMIT")
+            except sqlite3.Error:
+                self.db.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def renew_lease(self, job_id: str, worker: str) -> None:
+        with self.lock:
+            self.db.execute("UPDATE jobs SET lease = ? WHERE id = ? AND status = ? AND worker = ?",
+                            (time.time(), job_id, JOB_RUNNING, worker))
+
+    def finish(self, job_id: str, worker: str, status: str, result: Any = None,
+               error: Optional[str] = None) -> bool:
+        """
+        Record the outcome of a job run by ``worker``. Returns False without changing anything
+        when the worker no longer owns the job (its lease expired and the job was requeued).
+        """
+        with self.lock:
+            updated = self.db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? "
+                "WHERE id = ? AND status = ? AND worker = ?",
+                (status, json.dumps(result, default=str) if result is not None else None, error,
+                 time.time(), job_id, JOB_RUNNING, worker)).rowcount
+        if not updated:
+            return False
+        self.add_event(job_id, status, {"error": error} if error else {})
+        return True
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job: queued jobs are cancelled immediately, running jobs are flagged and stop
+        at their next step. Returns the resulting status, or None if the job does not exist.
+        """
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    self.db.execute("COMMIT")
+                    return None
+                status = row["status"]
+                if status == JOB_QUEUED:
+                    self.db.execute("UPDATE jobs SET status = ?, finished = ?, cancel_requested = 1 WHERE id = ?",
+                                    (JOB_CANCELLED, time.time(), job_id))
+                    status = JOB_CANCELLED
+                elif status == JOB_RUNNING:
+                    self.db.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+                self.db.execute("COMMIT")
+            except sqlite3.Error:
+                self.db.execute("ROLLBACK")
+                raise
+        if status == JOB_CANCELLED and row["status"] == JOB_QUEUED:
+            self.add_event(job_id, JOB_CANCELLED, {})
+        elif status == JOB_RUNNING:
+            self.add_event(job_id, "cancel_requested", {})
+        return status
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        with self.lock:
+            row = self.db.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def add_event(self, job_id: str, event_type: str, data: Dict[str, Any]) -> None:
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO job_events (job_id, seq, ts, type, data) VALUES "
+                "(?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?), ?, ?, ?)",
+                (job_id, job_id, time.time(), event_type, json.dumps(data, default=str)))
+
+    def events_since(self, job_id: str, after_seq: int = 0, limit: int = 500) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT seq, ts, type, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after_seq, limit)).fetchall()
+        return [{"seq": r["seq"], "ts": r["ts"], "type": r["type"], "data": json.loads(r["data"] or "{}")}
+                for r in rows]
+
+    def requeue_expired(self) -> int:
+        """Put running jobs whose worker stopped renewing its lease back on the queue"""
+        cutoff = time.time() - JOB_LEASE_SECONDS
+        with self.lock:
+            expired = [r["id"] for r in self.db.execute(
+                "SELECT id FROM jobs WHERE status = ? AND lease < ?", (JOB_RUNNING, cutoff)).fetchall()]
+            for job_id in expired:
+                self.db.execute("UPDATE jobs SET status = ?, worker = NULL, lease = NULL WHERE id = ? AND status = ?",
+                                (JOB_QUEUED, job_id, JOB_RUNNING))
+        for job_id in expired:
+            self.add_event(job_id, "requeued", {})
+        return len(expired)
+
+    def purge_finished(self) -> None:
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        with self.lock:
+            self.db.execute("DELETE FROM job_events WHERE job_id IN "
+                            "(SELECT id FROM jobs WHERE finished IS NOT NULL AND finished < ?)", (cutoff,))
+            self.db.execute("DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (cutoff,))
+
+
+JobHandler = Callable[[Dict[str, Any], Callable[[str, Dict[str, Any]], None], Callable[[], None]], Any]
+
+
+class JobRunner:
+    """
+    Worker threads that pull jobs from a JobStore and run them through ``handler``.
+
+    The handler receives the job, an ``emit(type, data)`` function for progress events and a
+    ``check_cancelled()`` function that raises JobCancelled once the job has been cancelled.
+    """
+
+    def __init__(self, store: JobStore, handler: JobHandler, workers: int = JOB_WORKERS):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.wake = Event()
+        self.stop_event = Event()
+        self.threads: List[Thread] = []
+        self.maintenance_thread: Optional[Thread] = None
+
+    def notify(self) -> None:
+        """Wake idle workers after a submit"""
+        self.wake.set()
+
+    def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id, worker = job["id"], job["worker"]
+
+        def emit(event_type: str, data: Dict[str, Any]) -> None:
+            self.store.add_event(job_id, event_type, data)
+
+        def check_cancelled() -> None:
+            if self.store.is_cancel_requested(job_id):
+                raise JobCancelled(job_id)
+
+        lease_stop = Event()
+
+        def keep_lease() -> None:
+            while not lease_stop.wait(JOB_LEASE_REFRESH):
+                self.store.renew_lease(job_id, worker)
+
+        def finish(status: str, result: Any = None, error: Optional[str] = None) -> None:
+            if not self.store.finish(job_id, worker, status, result=result, error=error):
+                console.print(f"⚠️ Job {job_id} was requeued while {worker} ran it; dropping its {status} result",
+                              style="yellow")
+
+        Thread(target=keep_lease, name=f"job-lease-{job_id[:8]}", daemon=True).start()
+        emit("started", {"worker": worker})
+        try:
+            check_cancelled()
+            result = self.handler(job, emit, check_cancelled)
+            if self.store.is_cancel_requested(job_id):
+                finish(JOB_CANCELLED)
+            else:
+                finish(JOB_SUCCEEDED, result=result)
+        except JobCancelled:
+            finish(JOB_CANCELLED)
+        except Exception as e:
+            if self.store.is_cancel_requested(job_id):
+                # The cancellation surfaced wrapped in another exception
+                finish(JOB_CANCELLED)
+                return
+            detail = getattr(e, "detail", None) or str(e)
+            console.print(f"❌ Job {job_id} failed: {detail}", style="red")
+            finish(JOB_FAILED, error=str(detail))
+        finally:
+            lease_stop.set()
+
+    def _worker_loop(self, index: int) -> None:
+        worker = f"{self.worker_prefix}:{index}"
+        while not self.stop_event.is_set():
+            try:
+                job = self.store.claim_next(worker)
+            except sqlite3.Error as e:
+                console.print(f"⚠️ Job queue unavailable: {e}", style="yellow")
+                job = None
+            if job is None:
+                self.wake.wait(JOB_POLL_INTERVAL)
+                self.wake.clear()
+                continue
+            self._run_job(job)
+
+    def _maintenance_loop(self) -> None:
+        while not self.stop_event.wait(JOB_LEASE_SECONDS / 2):
+            try:
+                if self.store.requeue_expired():
+                    self.wake.set()
+                self.store.purge_finished()
+            except sqlite3.Error as e:
+                console.print(f"⚠️ Job queue maintenance failed: {e}", style="yellow")
+
+    def start(self) -> None:
+        if self.threads:
+            return
+        self.stop_event.clear()
+        for index in range(self.workers):
+            thread = Thread(target=self._worker_loop, args=(index,), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        self.maintenance_thread = Thread(target=self._maintenance_loop, name="job-maintenance", daemon=True)
+        self.maintenance_thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop claiming jobs and wait up to ``timeout`` seconds for the threads to exit. A job
+        still running afterwards is abandoned; its lease expires and another worker requeues it.
+        """
+        self.stop_event.set()
+        self.wake.set()
+        deadline = time.monotonic() + timeout
+        for thread in self.threads + [self.maintenance_thread]:
+            if thread is not None:
+                thread.join(max(0.0, deadline - time.monotonic()))
+        self.threads = []
+        self.maintenance_thread = None
@@ -2,8 +2,9 @@
 
 from typing import Optional, List, Tuple, Dict, Any
 from src.distributed_router import DistributedRouter
+from src.prompt_classifier import classify_prompt
 from peer_discovery import PeerDiscovery
-from learning.feedback_loop import FeedbackLoop
+from learning.feedback_loop import get_feedback_loop
 import logging
 from rich.console import Console
 
@@ -15,7 +16,7 @@ class AdaptiveRouter(DistributedRouter):
     
     def __init__(self, peer_discovery_instance: PeerDiscovery):
         super().__init__(peer_discovery_instance)
-        self.feedback_loop = FeedbackLoop()
+        self.feedback_loop = get_feedback_loop()
         self.learned_category_mapping = {}
         self.refresh_learned_mappings()
     
@@ -35,9 +36,7 @@ class AdaptiveRouter(DistributedRouter):
         Optional[str], Optional[str], Optional[str]]:
         
         # Determine category from prompt
-        from distributed_router import KEYWORDS_TO_CATEGORY
-        prompt_lower = prompt.lower()
-        category = next((cat for key, cat in KEYWORDS_TO_CATEGORY.items() if key in prompt_lower), "default")
+        category = classify_prompt(prompt)
         
         # Use learned model preferences if available for this category
         if category in self.learned_category_mapping and self.learned_category_mapping[category]:
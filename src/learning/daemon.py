@@ -9,7 +9,7 @@ from datetime import datetime
 from pathlib import Path
 from rich.console import Console
 from learning.task_manager import TaskManager
-from learning.feedback_loop import FeedbackLoop, TaskOutcome
+from learning.feedback_loop import get_feedback_loop, record_task_result
 from learning.adaptive_router import AdaptiveRouter
 from peer_discovery import PeerDiscovery
 
@@ -19,7 +19,7 @@ logger = logging.getLogger("learning_daemon")
 class LearningDaemon:
     def __init__(self):
         self.task_manager = TaskManager()
-        self.feedback_loop = FeedbackLoop()
+        self.feedback_loop = get_feedback_loop()
         self.peer_discovery = PeerDiscovery()
         self.peer_discovery.start_discovery_service()
         self.adaptive_router = AdaptiveRouter(self.peer_discovery)
@@ -89,7 +89,7 @@ class LearningDaemon:
                     
                     # Record feedback
                     if "model_used" in result and "peer_used" in result:
-                        outcome = TaskOutcome(
+                        record_task_result(
                             task_id=next_task.id,
                             prompt=next_task.description,
                             category=next_task.category,
@@ -102,7 +102,6 @@ class LearningDaemon:
                             git_changes=result.get("git_changes"),
                             token_usage=result.get("token_usage")
                         )
-                        self.feedback_loop.record_task_outcome(outcome)
                 else:
                     console.print("No pending tasks found", style="yellow")
                     # Sleep longer when no tasks
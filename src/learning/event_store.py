@@ -0,0 +1,231 @@
+# src/learning/event_store.py
+
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from rich.console import Console
+
+console = Console()
+
+LEARNING_DB = os.getenv('ZEROAI_LEARNING_DB', 'knowledge/learning/learning.db')
+# Rows fetched per round trip when replaying or exporting the log
+READ_CHUNK = 1000
+
+
+
+def _stat_deltas(events: List[Dict[str, Any]]) -> List[Tuple]:
+    """
+    Sum a batch of events into one (scope, name, model, ...) delta row per aggregate.
+    Scopes are model, peer, category and category_model (keyed by category and model).
+    """
+    deltas: Dict[Tuple[str, str, str], List[float]] = {}
+    for e in events:
+        success = 1 if e.get("success") else 0
+        values = (1, success, 1 - success, e.get("tokens", 0) or 0, e.get("execution_time", 0) or 0,
+                  e.get("learning_tokens", 1))
+        model = e.get("model", "unknown")
+        category = e.get("category", "general")
+        for key in (("model", model, ""), ("peer", e.get("peer", "unknown"), ""), ("category", category, ""),
+                    ("category_model", category, model)):
+            row = deltas.setdefault(key, [0, 0, 0, 0, 0.0, 0])
+            for i, value in enumerate(values):
+                row[i] += value
+    return [key + tuple(values) for key, values in deltas.items()]
+
+
+class LearningEventStore:
+    """
+    Append-only log of task outcomes in SQLite (WAL mode), plus running aggregates.
+
+    Events are only ever inserted, in batches of one transaction each, so recording is
+    independent of the history size; readers page through the log by event id. The
+    per-model/peer/category aggregates are incremented in the same transaction, so every
+    process on the host sees the same totals and no update is lost to a concurrent writer.
+    """
+
+    def __init__(self, path: str = LEARNING_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = Lock()
+        self.pid = None
+        self.db = self._connect()
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, task_id TEXT,"
+            " category TEXT, model TEXT, peer TEXT, success INTEGER NOT NULL, data TEXT NOT NULL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS stats ("
+            " scope TEXT NOT NULL, name TEXT NOT NULL, model TEXT NOT NULL DEFAULT '',"
+            " tasks INTEGER NOT NULL, successes INTEGER NOT NULL, failures INTEGER NOT NULL,"
+            " total_tokens INTEGER NOT NULL, total_time REAL NOT NULL, tokens INTEGER NOT NULL,"
+            " PRIMARY KEY (scope, name, model))"
+        )
+        self._rebuild_stats_if_missing()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.pid = os.getpid()
+        db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _conn(self) -> sqlite3.Connection:
+        # A connection must not be shared with a forked child (gunicorn --preload imports this first)
+        if self.pid != os.getpid():
+            self.db = self._connect()
+        return self.db
+
+    def _rebuild_stats_if_missing(self) -> None:
+        """Derive the aggregates from the log once, for logs written before they were kept"""
+        with self.lock:
+            db = self._conn()
+            if db.execute("SELECT 1 FROM stats LIMIT 1").fetchone() or not db.execute(
+                    "SELECT 1 FROM events LIMIT 1").fetchone():
+                return
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                if not db.execute("SELECT 1 FROM stats LIMIT 1").fetchone():
+                    last = 0
+                    while True:
+                        rows = db.execute("SELECT id, data FROM events WHERE id > ? ORDER BY id LIMIT ?",
+                                          (last, READ_CHUNK)).fetchall()
+                        if not rows:
+                            break
+                        self._add_stats(db, [json.loads(data) for _, data in rows])
+                        last = rows[-1][0]
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _add_stats(db: sqlite3.Connection, events: List[Dict[str, Any]]) -> None:
+        db.executemany(
+            "INSERT INTO stats (scope, name, model, tasks, successes, failures, total_tokens, total_time, tokens)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (scope, name, model) DO UPDATE SET tasks = tasks + excluded.tasks,"
+            " successes = successes + excluded.successes, failures = failures + excluded.failures,"
+            " total_tokens = total_tokens + excluded.total_tokens, total_time = total_time + excluded.total_time,"
+            " tokens = tokens + excluded.tokens", _stat_deltas(events))
+
+    def append_many(self, events: List[Dict[str, Any]]) -> Optional[int]:
+        """Insert ``events`` and update the aggregates in one transaction; returns the id of the last event"""
+        if not events:
+            return None
+        rows = [(e.get("timestamp", time.time()), e.get("task_id"), e.get("category"), e.get("model"),
+                 e.get("peer"), 1 if e.get("success") else 0, json.dumps(e, default=str)) for e in events]
+        with self.lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.executemany(
+                    "INSERT INTO events (ts, task_id, category, model, peer, success, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                last_id = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+                self._add_stats(db, events)
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+        return last_id
+
+    def since(self, event_id: int = 0, min_ts: Optional[float] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (id, event) for every event after ``event_id`` (and at or after ``min_ts``), oldest first"""
+        last = event_id
+        while True:
+            with self.lock:
+                rows = self._conn().execute(
+                    "SELECT id, data FROM events WHERE id > ? AND ts >= ? ORDER BY id LIMIT ?",
+                    (last, min_ts if min_ts is not None else float("-inf"), READ_CHUNK)).fetchall()
+            for row_id, data in rows:
+                yield row_id, json.loads(data)
+            if len(rows) < READ_CHUNK:
+                return
+            last = rows[-1][0]
+
+    def tail(self, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """The newest ``limit`` (id, event) pairs, oldest first"""
+        with self.lock:
+            rows = self._conn().execute("SELECT id, data FROM events ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [(row_id, json.loads(data)) for row_id, data in reversed(rows)]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Current aggregate rows (scope, name, model, tasks, successes, failures, total_tokens, total_time, tokens)"""
+        with self.lock:
+            cursor = self._conn().execute(
+                "SELECT scope, name, model, tasks, successes, failures, total_tokens, total_time, tokens FROM stats")
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def count(self) -> int:
+        with self.lock:
+            return self._conn().execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def last_id(self) -> int:
+        with self.lock:
+            return self._conn().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def backup(self, destination: Path) -> None:
+        """Write a consistent copy of the store, including pages still in the WAL, to ``destination``"""
+        target = sqlite3.connect(str(destination))
+        try:
+            with self.lock:
+                self._conn().backup(target)
+        finally:
+            target.close()
+
+    def reset(self) -> int:
+        """
+        Delete every event and aggregate in one transaction; returns the number of events removed.
+
+        Processes with the store open keep using the same file. Event ids are never reused
+        (AUTOINCREMENT), so their readers simply see no new events until the next append.
+        """
+        with self.lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                removed = db.execute("DELETE FROM events").rowcount
+                db.execute("DELETE FROM stats")
+                db.execute("COMMIT")
+            except sqlite3.Error:
+                db.execute("ROLLBACK")
+                raise
+        return removed
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+    def import_legacy_outcomes(self, outcomes_file: Path) -> int:
+        """
+        One-time migration of the old task_outcomes.json list into the log.
+
+        The file is renamed to *.migrated so it is not imported twice; renaming it before
+        reading also keeps two processes starting at once from both importing it.
+        """
+        claimed = outcomes_file.with_name(outcomes_file.name + ".migrated")
+        try:
+            outcomes_file.rename(claimed)
+        except FileNotFoundError:
+            return 0
+        try:
+            with open(claimed, 'r') as f:
+                outcomes = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            console.print(f"⚠️ Could not migrate {outcomes_file}: {e}", style="yellow")
+            return 0
+        if not isinstance(outcomes, list):
+            return 0
+        outcomes = sorted((o for o in outcomes if isinstance(o, dict)), key=lambda o: o.get("timestamp", 0))
+        for start in range(0, len(outcomes), READ_CHUNK):
+            self.append_many(outcomes[start:start + READ_CHUNK])
+        console.print(f"📦 Migrated {len(outcomes)} task outcomes from {outcomes_file} to {self.path}", style="blue")
+        return len(outcomes)
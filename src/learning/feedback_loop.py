@@ -1,21 +1,87 @@
 # src/learning/feedback_loop.py
 
+import atexit
 import json
+import sys
 import time
 import os
+from collections import deque
 from pathlib import Path
+from threading import Event, Lock, Thread
 from typing import Dict, Any, Optional, List
 from rich.console import Console
 
+try:
+    from src.learning.event_store import LearningEventStore, LEARNING_DB
+    from src.log_pipeline import get_logger
+    from src.metrics import metrics as prometheus
+except ImportError:
+    from learning.event_store import LearningEventStore, LEARNING_DB
+    from log_pipeline import get_logger
+    from metrics import metrics as prometheus
+
 console = Console()
+logger = get_logger("learning")
+
+# Recorded outcomes are written to the event log in batches by a background thread: at least
+# every LEARNING_FLUSH_INTERVAL seconds, sooner once LEARNING_FLUSH_BATCH are waiting
+LEARNING_FLUSH_INTERVAL = float(os.getenv('LEARNING_FLUSH_INTERVAL', '1.0'))
+LEARNING_FLUSH_BATCH = int(os.getenv('LEARNING_FLUSH_BATCH', '256'))
+# Outcomes held while the event store cannot be written; the oldest are dropped beyond this
+LEARNING_MAX_PENDING = int(os.getenv('LEARNING_MAX_PENDING', '10000'))
+# Most recent outcomes kept in memory (classifier training, recent-task views)
+LEARNING_TAIL_SIZE = int(os.getenv('LEARNING_TAIL_SIZE', '5000'))
+# Seconds between reloads of the shared metrics snapshot (picks up other processes' outcomes)
+LEARNING_REFRESH_INTERVAL = float(os.getenv('LEARNING_REFRESH_INTERVAL', '5'))
+# Seconds between exports of the snapshot to learning_metrics.json
+LEARNING_SNAPSHOT_INTERVAL = float(os.getenv('LEARNING_SNAPSHOT_INTERVAL', '30'))
+
+LEARNING_DROPPED = prometheus.counter("zeroai_learning_dropped_outcomes",
+                                      "Task outcomes dropped because the learning store could not keep up")
+
+
+def _metrics_from_stats(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape the event store aggregates like the learning_metrics.json structure"""
+    metrics = {"models": {}, "peers": {}, "categories": {}, "tokens": {}}
+    for row in rows:
+        tasks = row["tasks"]
+        counts = {"tasks": tasks, "successes": row["successes"], "failures": row["failures"]}
+        if row["scope"] == "model":
+            metrics["models"][row["name"]] = {
+                **counts,
+                "success_rate": row["successes"] / tasks if tasks else 0.0,
+                "total_tokens": row["total_tokens"],
+                "avg_tokens": row["total_tokens"] / tasks if tasks else 0,
+                "total_time": row["total_time"],
+                "avg_time": row["total_time"] / tasks if tasks else 0,
+                "tokens": row["tokens"]  # Learning tokens
+            }
+        elif row["scope"] == "peer":
+            metrics["peers"][row["name"]] = {**counts, "tokens": row["tokens"]}
+        elif row["scope"] == "category":
+            category = metrics["categories"].setdefault(row["name"], {"models": {}})
+            category.update(counts, tokens=row["tokens"])
+        elif row["scope"] == "category_model":
+            # Track which models are used for this category
+            category = metrics["categories"].setdefault(row["name"], {"models": {}})
+            category["models"][row["model"]] = row["tokens"]
+    return metrics
+
 
 class FeedbackLoop:
     """
     Feedback loop system for learning from AI interactions.
     Tracks model performance, task success rates, and helps optimize model selection.
+
+    Every process (API workers, peers, the learning daemon) writes through the same SQLite
+    event store: outcomes are appended and the aggregates incremented in one transaction,
+    by a single background writer per process. Reads are served from ``self.metrics`` and
+    ``self.outcomes``, a snapshot of the store reloaded every LEARNING_REFRESH_INTERVAL
+    seconds, so they include outcomes recorded by other processes. Use get_feedback_loop()
+    rather than constructing another instance.
     """
 
-    def __init__(self):
+    def __init__(self, db_path: str = LEARNING_DB, tail_size: int = LEARNING_TAIL_SIZE):
         """Initialize the feedback loop system."""
         self.metrics_file = Path("knowledge/learning/learning_metrics.json")
         self.outcomes_file = Path("knowledge/learning/task_outcomes.json")
@@ -23,98 +89,118 @@ class FeedbackLoop:
         # Ensure directory exists
         self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Initialize or load metrics
-        self._load_or_initialize_metrics()
-        self._load_or_initialize_outcomes()
-
-    def _load_or_initialize_metrics(self) -> None:
-        """Load existing metrics or initialize new ones."""
-        if self.metrics_file.exists():
-            try:
-                with open(self.metrics_file, 'r') as f:
-                    self.metrics = json.load(f)
-            except json.JSONDecodeError:
-                console.print("⚠️ Error reading metrics file, initializing new metrics", style="yellow")
-                self._initialize_empty_metrics()
-        else:
-            self._initialize_empty_metrics()
-
-    def _initialize_empty_metrics(self) -> None:
-        """Initialize empty metrics structure."""
-        self.metrics = {
-            "models": {},
-            "peers": {},
-            "categories": {},
-            "tokens": {}
-        }
-        # Save the initialized structure
-        self._save_metrics()
-
-    def _load_or_initialize_outcomes(self) -> None:
-        """Load existing task outcomes or initialize new ones."""
+        self.lock = Lock()
+        self.store = LearningEventStore(db_path)
+        self.outcomes: "deque[Dict[str, Any]]" = deque(maxlen=tail_size)
+        self.outcome_count = 0
+        self.seen_event_id = 0
+        self.pending: "deque[Dict[str, Any]]" = deque(maxlen=LEARNING_MAX_PENDING)
+        self.dropped = 0
+        self.refreshed = 0.0
+        self.snapshot_written = 0.0
+        self.flush_requested = Event()
+        self.writer: Optional[Thread] = None
+        self.writer_pid: Optional[int] = None
+
+        # Migrate the legacy whole-file outcomes list, then take the first snapshot
         if self.outcomes_file.exists():
-            try:
-                with open(self.outcomes_file, 'r') as f:
-                    self.outcomes = json.load(f)
-            except json.JSONDecodeError:
-                console.print("⚠️ Error reading outcomes file, initializing new outcomes", style="yellow")
-                self.outcomes = []
-        else:
-            self.outcomes = []
-            # Save the initialized structure
-            self._save_outcomes()
+            self.store.import_legacy_outcomes(self.outcomes_file)
+        self.metrics = {"models": {}, "peers": {}, "categories": {}, "tokens": {}}
+        for event_id, outcome in self.store.tail(tail_size):
+            self.outcomes.append(outcome)
+            self.seen_event_id = event_id
+        self.refresh()
+        atexit.register(self.flush)
+
+    # --- Shared snapshot ---------------------------------------------------
+
+    def refresh(self) -> None:
+        """Reload the metrics snapshot and append outcomes recorded since the last refresh"""
+        try:
+            metrics = _metrics_from_stats(self.store.stats())
+            new_outcomes = list(self.store.since(self.seen_event_id))
+        except Exception as e:
+            console.print(f"⚠️ Error refreshing learning metrics: {e}", style="yellow")
+            return
+        with self.lock:
+            # Swapped in whole, so readers never see a half-built snapshot
+            self.metrics = metrics
+            for event_id, outcome in new_outcomes:
+                self.outcomes.append(outcome)
+                self.seen_event_id = event_id
+            self.outcome_count = sum(stats["tasks"] for stats in metrics["models"].values())
+            self.refreshed = time.time()
 
     def _save_metrics(self) -> None:
-        """Save metrics to disk."""
+        """Atomically export the metrics snapshot to learning_metrics.json."""
         try:
-            with open(self.metrics_file, 'w') as f:
+            temp_file = self.metrics_file.with_name(f"{self.metrics_file.name}.{os.getpid()}.tmp")
+            with open(temp_file, 'w') as f:
                 json.dump(self.metrics, f, indent=2)
+            os.replace(temp_file, self.metrics_file)
+            self.snapshot_written = time.time()
         except Exception as e:
             console.print(f"⚠️ Error saving metrics: {e}", style="yellow")
 
-    def _save_outcomes(self) -> None:
-        """Save task outcomes to disk."""
-        try:
-            with open(self.outcomes_file, 'w') as f:
-                json.dump(self.outcomes, f, indent=2)
-        except Exception as e:
-            console.print(f"⚠️ Error saving outcomes: {e}", style="yellow")
-
-    def _ensure_model_in_metrics(self, model: str) -> None:
-        """Ensure the model exists in metrics."""
-        if model not in self.metrics["models"]:
-            self.metrics["models"][model] = {
-                "tasks": 0,
-                "successes": 0,
-                "failures": 0,
-                "success_rate": 0.0,
-                "total_tokens": 0,
-                "avg_tokens": 0,
-                "total_time": 0,
-                "avg_time": 0,
-                "tokens": 0  # Learning tokens
-            }
+    # --- Background writer -------------------------------------------------
+
+    def _ensure_writer(self) -> None:
+        # Started lazily, and again after a fork (gunicorn --preload imports this before forking)
+        if self.writer is not None and self.writer_pid == os.getpid():
+            return
+        with self.lock:
+            if self.writer is not None and self.writer_pid == os.getpid():
+                return
+            self.writer_pid = os.getpid()
+            self.writer = Thread(target=self._writer_loop, daemon=True, name="learning-writer")
+            self.writer.start()
+
+    def _writer_loop(self) -> None:
+        while True:
+            self.flush_requested.wait(LEARNING_FLUSH_INTERVAL)
+            self.flush_requested.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending outcomes to the event store, then refresh and export the snapshot when due."""
+        with self.lock:
+            batch = list(self.pending)
+            self.pending.clear()
+        if batch:
+            try:
+                self.store.append_many(batch)
+            except Exception as e:
+                console.print(f"⚠️ Error writing {len(batch)} task outcomes: {e}", style="yellow")
+                with self.lock:
+                    # Retry with the next flush, keeping only the newest LEARNING_MAX_PENDING
+                    retained = batch + list(self.pending)
+                    self.pending = deque(retained, maxlen=LEARNING_MAX_PENDING)
+                    self._count_dropped(len(retained) - len(self.pending))
+                return
+        now = time.time()
+        if batch or now - self.refreshed >= LEARNING_REFRESH_INTERVAL:
+            self.refresh()
+        if now - self.snapshot_written >= LEARNING_SNAPSHOT_INTERVAL:
+            self._save_metrics()
 
-    def _ensure_peer_in_metrics(self, peer: str) -> None:
-        """Ensure the peer exists in metrics."""
-        if peer not in self.metrics["peers"]:
-            self.metrics["peers"][peer] = {
-                "tasks": 0,
-                "successes": 0,
-                "failures": 0,
-                "tokens": 0  # Learning tokens
-            }
+    def _count_dropped(self, count: int) -> None:
+        if count > 0:
+            self.dropped += count
+            LEARNING_DROPPED.inc(count)
 
-    def _ensure_category_in_metrics(self, category: str) -> None:
-        """Ensure the category exists in metrics."""
-        if category not in self.metrics["categories"]:
-            self.metrics["categories"][category] = {
-                "tasks": 0,
-                "successes": 0,
-                "failures": 0,
-                "tokens": 0,  # Learning tokens
-                "models": {}  # Track which models are used for this category
-            }
+    def _snapshot(self) -> Dict[str, Any]:
+        # Readers only need the writer thread running; it keeps the snapshot fresh
+        self._ensure_writer()
+        return self.metrics
+
+    def get_category_model_mapping(self) -> Dict[str, List[str]]:
+        """
+        Get the learned model preferences of every category.
+
+        Returns:
+            Dictionary mapping category to its model names, ordered by preference
+        """
+        return {category: self.get_model_preferences(category) for category in self._snapshot()["categories"]}
 
     def get_model_preference(self, category: str) -> Optional[str]:
         """
@@ -126,11 +212,12 @@ class FeedbackLoop:
         Returns:
             The model name or None if no preference
         """
-        if category not in self.metrics["categories"]:
+        categories = self._snapshot()["categories"]
+        if category not in categories:
             return None
 
         # Get models used for this category
-        models = self.metrics["categories"][category].get("models", {})
+        models = categories[category].get("models", {})
         if not models:
             return None
 
@@ -147,29 +234,55 @@ class FeedbackLoop:
         Returns:
             List of model names, ordered by preference
         """
-        if category not in self.metrics["categories"]:
+        categories = self._snapshot()["categories"]
+        if category not in categories:
             return []
 
         # Get models used for this category
-        models = self.metrics["categories"][category].get("models", {})
+        models = categories[category].get("models", {})
         if not models:
             return []
 
         # Sort models by token count (descending)
         return [model for model, _ in sorted(models.items(), key=lambda x: x[1], reverse=True)]
 
+    def _learning_tokens(self, category: str, success: bool, execution_time: float) -> int:
+        """Learning tokens earned by one task"""
+        # Base token: Every task gets at least 1 token
+        learning_tokens = 1
+
+        # Success bonus: Successful tasks get extra tokens
+        if success:
+            learning_tokens += 2
+
+        # Efficiency bonus: Fast tasks get more tokens (relative to category average)
+        if category in self.metrics["categories"]:
+            category_tasks = self.metrics["categories"][category].get("tasks", 0)
+            if category_tasks > 0:
+                # Get the average time for this category if we have tasks
+                # We don't track time per category yet, so use a heuristic
+                # based on successful task count and model stats
+                avg_time_estimate = 10.0  # Default assumption: 10 seconds
+
+                # Time efficiency bonus
+                if execution_time < avg_time_estimate and execution_time > 0:
+                    time_bonus = min(3, int(avg_time_estimate / execution_time))
+                    learning_tokens += time_bonus
+        return learning_tokens
+
     def record_task(self, task_data: Dict[str, Any]) -> None:
         """
         Record a task execution result and update metrics.
 
+        Takes constant time: the outcome is queued for the background writer, which appends
+        it to the event store; it shows up in the metrics with the next refresh.
+
         Args:
             task_data: Dictionary containing task result data
         """
         try:
             # Extract key information
-            task_id = task_data.get("task_id", "unknown")
             model = task_data.get("model_used", "unknown")
-            peer = task_data.get("peer_used", "unknown")
             category = task_data.get("category", "general")
             success = task_data.get("success", False)
 
@@ -182,100 +295,58 @@ class FeedbackLoop:
             token_usage = task_data.get("token_usage", {})
             total_tokens = token_usage.get("total_tokens", 0) if isinstance(token_usage, dict) else 0
 
-            # Calculate learning tokens
-            # Base token: Every task gets at least 1 token
-            learning_tokens = 1
-
-            # Success bonus: Successful tasks get extra tokens
-            if success:
-                learning_tokens += 2
-
-            # Efficiency bonus: Fast tasks get more tokens (relative to category average)
-            if category in self.metrics["categories"]:
-                category_tasks = self.metrics["categories"][category]["tasks"]
-                if category_tasks > 0:
-                    # Get the average time for this category if we have tasks
-                    # We don't track time per category yet, so use a heuristic
-                    # based on successful task count and model stats
-                    avg_time_estimate = 10.0  # Default assumption: 10 seconds
-
-                    # Time efficiency bonus
-                    if execution_time < avg_time_estimate and execution_time > 0:
-                        time_bonus = min(3, int(avg_time_estimate / execution_time))
-                        learning_tokens += time_bonus
-
-            # Ensure model, peer, and category exist in metrics
-            self._ensure_model_in_metrics(model)
-            self._ensure_peer_in_metrics(peer)
-            self._ensure_category_in_metrics(category)
-
-            # Update model metrics
-            model_stats = self.metrics["models"][model]
-            model_stats["tasks"] += 1
-            if success:
-                model_stats["successes"] += 1
-            else:
-                model_stats["failures"] += 1
-            model_stats["success_rate"] = model_stats["successes"] / model_stats["tasks"]
-            model_stats["total_tokens"] += total_tokens
-            model_stats["avg_tokens"] = model_stats["total_tokens"] / model_stats["tasks"]
-            model_stats["total_time"] += execution_time
-            model_stats["avg_time"] = model_stats["total_time"] / model_stats["tasks"]
-            model_stats["tokens"] += learning_tokens
-
-            # Update peer metrics
-            peer_stats = self.metrics["peers"][peer]
-            peer_stats["tasks"] += 1
-            if success:
-                peer_stats["successes"] += 1
-            else:
-                peer_stats["failures"] += 1
-            peer_stats["tokens"] += learning_tokens
-
-            # Update category metrics
-            category_stats = self.metrics["categories"][category]
-            category_stats["tasks"] += 1
-            if success:
-                category_stats["successes"] += 1
-            else:
-                category_stats["failures"] += 1
-            category_stats["tokens"] += learning_tokens
-
-            # Track which models are used for this category
-            if "models" not in category_stats:
-                category_stats["models"] = {}
-            if model not in category_stats["models"]:
-                category_stats["models"][model] = 0
-            category_stats["models"][model] += learning_tokens
-
-            # Add to outcomes
-            self.outcomes.append({
-                "task_id": task_id,
-                "timestamp": time.time(),
-                "date": time.strftime("%Y-%m-%d %H:%M:%S"),
-                "model": model,
-                "peer": peer,
-                "category": category,
-                "prompt": task_data.get("prompt", ""),
-                "success": success,
-                "execution_time": execution_time,
-                "tokens": total_tokens,
-                "learning_tokens": learning_tokens,
-                "error_message": task_data.get("error_message", None) if not success else None
-            })
-
-            # Save updated metrics and outcomes
-            self._save_metrics()
-            self._save_outcomes()
-
-            console.print(f"✅ Recorded task result with {learning_tokens} learning tokens", style="green")
+            with self.lock:
+                learning_tokens = self._learning_tokens(category, success, execution_time)
+                outcome = {
+                    "task_id": task_data.get("task_id", "unknown"),
+                    "timestamp": time.time(),
+                    "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+                    "model": model,
+                    "peer": task_data.get("peer_used", "unknown"),
+                    "category": category,
+                    "prompt": task_data.get("prompt", ""),
+                    "success": success,
+                    "execution_time": execution_time,
+                    "tokens": total_tokens,
+                    "learning_tokens": learning_tokens,
+                    "error_message": task_data.get("error_message", None) if not success else None
+                }
+                # A full queue (store unwritable) drops its oldest outcome to stay bounded
+                self._count_dropped(1 if len(self.pending) == self.pending.maxlen else 0)
+                self.pending.append(outcome)
+                flush_now = len(self.pending) >= LEARNING_FLUSH_BATCH
+
+            self._ensure_writer()
+            if flush_now:
+                self.flush_requested.set()
+
+            logger.debug("✅ Recorded task result with %s learning tokens", learning_tokens, extra={"style": "green"})
 
         except Exception as e:
             console.print(f"⚠️ Error recording task result: {e}", style="yellow")
 
+    def recent_outcomes(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The newest outcomes from the snapshot, oldest first"""
+        self._ensure_writer()
+        with self.lock:
+            outcomes = list(self.outcomes)
+        return outcomes[-limit:] if limit else outcomes
+
+
+def get_feedback_loop() -> FeedbackLoop:
+    """The process-wide feedback loop shared by the crews, the API, the router and the daemon."""
+    global feedback_loop
+    if feedback_loop is None:
+        # This module is imported both as "learning.feedback_loop" and "src.learning.feedback_loop"
+        other = sys.modules.get("learning.feedback_loop" if __name__ == "src.learning.feedback_loop"
+                                else "src.learning.feedback_loop")
+        feedback_loop = getattr(other, "feedback_loop", None) or FeedbackLoop()
+    return feedback_loop
+
 
 # Create a singleton instance
-feedback_loop = FeedbackLoop()
+feedback_loop: Optional[FeedbackLoop] = None
+feedback_loop = get_feedback_loop()
 
 def record_task_result(
     task_id: str,
@@ -0,0 +1,133 @@
+# src/log_pipeline.py
+
+import atexit
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from rich.console import Console
+
+# All ZeroAI loggers live under this name, so the pipeline never touches third-party or root logging
+ROOT_LOGGER = "zeroai"
+
+# Finer than DEBUG, for per-candidate routing and per-heartbeat messages
+VERBOSE = 5
+logging.addLevelName(VERBOSE, "VERBOSE")
+
+# The 0-5 debug levels used by log_router/log_peer (0=silent, 1=errors ... 5=verbose)
+DEBUG_LEVELS = {1: logging.ERROR, 2: logging.WARNING, 3: logging.INFO, 4: logging.DEBUG, 5: VERBOSE}
+
+console = Console()
+
+_setup_lock = Lock()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format a record as one JSON line, merging the dict passed as ``extra={"payload": ...}``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"ts": record.created, "level": record.levelname, "logger": record.name,
+                 "message": record.getMessage()}
+        payload = getattr(record, "payload", None)
+        if payload:
+            entry.update(payload)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RichConsoleHandler(logging.Handler):
+    """Render records on the Rich console with the style passed as ``extra={"style": ...}``."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            style = getattr(record, "style", None)
+            if style:
+                console.print(record.getMessage(), style=style)
+            else:
+                console.print(record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+
+def _level(name: Optional[str], default: int = logging.INFO) -> int:
+    if not name:
+        return default
+    level = logging.getLevelName(str(name).upper())
+    return level if isinstance(level, int) else default
+
+
+def _qualify(name: str) -> str:
+    return name if name == ROOT_LOGGER or name.startswith(ROOT_LOGGER + ".") else f"{ROOT_LOGGER}.{name}"
+
+
+def setup_logging(logging_config=None) -> logging.Logger:
+    """
+    Install the ZeroAI logging pipeline once per process.
+
+    Callers only pay for the level check and for putting the record on an in-memory queue;
+    a QueueListener thread renders it on the terminal and appends it as JSON to
+    ``logging_config.json_file``. Levels come from ``logging_config.level`` and, per module,
+    from ``logging_config.modules`` (keys relative to "zeroai", e.g. "router", "api").
+    """
+    root = logging.getLogger(ROOT_LOGGER)
+    with _setup_lock:
+        # Kept on the logger, not in this module, since the API may import us as both src.x and x
+        if getattr(root, "zeroai_listener", None) is not None:
+            return root
+        if logging_config is None:
+            try:
+                from src.config import config
+            except ImportError:
+                from config import config
+            logging_config = config.logging
+
+        handlers = [RichConsoleHandler()]
+        if logging_config.json_file:
+            try:
+                Path(logging_config.json_file).parent.mkdir(parents=True, exist_ok=True)
+                file_handler = logging.FileHandler(logging_config.json_file, encoding="utf-8")
+                file_handler.setFormatter(JsonLineFormatter())
+                handlers.append(file_handler)
+            except OSError as e:
+                console.print(f"⚠️ Cannot open JSON log {logging_config.json_file}: {e}", style="yellow")
+
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        root.addHandler(QueueHandler(records))
+        root.setLevel(_level(logging_config.level))
+        root.propagate = False
+        for name, level in (logging_config.modules or {}).items():
+            logging.getLogger(_qualify(name)).setLevel(_level(level))
+
+        root.zeroai_listener = QueueListener(records, *handlers, respect_handler_level=True)
+        root.zeroai_listener.start()
+        atexit.register(shutdown_logging)
+    return root
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    root = logging.getLogger(ROOT_LOGGER)
+    with _setup_lock:
+        listener = getattr(root, "zeroai_listener", None)
+        if listener is not None:
+            listener.stop()
+            root.zeroai_listener = None
+
+
+def get_logger(name: str, default_level: Optional[int] = None) -> logging.Logger:
+    """
+    Logger for a ZeroAI module, with the pipeline installed.
+
+    ``default_level`` applies unless config.logging.modules sets a level for the module;
+    log_router/log_peer use it to keep honouring ROUTER_DEBUG_LEVEL and PEER_DEBUG_LEVEL.
+    """
+    setup_logging()
+    logger = logging.getLogger(_qualify(name))
+    if default_level is not None and logger.level == logging.NOTSET:
+        logger.setLevel(default_level)
+    return logger
@@ -0,0 +1,233 @@
+# src/metrics.py
+
+import bisect
+import math
+import os
+import sys
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format served by /metrics
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Each gunicorn worker keeps its own registry; the label keeps their series apart (sum() across it)
+METRICS_WORKER_LABEL = os.getenv('METRICS_WORKER_LABEL', 'true').lower() == 'true'
+
+# Seconds; spans a cached answer (ms) up to a long multi-agent crew (minutes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels_text(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+        self.lock = Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Tuple[str, ...], Tuple[str, ...], float]]:
+        """(sample name, extra label names, label values + extra values, value) tuples"""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self.lock:
+            return [(f"{self.name}_total", (), key, value) for key, value in self.values.items()]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; may instead be read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = float(value)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def replace(self, values: Dict[Tuple[str, ...], float]) -> None:
+        """Swap in a complete set of labelled values (drops label combinations that disappeared)"""
+        with self.lock:
+            self.values = {tuple(str(v) for v in key): float(value) for key, value in values.items()}
+
+    def set_function(self, function: Callable[[], object]) -> None:
+        """
+        Read the gauge from ``function`` at scrape time. Unlabelled gauges return a number,
+        labelled ones a {label values tuple: number} dict.
+        """
+        self.function = function
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        if self.function is not None:
+            try:
+                result = self.function()
+            except Exception:
+                return []
+            values = result if isinstance(result, dict) else {(): result}
+            return [(self.name, (), tuple(str(v) for v in key), float(value)) for key, value in values.items()]
+        with self.lock:
+            return [(self.name, (), key, value) for key, value in self.values.items()]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram of observed values (durations in seconds by default)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        samples = []
+        with self.lock:
+            for key, (counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", ("le",), key + (_format_value(bound),), cumulative))
+                samples.append((f"{self.name}_sum", (), key, total))
+                samples.append((f"{self.name}_count", (), key, count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Named metrics of one process, rendered in the Prometheus text format.
+
+    ``counter``/``gauge``/``histogram`` return the existing metric when the name is already
+    registered, so modules can declare their metrics at import time without coordinating.
+    """
+
+    def __init__(self, worker_label: bool = METRICS_WORKER_LABEL):
+        self.metrics: Dict[str, _Metric] = {}
+        self.lock = Lock()
+        self.worker_label = worker_label
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Iterable[str], **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        # Read at render time: with gunicorn --preload this module is imported before the fork
+        const_names = ("worker",) if self.worker_label else ()
+        const_values = (str(os.getpid()),) if self.worker_label else ()
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample_name, extra_names, values, value in metric.samples():
+                names = const_names + metric.labelnames + extra_names
+                lines.append(f"{sample_name}{_labels_text(names, const_values + values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _shared_registry() -> MetricsRegistry:
+    # The API imports src modules both as "src.x" and as "x"; both copies must share one registry
+    other = sys.modules.get("metrics" if __name__ == "src.metrics" else "src.metrics")
+    registry = getattr(other, "metrics", None)
+    return registry if registry is not None else MetricsRegistry()
+
+
+metrics = _shared_registry()
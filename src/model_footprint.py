@@ -0,0 +1,250 @@
+# src/model_footprint.py
+
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import requests
+
+# Approximate memory requirements in GB, used until a model's real size has been learned from Ollama
+DEFAULT_MODEL_FOOTPRINTS = {
+    "llama3.1:8b": 5.6,
+    "llama3.2:latest": 3.0,
+    "llama3.2:1b": 2.3,
+    "mistral-nemo:latest": 16,
+    "codellama:13b": 8.0,
+    "codellama:7b": 5.0,
+    "gemma2:2b": 3.5,
+    "llava:7b": 5.0,
+}
+
+# Bytes per parameter for common GGUF quantizations
+QUANTIZATION_BYTES_PER_PARAM = {
+    "Q2_K": 0.35, "Q3_K_S": 0.43, "Q3_K_M": 0.49, "Q3_K_L": 0.53,
+    "Q4_0": 0.56, "Q4_1": 0.63, "Q4_K_S": 0.57, "Q4_K_M": 0.60,
+    "Q5_0": 0.69, "Q5_1": 0.75, "Q5_K_S": 0.69, "Q5_K_M": 0.71,
+    "Q6_K": 0.82, "Q8_0": 1.06, "F16": 2.0, "BF16": 2.0, "F32": 4.0,
+}
+DEFAULT_BYTES_PER_PARAM = QUANTIZATION_BYTES_PER_PARAM["Q4_K_M"]
+# Runtime overhead (compute buffers, CUDA/Metal context) on top of weights and KV cache
+FOOTPRINT_OVERHEAD_GB = 0.5
+# Context window Ollama allocates the KV cache for
+OLLAMA_CONTEXT_LENGTH = int(os.getenv('OLLAMA_CONTEXT_LENGTH', '2048'))
+FOOTPRINT_TIMEOUT = 5
+
+GIB = 1024 ** 3
+PARAMETER_SIZE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*([bm])\b', re.IGNORECASE)
+
+
+def parse_parameter_count(text: str) -> Optional[float]:
+    """Parse '8.0B', '1.2B', '270M' or a model tag like 'codellama:13b' into a parameter count"""
+    match = PARAMETER_SIZE_PATTERN.search(text or "")
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value * (1e9 if match.group(2).lower() == 'b' else 1e6)
+
+
+def estimate_footprint_gb(parameter_count: float, quantization: Optional[str] = None,
+                          model_info: Optional[Dict[str, Any]] = None,
+                          context_length: int = OLLAMA_CONTEXT_LENGTH) -> float:
+    """Estimate resident memory of a model from its parameters, quantization and architecture"""
+    bytes_per_param = QUANTIZATION_BYTES_PER_PARAM.get((quantization or "").upper(), DEFAULT_BYTES_PER_PARAM)
+    weights = parameter_count * bytes_per_param
+
+    kv_cache = 0.0
+    if model_info:
+        architecture = model_info.get("general.architecture", "")
+        layers = model_info.get(f"{architecture}.block_count")
+        embedding = model_info.get(f"{architecture}.embedding_length")
+        heads = model_info.get(f"{architecture}.attention.head_count")
+        kv_heads = model_info.get(f"{architecture}.attention.head_count_kv", heads)
+        max_context = model_info.get(f"{architecture}.context_length", context_length)
+        if layers and embedding and heads and kv_heads:
+            kv_embedding = embedding * kv_heads / heads
+            # K and V, f16 (2 bytes) per element
+            kv_cache = 2 * layers * min(context_length, max_context) * kv_embedding * 2
+
+    return (weights + kv_cache) / GIB + FOOTPRINT_OVERHEAD_GB
+
+
+class ModelFootprintRegistry:
+    """
+    Memory accounting used for routing admission.
+
+    Footprints are learned from Ollama metadata: /api/ps reports the exact size of loaded
+    models, /api/show gives parameters, quantization and architecture for the rest. Per-peer
+    resident models come from /api/ps, and models with requests routed to a peer but not yet
+    finished (as seen by the in-flight tracker) are counted as reserved on that peer.
+    """
+
+    def __init__(self, inflight_tracker=None):
+        self.inflight = inflight_tracker
+        self.lock = Lock()
+        self.version = 0
+        self.footprints: Dict[str, float] = {}
+        self.resident: Dict[str, Dict[str, float]] = {}
+        self.resident_vram: Dict[str, Dict[str, float]] = {}
+        self.lookups_pending: Set[Tuple[str, str]] = set()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-footprint")
+        # At most one residency sweep is queued or running; snapshots arriving meanwhile replace
+        # the peers of the next sweep instead of queueing another one
+        self.sweep_lock = Lock()
+        self.sweep_peers: Optional[List[Any]] = None
+        self.sweep_scheduled = False
+        self.session = requests.Session()
+
+    # --- Footprints ------------------------------------------------------
+
+    def _learn(self, model: str, size_gb: float) -> None:
+        with self.lock:
+            previous = self.footprints.get(model)
+            if previous is None or abs(previous - size_gb) > 0.1:
+                self.footprints[model] = size_gb
+                self.version += 1
+
+    def required_gb(self, model: str) -> Optional[float]:
+        """Best known footprint: learned from Ollama, then the static table, then the model tag"""
+        learned = self.footprints.get(model)
+        if learned is not None:
+            return learned
+        if model in DEFAULT_MODEL_FOOTPRINTS:
+            return DEFAULT_MODEL_FOOTPRINTS[model]
+        parameter_count = parse_parameter_count(model.split(':', 1)[-1])
+        if parameter_count:
+            return estimate_footprint_gb(parameter_count)
+        return None
+
+    def learn_from_show(self, model: str, show: Dict[str, Any]) -> Optional[float]:
+        details = show.get("details", {}) or {}
+        model_info = show.get("model_info", {}) or {}
+        parameter_count = model_info.get("general.parameter_count") or parse_parameter_count(
+            details.get("parameter_size", ""))
+        if not parameter_count:
+            return None
+        size_gb = estimate_footprint_gb(parameter_count, details.get("quantization_level"), model_info)
+        # An exact size from /api/ps always wins over an estimate
+        if model not in self.footprints:
+            self._learn(model, size_gb)
+        return size_gb
+
+    def _lookup(self, base_url: str, model: str) -> None:
+        try:
+            response = self.session.post(f"{base_url}/api/show", json={"model": model}, timeout=FOOTPRINT_TIMEOUT)
+            response.raise_for_status()
+            self.learn_from_show(model, response.json())
+        except (requests.exceptions.RequestException, ValueError):
+            pass
+        finally:
+            with self.lock:
+                self.lookups_pending.discard((base_url, model))
+
+    def schedule_lookup(self, base_url: str, model: str) -> None:
+        """Fetch /api/show for a model in the background if its size has not been learned yet"""
+        key = (base_url, model)
+        with self.lock:
+            if model in self.footprints or key in self.lookups_pending:
+                return
+            self.lookups_pending.add(key)
+        self.executor.submit(self._lookup, base_url, model)
+
+    # --- Residency -------------------------------------------------------
+
+    def update_resident(self, peer_name: str, ps_models: Dict[str, Dict[str, Any]]) -> None:
+        """Record the models a peer has loaded, as reported by /api/ps"""
+        resident, resident_vram = {}, {}
+        for name, info in ps_models.items():
+            size_gb = (info.get("size") or 0) / GIB
+            resident[name] = size_gb
+            resident_vram[name] = (info.get("size_vram") or 0) / GIB
+            if size_gb:
+                self._learn(name, size_gb)
+        with self.lock:
+            self.resident[peer_name] = resident
+            self.resident_vram[peer_name] = resident_vram
+
+    def mark_resident(self, peer_name: str, model: str) -> None:
+        with self.lock:
+            self.resident.setdefault(peer_name, {}).setdefault(model, self.footprints.get(model, 0.0))
+
+    def is_resident(self, peer_name: str, model: str) -> bool:
+        return model in self.resident.get(peer_name, {})
+
+    def fetch_resident(self, peer) -> bool:
+        try:
+            response = self.session.get(f"http://{peer.ip}:11434/api/ps", timeout=FOOTPRINT_TIMEOUT)
+            response.raise_for_status()
+            models = {m['name']: m for m in response.json().get('models', []) if 'name' in m}
+        except (requests.exceptions.RequestException, ValueError):
+            return False
+        self.update_resident(peer.name, models)
+        return True
+
+    def refresh_residency(self, peers) -> None:
+        """Re-read /api/ps of every available peer"""
+        for peer in peers:
+            if peer.capabilities.available:
+                self.fetch_resident(peer)
+
+    def schedule_residency_refresh(self, peers) -> None:
+        """Queue a residency sweep, coalesced with any sweep already pending"""
+        with self.sweep_lock:
+            self.sweep_peers = list(peers)
+            if self.sweep_scheduled:
+                return
+            self.sweep_scheduled = True
+        self.executor.submit(self._run_sweeps)
+
+    def _run_sweeps(self) -> None:
+        while True:
+            with self.sweep_lock:
+                peers, self.sweep_peers = self.sweep_peers, None
+                if peers is None:
+                    self.sweep_scheduled = False
+                    return
+            try:
+                self.refresh_residency(peers)
+            except Exception:
+                # Let the next snapshot schedule a new sweep
+                with self.sweep_lock:
+                    self.sweep_scheduled = False
+                raise
+
+    # --- Admission -------------------------------------------------------
+
+    def reserved_gb(self, peer_name: str) -> float:
+        """Memory claimed by models routed to the peer that are not loaded there yet"""
+        if self.inflight is None:
+            return 0.0
+        resident = self.resident.get(peer_name, {})
+        reserved = 0.0
+        for model in self.inflight.active_models(peer_name):
+            if model not in resident:
+                reserved += self.required_gb(model) or 0.0
+        return reserved
+
+    def can_admit(self, peer, model: str) -> Tuple[bool, float, float]:
+        """
+        Check whether ``peer`` can hold ``model`` right now.
+
+        Returns:
+            (admitted, required_gb, available_gb)
+        """
+        if self.is_resident(peer.name, model):
+            return True, 0.0, 0.0
+
+        required = self.required_gb(model)
+        if required is None:
+            return False, 0.0, 0.0
+
+        capabilities = peer.capabilities
+        if capabilities.gpu_available:
+            # gpu_memory is the card's capacity, so subtract what loaded models already occupy
+            available = capabilities.gpu_memory - sum(self.resident_vram.get(peer.name, {}).values())
+        else:
+            # memory is the host's currently available RAM, which already excludes loaded models
+            available = capabilities.memory
+        available -= self.reserved_gb(peer.name)
+        return required <= available, required, available
@@ -0,0 +1,124 @@
+# src/model_inventory.py
+
+import json
+import os
+import time
+from pathlib import Path
+from threading import Lock, Thread
+from typing import List, Optional, Tuple
+
+import requests
+from rich.console import Console
+
+console = Console()
+
+PULLED_MODELS_PATH = Path("pulled_models.json")
+# At most one stat() of pulled_models.json per interval
+INVENTORY_STAT_INTERVAL = float(os.getenv('MODEL_INVENTORY_STAT_INTERVAL', '5'))
+# How often the live /api/tags of the local Ollama is re-read in the background
+INVENTORY_LIVE_TTL = float(os.getenv('MODEL_INVENTORY_LIVE_TTL', '60'))
+INVENTORY_LIVE_TIMEOUT = 3
+
+
+class ModelInventory:
+    """
+    In-memory list of the models available on the local Ollama.
+
+    pulled_models.json is parsed once and only re-read when its mtime changes; the live
+    /api/tags listing is refreshed on a background thread. Hot routing paths only ever
+    read the cached tuple.
+    """
+
+    def __init__(self, path: Path = PULLED_MODELS_PATH, ollama_url: Optional[str] = None):
+        self.path = Path(path)
+        self.ollama_url = (ollama_url or os.getenv("OLLAMA_HOST", "http://ollama:11434")).rstrip('/')
+        self.lock = Lock()
+        self.version = 0
+        self._file_models: Tuple[str, ...] = ()
+        self._live_models: Optional[Tuple[str, ...]] = None
+        self._models: Tuple[str, ...] = ()
+        self._file_mtime: Optional[float] = None
+        self._last_stat: Optional[float] = None
+        self._last_live_refresh: Optional[float] = None
+        self._live_refreshing = False
+        self._warned_missing = False
+
+    def _publish(self) -> None:
+        # The live listing is authoritative once we have one; the file covers Ollama being unreachable
+        models = self._live_models if self._live_models is not None else self._file_models
+        if models != self._models:
+            self._models = models
+            self.version += 1
+
+    def _check_file(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._file_mtime:
+            return
+        self._file_mtime = mtime
+
+        models: Tuple[str, ...] = ()
+        if mtime is not None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                models = tuple(m for m in data if isinstance(m, str)) if isinstance(data, list) else ()
+            except (OSError, json.JSONDecodeError):
+                models = ()
+        if not models and not self._warned_missing:
+            console.print(f"⚠️ {self.path} not found or is invalid. Assuming no local models.", style="yellow")
+            self._warned_missing = True
+        self._file_models = models
+        self._publish()
+
+    def _refresh_live(self) -> None:
+        try:
+            response = requests.get(f"{self.ollama_url}/api/tags", timeout=INVENTORY_LIVE_TIMEOUT)
+            response.raise_for_status()
+            live = tuple(m['name'] for m in response.json().get('models', []) if 'name' in m)
+        except (requests.exceptions.RequestException, ValueError):
+            live = None
+        with self.lock:
+            self._live_models = live
+            self._last_live_refresh = time.monotonic()
+            self._live_refreshing = False
+            self._publish()
+
+    def refresh(self, wait: bool = False) -> None:
+        """Re-read the live model list from the local Ollama"""
+        with self.lock:
+            if self._live_refreshing:
+                return
+            self._live_refreshing = True
+        if wait:
+            self._refresh_live()
+        else:
+            Thread(target=self._refresh_live, name="model-inventory-refresh", daemon=True).start()
+
+    def get_models(self) -> List[str]:
+        """Return the current local model list without blocking on disk or network"""
+        now = time.monotonic()
+        start_live_refresh = False
+        with self.lock:
+            if self._last_stat is None or now - self._last_stat >= INVENTORY_STAT_INTERVAL:
+                self._last_stat = now
+                self._check_file()
+            live_due = self._last_live_refresh is None or now - self._last_live_refresh >= INVENTORY_LIVE_TTL
+            if live_due and not self._live_refreshing:
+                start_live_refresh = True
+        if start_live_refresh:
+            self.refresh()
+        return list(self._models)
+
+    def __contains__(self, model_name: str) -> bool:
+        return model_name in self.get_models()
+
+
+model_inventory = ModelInventory()
+
+
+def get_model_inventory() -> ModelInventory:
+    """Shared inventory of the local Ollama models"""
+    return model_inventory
@@ -0,0 +1,213 @@
+# src/model_warmup.py
+
+import os
+import tempfile
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock, Thread, Event
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import requests
+from rich.console import Console
+
+try:
+    import fcntl
+    has_fcntl = True
+except ImportError:
+    has_fcntl = False
+
+console = Console()
+
+ROUTER_WARMUP_ENABLED = os.getenv('ROUTER_WARMUP_ENABLED', 'true').lower() == 'true'
+# How many models from the head of each MODEL_PREFERENCES list are preloaded at startup
+WARMUP_TOP_MODELS = int(os.getenv('ROUTER_WARMUP_TOP_MODELS', '1'))
+# Ollama keep_alive sent with every preload/refresh, and how often hot models are refreshed
+WARMUP_KEEP_ALIVE = os.getenv('ROUTER_WARMUP_KEEP_ALIVE', '30m')
+WARMUP_REFRESH_INTERVAL = float(os.getenv('ROUTER_WARMUP_REFRESH_INTERVAL', '240'))
+# Routes inside this window count towards a model being hot; at most this many pairs are pinned
+WARMUP_HOT_WINDOW = float(os.getenv('ROUTER_WARMUP_HOT_WINDOW', '1800'))
+WARMUP_MAX_PINNED = int(os.getenv('ROUTER_WARMUP_MAX_PINNED', '8'))
+WARMUP_LOAD_TIMEOUT = 300
+# Every API worker process creates a warmer; only the one holding this lock file preloads and pins models
+WARMUP_LOCK_FILE = os.getenv('ROUTER_WARMUP_LOCK_FILE', os.path.join(tempfile.gettempdir(), 'zeroai-model-warmup.lock'))
+
+
+class ModelWarmer:
+    """
+    Keeps routed models resident on their peers.
+
+    At startup, and whenever discovery reports a new peer, the top models of every
+    MODEL_PREFERENCES list are preloaded on the peer the router would pick for them.
+    A background loop then re-sends keep_alive for the (peer, model) pairs that were
+    routed to most recently and refreshes which models each peer has loaded (/api/ps)
+    in the router's footprint registry, which the router uses to prefer warm peers.
+
+    Gunicorn starts one warmer per worker, so the loop first takes an exclusive lock on
+    WARMUP_LOCK_FILE; the other workers keep retrying it every refresh interval and take
+    over if the elected worker exits.
+    """
+
+    def __init__(self, router, model_preferences: Dict[str, List[str]], footprints,
+                 lock_path: str = WARMUP_LOCK_FILE):
+        self.router = router
+        self.model_preferences = model_preferences
+        self.footprints = footprints
+        self.lock = Lock()
+        self.routes: Dict[Tuple[str, str], Deque[float]] = defaultdict(deque)
+        self.known_peers: Set[str] = set()
+        self.pending: Set[Tuple[str, str]] = set()
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="model-warmup")
+        self.session = requests.Session()
+        self.stop_event = Event()
+        self.thread: Optional[Thread] = None
+        self.lock_path = lock_path
+        self.lock_file = None
+
+    # --- Residency -------------------------------------------------------
+
+    def is_resident(self, peer_name: str, model: str) -> bool:
+        return self.footprints.is_resident(peer_name, model)
+
+    def refresh_residency(self) -> None:
+        self.footprints.refresh_residency(self.router.peer_discovery.get_peers())
+
+    # --- Preloading ------------------------------------------------------
+
+    def _preload(self, peer, model: str) -> None:
+        key = (peer.name, model)
+        try:
+            # An empty prompt makes Ollama load the model and reset its keep_alive timer
+            response = self.session.post(
+                f"http://{peer.ip}:11434/api/generate",
+                json={"model": model, "prompt": "", "stream": False, "keep_alive": WARMUP_KEEP_ALIVE},
+                timeout=WARMUP_LOAD_TIMEOUT,
+            )
+            response.raise_for_status()
+            self.footprints.mark_resident(peer.name, model)
+        except requests.exceptions.RequestException as e:
+            console.print(f"⚠️ Warm-up of {model} on {peer.name} failed: {e}", style="yellow")
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+
+    def schedule_preload(self, peer, model: str) -> None:
+        key = (peer.name, model)
+        with self.lock:
+            if key in self.pending:
+                return
+            self.pending.add(key)
+        self.executor.submit(self._preload, peer, model)
+
+    def _warm_targets(self) -> List[str]:
+        targets: List[str] = []
+        for preferences in self.model_preferences.values():
+            for model in preferences[:WARMUP_TOP_MODELS]:
+                if model not in targets:
+                    targets.append(model)
+        return targets
+
+    def warm_up(self, only_peers: Optional[Set[str]] = None) -> None:
+        """Preload the top preferred models on the peers the router would choose for them"""
+        for model in self._warm_targets():
+            choice = self.router.choose_peer_and_model([model])
+            if choice is None:
+                continue
+            peer, chosen_model = choice
+            if only_peers is not None and peer.name not in only_peers:
+                continue
+            if not self.is_resident(peer.name, chosen_model):
+                console.print(f"🔥 Warming {chosen_model} on {peer.name}", style="dim")
+                self.schedule_preload(peer, chosen_model)
+
+    def on_peers_changed(self, peers: Dict[str, Any]) -> None:
+        """Discovery listener: warm models on peers that just became available"""
+        available = {name for name, peer in peers.items() if peer.capabilities.available}
+        with self.lock:
+            new_peers = available - self.known_peers
+            self.known_peers = available
+        if new_peers and self.is_elected():
+            self.executor.submit(self.warm_up, new_peers)
+
+    # --- Keep-alive pinning ----------------------------------------------
+
+    def record_route(self, peer_name: str, model: str) -> None:
+        with self.lock:
+            self.routes[(peer_name, model)].append(time.monotonic())
+
+    def hot_pairs(self) -> List[Tuple[str, str]]:
+        now = time.monotonic()
+        counts = []
+        with self.lock:
+            for key, timestamps in list(self.routes.items()):
+                while timestamps and now - timestamps[0] > WARMUP_HOT_WINDOW:
+                    timestamps.popleft()
+                if timestamps:
+                    counts.append((len(timestamps), key))
+                else:
+                    del self.routes[key]
+        counts.sort(reverse=True)
+        return [key for _, key in counts[:WARMUP_MAX_PINNED]]
+
+    def refresh_keep_alive(self) -> None:
+        peers = {p.name: p for p in self.router.peer_discovery.get_peers() if p.capabilities.available}
+        for peer_name, model in self.hot_pairs():
+            if peer_name in peers:
+                self.schedule_preload(peers[peer_name], model)
+
+    # --- Election --------------------------------------------------------
+
+    def is_elected(self) -> bool:
+        return self.lock_file is not None
+
+    def _try_elect(self) -> bool:
+        """Take the per-host warmer lock without blocking; True once this process holds it"""
+        if self.lock_file is not None:
+            return True
+        if not has_fcntl:
+            # No advisory locks on this platform; every worker warms models
+            self.lock_file = True
+            return True
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    def _release(self) -> None:
+        lock_file, self.lock_file = self.lock_file, None
+        if lock_file is not None and lock_file is not True:
+            # Closing the descriptor drops the flock so another worker can take over
+            lock_file.close()
+
+    def _loop(self) -> None:
+        warmed = False
+        while not self.stop_event.is_set():
+            try:
+                if not self.is_elected() and self._try_elect():
+                    console.print(f"🔥 Model warmer elected in process {os.getpid()}", style="dim")
+                if self.is_elected() and not warmed:
+                    self.refresh_residency()
+                    self.warm_up()
+                    warmed = True
+                elif self.is_elected():
+                    self.refresh_keep_alive()
+                    self.refresh_residency()
+            except Exception as e:
+                console.print(f"⚠️ Model warm-up loop error: {e}", style="yellow")
+            self.stop_event.wait(WARMUP_REFRESH_INTERVAL)
+        self._release()
+
+    def start(self) -> None:
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = Thread(target=self._loop, name="model-warmup", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
@@ -2,35 +2,81 @@
 
 import sys
 import os
+import logging
 from pathlib import Path
 import requests
 import json
 import time
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple
 from rich.console import Console
-from threading import Thread, Lock
-from dataclasses import dataclass
+from threading import Event, Thread, Lock
+from dataclasses import dataclass, replace
 import psutil
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+try:
+    from src.peer_discovery_async import AsyncPeerProber, has_aiohttp
+    from src.peer_state_store import PeerStateStore
+    from src.log_pipeline import get_logger, DEBUG_LEVELS, VERBOSE
+    from src.metrics import metrics
+except ImportError:
+    from peer_discovery_async import AsyncPeerProber, has_aiohttp
+    from peer_state_store import PeerStateStore
+    from log_pipeline import get_logger, DEBUG_LEVELS, VERBOSE
+    from metrics import metrics
+
 console = Console()
 PEERS_CONFIG_PATH = Path("config/peers.json")
 PEER_DISCOVERY_INTERVAL = 60
 PEER_PING_TIMEOUT = 5
 PEER_PING_RETRIES = 3
 CACHE_DURATION = 60  # 60 seconds cache
+# "swr" = get_peers() always returns the last snapshot and refreshes in the background, "blocking" = refresh inline
+PEER_CACHE_MODE = os.getenv('PEER_CACHE_MODE', 'swr').lower()
+# Discovery engine: "async" probes all peers concurrently over one keep-alive pool, "threaded" is the legacy path
+PEER_DISCOVERY_ENGINE = os.getenv('PEER_DISCOVERY_ENGINE', 'async').lower()
+PEER_DISCOVERY_CONCURRENCY = int(os.getenv('PEER_DISCOVERY_CONCURRENCY', '128'))
+# Peers that pushed a heartbeat within this window are not polled
+PEER_HEARTBEAT_TTL = float(os.getenv('PEER_HEARTBEAT_TTL', '15'))
+# Accept heartbeats from peers that are not in the peers config (they become routable)
+PEER_HEARTBEAT_ALLOW_UNKNOWN = os.getenv('PEER_HEARTBEAT_ALLOW_UNKNOWN', 'false').lower() == 'true'
+# Circuit breaker: consecutive failed cycles before a peer is skipped, and the probe backoff window
+PEER_BREAKER_THRESHOLD = int(os.getenv('PEER_BREAKER_THRESHOLD', '2'))
+PEER_BREAKER_BASE_BACKOFF = float(os.getenv('PEER_BREAKER_BASE_BACKOFF', '30'))
+PEER_BREAKER_MAX_BACKOFF = float(os.getenv('PEER_BREAKER_MAX_BACKOFF', '900'))
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+# Heartbeat payload field -> PeerCapabilities attribute
+HEARTBEAT_FIELDS = {
+    "available": "available",
+    "models": "models",
+    "load_avg": "load_avg",
+    "memory_gb": "memory",
+    "gpu_available": "gpu_available",
+    "gpu_memory_gb": "gpu_memory",
+    "cpu_cores": "cpu_cores",
+}
+
+DISCOVERY_CYCLE_SECONDS = metrics.histogram("zeroai_discovery_cycle_seconds", "Duration of a peer discovery cycle")
+DISCOVERY_PEERS = metrics.gauge("zeroai_discovery_peers", "Known peers after the last discovery cycle", ["state"])
+PEER_PROBE_FAILURES = metrics.counter("zeroai_peer_probe_failures", "Failed capability probes per peer", ["peer"])
+PEER_HEARTBEATS = metrics.counter("zeroai_peer_heartbeats", "Capability heartbeats received per peer", ["peer"])
 
 # Debug levels: 0=silent, 1=errors, 2=warnings, 3=info, 4=debug, 5=verbose
 DEBUG_LEVEL = int(os.getenv('PEER_DEBUG_LEVEL', '3'))
 ENABLE_PEER_LOGGING = os.getenv('ENABLE_PEER_LOGGING', 'true').lower() == 'true'
 
-def log_peer(message: str, level: int = 3, style: str = None):
-    """Log peer discovery messages based on debug level"""
+peer_logger = get_logger("peer", DEBUG_LEVELS.get(min(DEBUG_LEVEL, 5), logging.CRITICAL))
+
+def log_peer(message: str, level: int = 3, style: str = None, *args):
+    """Log peer discovery messages based on debug level; ``args`` are %-formatted only if the message is emitted"""
     if ENABLE_PEER_LOGGING and level <= DEBUG_LEVEL:
-        if style:
-            console.print(message, style=style)
-        else:
-            console.print(message)
+        log_level = DEBUG_LEVELS.get(level, VERBOSE)
+        if peer_logger.isEnabledFor(log_level):
+            peer_logger.log(log_level, message, *args, extra={"style": style})
 
 @dataclass
 class PeerCapabilities:
@@ -41,6 +87,45 @@ class PeerCapabilities:
     gpu_available: bool = False
     gpu_memory: float = 0.0
     cpu_cores: int = 0
+    circuit_state: str = CIRCUIT_CLOSED
+    consecutive_failures: int = 0
+    next_probe_at: float = 0.0
+
+@dataclass
+class PeerCircuitBreaker:
+    """
+    Tracks probe failures for one peer.
+
+    closed: probe normally. open: skip the peer until next_probe_at. half_open: allow a
+    single cheap probe; success closes the circuit, failure reopens it with a doubled backoff.
+    """
+    state: str = CIRCUIT_CLOSED
+    consecutive_failures: int = 0
+    open_count: int = 0
+    next_probe_at: float = 0.0
+
+    def allow_probe(self, now: float) -> bool:
+        if self.state == CIRCUIT_OPEN and now >= self.next_probe_at:
+            self.state = CIRCUIT_HALF_OPEN
+        return self.state != CIRCUIT_OPEN
+
+    def record_success(self) -> None:
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.next_probe_at = 0.0
+
+    def record_failure(self, now: float) -> None:
+        self.consecutive_failures += 1
+        if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= PEER_BREAKER_THRESHOLD:
+            backoff = min(PEER_BREAKER_MAX_BACKOFF, PEER_BREAKER_BASE_BACKOFF * (2 ** self.open_count))
+            self.open_count += 1
+            self.state = CIRCUIT_OPEN
+            self.next_probe_at = now + backoff
+
+    def apply_to(self, capabilities: PeerCapabilities) -> PeerCapabilities:
+        return replace(capabilities, circuit_state=self.state,
+                       consecutive_failures=self.consecutive_failures, next_probe_at=self.next_probe_at)
 
 @dataclass
 class PeerNode:
@@ -63,63 +148,76 @@ class PeerDiscovery:
             self.peers: Dict[str, PeerNode] = {}
             self.peers_lock = Lock()
             self.discovery_thread: Optional[Thread] = None
+            self.discovery_stop = Event()
+            # Held while a discovery cycle runs so concurrent callers never start a second one
+            self.refresh_lock = Lock()
             self.cache_timestamp = 0
             self.cached_peers: Dict[str, PeerNode] = {}
+            # Bumped every time a new peer snapshot is published, so consumers can rebuild derived state
+            self.snapshot_version = 0
+            self.snapshot_listeners: List[Callable[[Dict[str, PeerNode]], None]] = []
+            self.heartbeats: Dict[str, float] = {}
+            self.breakers: Dict[str, PeerCircuitBreaker] = {}
+            self.state_store = PeerStateStore(PEERS_CONFIG_PATH)
+            self.async_prober: Optional[AsyncPeerProber] = None
+            if PEER_DISCOVERY_ENGINE == "async":
+                if has_aiohttp:
+                    self.async_prober = AsyncPeerProber(PEER_PING_TIMEOUT, PEER_DISCOVERY_CONCURRENCY)
+                else:
+                    log_peer("⚠️ aiohttp not installed, falling back to threaded peer discovery.", 2, "yellow")
             PeerDiscovery._initialized = True
 
     def _load_peers_from_config(self) -> List[Dict[str, Any]]:
-        if not PEERS_CONFIG_PATH.exists():
+        if not self.state_store.exists():
             log_peer(f"Warning: Configuration file {PEERS_CONFIG_PATH} not found.", 2, "yellow")
             return []
 
         try:
-            with open(PEERS_CONFIG_PATH, 'r') as f:
-                data = json.load(f)
-                if not isinstance(data, dict) or "peers" not in data or not isinstance(data["peers"], list):
-                    log_peer(f"Error: {PEERS_CONFIG_PATH} is not in the correct format.", 1, "red")
-                    return []
-                return data.get('peers', [])
+            return self.state_store.load()
+        except ValueError as e:
+            log_peer(f"Error: {e}", 1, "red")
+            return []
         except Exception as e:
             log_peer(f"Error loading {PEERS_CONFIG_PATH}: {e}", 1, "red")
             return []
 
+    def _peer_to_record(self, peer: PeerNode) -> Dict[str, Any]:
+        return {
+            "name": peer.name,
+            "ip": peer.ip,
+            "port": 11434,
+            "available": peer.capabilities.available,
+            "models": peer.capabilities.models or [],
+            "load_avg": peer.capabilities.load_avg,
+            "memory_gb": peer.capabilities.memory,
+            "gpu_available": peer.capabilities.gpu_available,
+            "gpu_memory_gb": peer.capabilities.gpu_memory,
+            "cpu_cores": peer.capabilities.cpu_cores,
+            "last_updated": time.time()
+        }
+
     def _save_peers_to_config(self, peers: Dict[str, PeerNode]):
-        """Save peer details with full capabilities to config file"""
+        """Persist peer details, writing the config file only when a peer actually changed"""
         try:
-            PEERS_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-            peers_data = []
-            for peer in peers.values():
-                peer_dict = {
-                    "name": peer.name,
-                    "ip": peer.ip,
-                    "port": 11434,
-                    "available": peer.capabilities.available,
-                    "models": peer.capabilities.models or [],
-                    "load_avg": peer.capabilities.load_avg,
-                    "memory_gb": peer.capabilities.memory,
-                    "gpu_available": peer.capabilities.gpu_available,
-                    "gpu_memory_gb": peer.capabilities.gpu_memory,
-                    "cpu_cores": peer.capabilities.cpu_cores,
-                    "last_updated": time.time()
-                }
-                peers_data.append(peer_dict)
-            
-            with open(PEERS_CONFIG_PATH, 'w') as f:
-                json.dump({"peers": peers_data}, f, indent=2)
+            if self.state_store.update([self._peer_to_record(peer) for peer in peers.values()]):
+                log_peer("💾 Peer state changed, saved %s", 5, "dim", PEERS_CONFIG_PATH)
         except Exception as e:
             log_peer(f"Error saving peers config: {e}", 1, "red")
 
     def add_peer(self, ip: str, port: int, name: str) -> (bool, str):
         try:
             peers_data = self._load_peers_from_config()
-            if any(p['ip'] == ip for p in peers_data):
+            with self.peers_lock:
+                known_ips = {p.ip for p in self.peers.values()}
+            if ip in known_ips or any(p['ip'] == ip for p in peers_data):
                 return False, f"Peer with IP {ip} already exists."
 
             new_peer = {"name": name, "ip": ip, "port": port, "available": False, "models": [], "load_avg": 0.0, "memory_gb": 0.0, "gpu_available": False, "gpu_memory_gb": 0.0, "cpu_cores": 0, "last_updated": 0}
-            peers_data.append(new_peer)
+            self.state_store.add(new_peer)
 
-            with open(PEERS_CONFIG_PATH, 'w') as f:
-                json.dump({"peers": peers_data}, f, indent=2)
+            with self.peers_lock:
+                self.peers = {**self.peers, name: PeerNode(name, ip, PeerCapabilities(available=False))}
+                self.snapshot_version += 1
 
             self._invalidate_cache()
             return True, f"Successfully added peer {name} at {ip}:{port}."
@@ -204,10 +302,24 @@ class PeerDiscovery:
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
-            log_peer(f"⚠️ Failed to get metrics from peer at {ip}: {e}", 4, "yellow")
+            log_peer("⚠️ Failed to get metrics from peer at %s: %s", 4, "yellow", ip, e)
             return None
 
-    def _check_single_peer(self, peer_info: Dict[str, Any]) -> tuple[str, PeerCapabilities]:
+    def _capabilities_from_probe(self, ollama_models: Optional[List[str]],
+                                 metrics: Optional[Dict[str, Any]]) -> PeerCapabilities:
+        """Build peer capabilities from the Ollama model list and the peer service metrics"""
+        if not ollama_models:
+            return PeerCapabilities(available=False)
+        if metrics:
+            return PeerCapabilities(
+                available=True, models=ollama_models, load_avg=metrics.get('load_avg', 0.0),
+                memory=metrics.get('memory_gb', 0.0), gpu_available=metrics.get('gpu_available', False),
+                gpu_memory=metrics.get('gpu_memory_gb', 0.0), cpu_cores=metrics.get('cpu_cores', 0)
+            )
+        return PeerCapabilities(available=True, models=ollama_models)
+
+    def _check_single_peer(self, peer_info: Dict[str, Any],
+                           retries: int = PEER_PING_RETRIES) -> tuple[str, PeerCapabilities]:
         """Check a single peer's capabilities"""
         peer_name = peer_info['name']
         ollama_ip = peer_info['ip']
@@ -215,43 +327,35 @@ class PeerDiscovery:
         if peer_name == "local-node":
             return peer_name, self._get_my_capabilities()
             
-        for attempt in range(PEER_PING_RETRIES):
+        for attempt in range(retries):
             try:
                 ollama_models = self._get_ollama_models(ollama_ip)
                 if not ollama_models:
                     continue
                     
                 metrics = self._get_peer_metrics(ollama_ip)
-                if metrics:
-                    capabilities = PeerCapabilities(
-                        available=True, models=ollama_models, load_avg=metrics.get('load_avg', 0.0),
-                        memory=metrics.get('memory_gb', 0.0), gpu_available=metrics.get('gpu_available', False),
-                        gpu_memory=metrics.get('gpu_memory_gb', 0.0), cpu_cores=metrics.get('cpu_cores', 0)
-                    )
-                else:
-                    capabilities = PeerCapabilities(available=True, models=ollama_models)
-                    
-                return peer_name, capabilities
+                return peer_name, self._capabilities_from_probe(ollama_models, metrics)
             except Exception:
-                if attempt == PEER_PING_RETRIES - 1:
+                if attempt == retries - 1:
                     break
                     
         return peer_name, PeerCapabilities(available=False)
 
-    def _invalidate_cache(self):
-        """Force cache invalidation"""
-        self.cache_timestamp = 0
-
-    def _is_cache_valid(self) -> bool:
-        """Check if cache is still valid"""
-        return time.time() - self.cache_timestamp < CACHE_DURATION
-
-    def _discovery_cycle(self):
+    def _probe_peers_threaded(self, peers_to_check: List[Dict[str, Any]],
+                              half_open: Optional[set] = None) -> Dict[str, PeerNode]:
+        """Legacy engine: blocking requests on a small thread pool"""
+        half_open = half_open or set()
         new_peers: Dict[str, PeerNode] = {}
-        peers_to_check = self._load_all_peers()
-        
+        if not peers_to_check:
+            return new_peers
+
         with ThreadPoolExecutor(max_workers=min(len(peers_to_check), 5)) as executor:
-            future_to_peer = {executor.submit(self._check_single_peer, peer_info): peer_info for peer_info in peers_to_check}
+            # Half-open peers get one cheap attempt instead of the full retry loop
+            future_to_peer = {
+                executor.submit(self._check_single_peer, peer_info,
+                                1 if peer_info['name'] in half_open else PEER_PING_RETRIES): peer_info
+                for peer_info in peers_to_check
+            }
             
             for future in as_completed(future_to_peer):
                 peer_info = future_to_peer[future]
@@ -261,38 +365,252 @@ class PeerDiscovery:
                 except Exception as e:
                     log_peer(f"❌ {peer_info['name']}: {e}", 2, "red")
                     new_peers[peer_info['name']] = PeerNode(peer_info['name'], peer_info['ip'], PeerCapabilities(available=False))
+        return new_peers
+
+    def _probe_peers_async(self, peers_to_check: List[Dict[str, Any]],
+                           half_open: Optional[set] = None) -> Dict[str, PeerNode]:
+        """Probe all remote peers concurrently; the local node is measured in parallel on a helper thread"""
+        new_peers: Dict[str, PeerNode] = {}
+        remote_peers = {p['name']: p['ip'] for p in peers_to_check if p['name'] != "local-node"}
+        local_info = next((p for p in peers_to_check if p['name'] == "local-node"), None)
+
+        with ThreadPoolExecutor(max_workers=1) as local_executor:
+            local_future = local_executor.submit(self._get_my_capabilities) if local_info else None
+            try:
+                # Half-open peers get one trial attempt, like the threaded engine
+                results = self.async_prober.probe(remote_peers, PEER_PING_RETRIES, half_open or set())
+            except Exception as e:
+                log_peer(f"❌ Async peer probe failed: {e}", 1, "red")
+                results = {}
+
+            for name, ip in remote_peers.items():
+                ollama_models, metrics = results.get(name, (None, None))
+                new_peers[name] = PeerNode(name, ip, self._capabilities_from_probe(ollama_models, metrics))
+
+            if local_future is not None:
+                new_peers["local-node"] = PeerNode("local-node", local_info['ip'], local_future.result())
+        return new_peers
+
+    def add_snapshot_listener(self, listener: Callable[[Dict[str, PeerNode]], None]):
+        """Register a callback invoked with the peer map every time a new snapshot is published"""
+        if listener not in self.snapshot_listeners:
+            self.snapshot_listeners.append(listener)
+
+    def _notify_listeners(self, peers: Dict[str, PeerNode]):
+        for listener in list(self.snapshot_listeners):
+            try:
+                listener(peers)
+            except Exception as e:
+                log_peer(f"⚠️ Peer snapshot listener failed: {e}", 2, "yellow")
+
+    def _has_fresh_heartbeat(self, name: str, now: float) -> bool:
+        return now - self.heartbeats.get(name, 0) < PEER_HEARTBEAT_TTL
+
+    def resolve_heartbeat_peer(self, name: str, ip: Optional[str]) -> Optional[Tuple[str, str]]:
+        """
+        Map a heartbeat sender to the configured peer it belongs to, as (name, ip).
+
+        Peers announce themselves by hostname, which rarely matches the name in the peers
+        config, so a sender is matched by name first and then by IP. Returns None for a
+        sender that is not configured, unless PEER_HEARTBEAT_ALLOW_UNKNOWN is set.
+        """
+        def match(candidates: List[Tuple[str, str]]) -> Optional[Tuple[str, str]]:
+            by_name = [c for c in candidates if c[0] == name]
+            by_ip = [c for c in candidates if ip and c[1] == ip]
+            return (by_name or by_ip or [None])[0]
+
+        with self.peers_lock:
+            known = [(node.name, node.ip) for node in self.peers.values()]
+        # The config is only read for senders not in the current snapshot (first contact)
+        peer = match(known) or match([(p['name'], p['ip']) for p in self._load_all_peers()])
+        if peer is None and PEER_HEARTBEAT_ALLOW_UNKNOWN and ip:
+            return name, ip
+        return peer
+
+    def record_heartbeat(self, name: str, ip: str, delta: Dict[str, Any], full: bool = False) -> bool:
+        """
+        Apply a capability delta pushed by a peer service.
+
+        Returns False when the peer is unknown and the delta is partial, in which case
+        the peer should resend a full snapshot.
+        """
+        changes = {attr: delta[key] for key, attr in HEARTBEAT_FIELDS.items() if key in delta}
+        with self.peers_lock:
+            node = self.peers.get(name)
+            if node is None and not full:
+                return False
+            if node is None or full:
+                capabilities = PeerCapabilities(available=True, models=[])
+            else:
+                capabilities = node.capabilities
+            if not changes.get("models", capabilities.models):
+                changes["available"] = False
+            else:
+                changes.setdefault("available", True)
+            breaker = self.breakers.setdefault(name, PeerCircuitBreaker())
+            breaker.record_success()
+            updated = PeerNode(name, ip or (node.ip if node else name),
+                               breaker.apply_to(replace(capabilities, **changes)))
+            self.heartbeats[name] = time.time()
+            # A keep-alive (or a delta repeating known values) only refreshes the heartbeat time
+            changed = node is None or updated.ip != node.ip or updated.capabilities != node.capabilities
+            if changed:
+                self.peers = {**self.peers, name: updated}
+                self.cached_peers = self.peers.copy()
+                self.snapshot_version += 1
+            snapshot = self.peers
+        PEER_HEARTBEATS.inc(peer=name)
+        log_peer("💓 Heartbeat from %s: %s", 5, "dim", name, sorted(delta) or 'keep-alive')
+        if changed:
+            self._notify_listeners(snapshot)
+        return True
+
+    def _invalidate_cache(self):
+        """Force cache invalidation"""
+        self.cache_timestamp = 0
+
+    def _is_cache_valid(self) -> bool:
+        """Check if cache is still valid"""
+        return time.time() - self.cache_timestamp < CACHE_DURATION
+
+    def _discovery_cycle(self):
+        cycle_start = time.time()
+        peers_to_check = self._load_all_peers()
+
+        # Peers pushing heartbeats are already fresh; only poll the silent ones
+        with self.peers_lock:
+            peers_to_check = [p for p in peers_to_check if not self._has_fresh_heartbeat(p['name'], cycle_start)]
+
+        # Known-dead peers are skipped until their breaker allows the next probe. Breakers are
+        # shared with record_heartbeat, so they are only read and updated under peers_lock.
+        skipped: Dict[str, PeerNode] = {}
+        half_open = set()
+        with self.peers_lock:
+            for peer_info in [p for p in peers_to_check if p['name'] != "local-node"]:
+                breaker = self.breakers.setdefault(peer_info['name'], PeerCircuitBreaker())
+                if not breaker.allow_probe(cycle_start):
+                    skipped[peer_info['name']] = PeerNode(peer_info['name'], peer_info['ip'],
+                                                          breaker.apply_to(PeerCapabilities(available=False)))
+                elif breaker.state == CIRCUIT_HALF_OPEN:
+                    half_open.add(peer_info['name'])
+        peers_to_check = [p for p in peers_to_check if p['name'] not in skipped]
+
+        if self.async_prober is not None:
+            new_peers = self._probe_peers_async(peers_to_check, half_open)
+        else:
+            new_peers = self._probe_peers_threaded(peers_to_check, half_open)
+
+        now = time.time()
+        opened: Dict[str, float] = {}
+        with self.peers_lock:
+            for name, node in new_peers.items():
+                if name == "local-node":
+                    continue
+                breaker = self.breakers.setdefault(name, PeerCircuitBreaker())
+                if node.capabilities.available:
+                    breaker.record_success()
+                else:
+                    PEER_PROBE_FAILURES.inc(peer=name)
+                    breaker.record_failure(now)
+                    if breaker.state == CIRCUIT_OPEN:
+                        opened[name] = breaker.next_probe_at - now
+                node.capabilities = breaker.apply_to(node.capabilities)
+        for name, backoff in opened.items():
+            log_peer("⛔ %s unreachable, next probe in %.0fs", 4, "yellow", name, backoff)
+        new_peers.update(skipped)
         
         with self.peers_lock:
+            for name, node in self.peers.items():
+                if self._has_fresh_heartbeat(name, cycle_start):
+                    new_peers[name] = node
             self.peers = new_peers
             self.cached_peers = new_peers.copy()
             self.cache_timestamp = time.time()
+            self.snapshot_version += 1
         
         self._save_peers_to_config(new_peers)
+        self._notify_listeners(new_peers)
         available_count = len([p for p in new_peers.values() if p.capabilities.available])
-        log_peer(f"🔍 Discovery complete: {available_count}/{len(new_peers)} peers available", 4, "cyan")
+        DISCOVERY_CYCLE_SECONDS.observe(time.time() - cycle_start)
+        DISCOVERY_PEERS.set(available_count, state="available")
+        DISCOVERY_PEERS.set(len(new_peers) - available_count - len(skipped), state="unavailable")
+        DISCOVERY_PEERS.set(len(skipped), state="circuit_open")
+        log_peer("🔍 Discovery complete: %d/%d peers available", 4, "cyan", available_count, len(new_peers))
 
-    def _discovery_loop(self):
-        while True:
+    def _background_refresh(self):
+        try:
             self._discovery_cycle()
-            time.sleep(PEER_DISCOVERY_INTERVAL)
+        except Exception as e:
+            log_peer(f"❌ Background peer discovery failed: {e}", 1, "red")
+        finally:
+            self.refresh_lock.release()
+
+    def refresh(self, wait: bool = False) -> bool:
+        """
+        Run a discovery cycle unless one is already in flight.
+
+        Args:
+            wait: Block until fresh data is available (joining the in-flight cycle if any)
+                  instead of refreshing in the background.
+
+        Returns:
+            True if this call started a new cycle, False if it coalesced into a running one.
+        """
+        if not self.refresh_lock.acquire(blocking=False):
+            if wait:
+                with self.refresh_lock:
+                    pass
+            return False
+
+        if wait:
+            try:
+                self._discovery_cycle()
+            finally:
+                self.refresh_lock.release()
+        else:
+            Thread(target=self._background_refresh, name="peer-refresh", daemon=True).start()
+        return True
+
+    def _discovery_loop(self):
+        while not self.discovery_stop.is_set():
+            self.refresh(wait=True)
+            self.discovery_stop.wait(PEER_DISCOVERY_INTERVAL)
 
     def start_discovery_service(self):
         if self.discovery_thread is None or not self.discovery_thread.is_alive():
+            self.discovery_stop.clear()
             self.discovery_thread = Thread(target=self._discovery_loop, daemon=True)
             self.discovery_thread.start()
 
+    def stop_discovery_service(self, timeout: float = 5.0):
+        """Stop the discovery loop after its current cycle and close the async probe pool"""
+        self.discovery_stop.set()
+        if self.discovery_thread is not None:
+            self.discovery_thread.join(timeout)
+        if self.async_prober is not None:
+            self.async_prober.close()
+
     def get_peers(self, force_refresh: bool = False) -> List[PeerNode]:
-        """Get peers - use cache first, refresh if needed"""
+        """Get peers - serve the last snapshot, refreshing it in the background once it is stale"""
         with self.peers_lock:
-            # Return cached results immediately if available
-            if not force_refresh and self.peers and self._is_cache_valid():
+            snapshot = list(self.peers.values())
+            cache_valid = self._is_cache_valid()
+
+        # Nothing to serve yet (cold start) or caller explicitly wants fresh data
+        if force_refresh or not snapshot:
+            self.refresh(wait=True)
+            with self.peers_lock:
                 return list(self.peers.values())
-        
-        # Cache miss or expired - run discovery
-        self._discovery_cycle()
-        
-        with self.peers_lock:
-            return list(self.peers.values())
+
+        if not cache_valid:
+            if PEER_CACHE_MODE == "swr":
+                self.refresh(wait=False)
+            else:
+                self.refresh(wait=True)
+                with self.peers_lock:
+                    return list(self.peers.values())
+
+        return snapshot
     
     def get_available_peers(self) -> List[PeerNode]:
         """Get only available peers"""
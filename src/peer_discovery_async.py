@@ -0,0 +1,131 @@
+# src/peer_discovery_async.py
+
+import asyncio
+import os
+import threading
+from typing import AbstractSet, Dict, List, Optional, Tuple, Any
+
+try:
+    import aiohttp
+    has_aiohttp = True
+except ImportError:
+    aiohttp = None
+    has_aiohttp = False
+
+# Keep-alive connections are kept open between discovery cycles for this long
+PEER_KEEPALIVE_TIMEOUT = float(os.getenv('PEER_KEEPALIVE_TIMEOUT', '120'))
+
+ProbeResult = Tuple[Optional[List[str]], Optional[Dict[str, Any]]]
+
+
+class AsyncPeerProber:
+    """
+    Probes peers concurrently with asyncio over one shared keep-alive connection pool.
+
+    The event loop and the aiohttp session live on a dedicated daemon thread, so the
+    pool survives between discovery cycles and callers stay fully synchronous.
+    """
+
+    def __init__(self, timeout: float, concurrency: int):
+        if not has_aiohttp:
+            raise ImportError("aiohttp is required for the async peer discovery engine")
+        self.timeout = timeout
+        self.concurrency = max(1, concurrency)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._session = None
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="peer-probe-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrency * 2,
+                limit_per_host=2,
+                keepalive_timeout=PEER_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _fetch_json(self, session, url: str) -> Dict[str, Any]:
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def _probe_peer(self, session, ip: str) -> ProbeResult:
+        """Fetch /api/tags and /capabilities for one peer at the same time."""
+        tags, metrics = await asyncio.gather(
+            self._fetch_json(session, f"http://{ip}:11434/api/tags"),
+            self._fetch_json(session, f"http://{ip}:8080/capabilities"),
+            return_exceptions=True,
+        )
+        models = None
+        if isinstance(tags, dict):
+            models = [m['name'] for m in tags.get('models', []) if 'name' in m]
+        if not isinstance(metrics, dict):
+            metrics = None
+        return models, metrics
+
+    async def _probe_all(self, targets: Dict[str, str], retries: int,
+                         trial: AbstractSet[str]) -> Dict[str, ProbeResult]:
+        session = await self._get_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded_probe(name: str, ip: str) -> Tuple[str, ProbeResult]:
+            result: ProbeResult = (None, None)
+            async with semaphore:
+                for _ in range(1 if name in trial else retries):
+                    try:
+                        result = await asyncio.wait_for(self._probe_peer(session, ip), timeout=self.timeout)
+                    except (asyncio.TimeoutError, aiohttp.ClientError, OSError, ValueError):
+                        continue
+                    if result[0]:
+                        break
+            return name, result
+
+        results = await asyncio.gather(*(bounded_probe(name, ip) for name, ip in targets.items()))
+        return dict(results)
+
+    def probe(self, targets: Dict[str, str], retries: int = 1,
+              trial: AbstractSet[str] = frozenset()) -> Dict[str, ProbeResult]:
+        """
+        Probe every peer in ``targets`` (name -> ip) and block until all have answered
+        or hit their deadline.
+
+        A peer whose Ollama endpoint does not answer is tried up to ``retries`` times,
+        except peers in ``trial`` (half-open circuits), which get exactly one attempt.
+
+        Returns:
+            Mapping of peer name to ``(models, metrics)``; ``models`` is None when the
+            Ollama endpoint could not be reached and ``metrics`` is None when the peer
+            service did not answer.
+        """
+        if not targets:
+            return {}
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._probe_all(targets, max(1, retries), trial), loop)
+        # Waves of `concurrency` peers each take at most one timeout per attempt
+        waves = -(-len(targets) // self.concurrency)
+        return future.result(timeout=self.timeout * max(1, retries) * waves + 5)
+
+    def close(self) -> None:
+        """Close the connection pool and stop the event loop thread."""
+        with self._lock:
+            loop, session = self._loop, self._session
+            self._loop, self._session = None, None
+        if loop is None:
+            return
+        if session is not None and not session.closed:
+            asyncio.run_coroutine_threadsafe(session.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
@@ -14,6 +14,11 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 from enum import Enum
 
+try:
+    from src.peer_discovery import PeerCircuitBreaker, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN
+except ImportError:
+    from peer_discovery import PeerCircuitBreaker, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN
+
 console = Console()
 
 class ErrorType(Enum):
@@ -58,6 +63,9 @@ class PeerCapabilities:
     gpu_memory: float = 0.0
     cpu_cores: int = 0
     last_error: Optional[PeerError] = None
+    circuit_state: str = CIRCUIT_CLOSED
+    consecutive_failures: int = 0
+    next_probe_at: float = 0.0
 
 @dataclass
 class PeerNode:
@@ -72,6 +80,7 @@ class EnhancedPeerDiscovery:
         self.error_handler = ErrorHandler()
         self.cache_timestamp = 0
         self.cached_peers: Dict[str, PeerNode] = {}
+        self.breakers: Dict[str, PeerCircuitBreaker] = {}
         
     def _safe_load_config(self, config_path: Path) -> List[Dict[str, Any]]:
         """Safely load configuration with error handling"""
@@ -131,6 +140,15 @@ class EnhancedPeerDiscovery:
         """Check peer with automatic error recovery"""
         peer_name = peer_info['name']
         peer_ip = peer_info['ip']
+
+        # Known-dead peers are not probed until their backoff window expires
+        breaker = self.breakers.setdefault(peer_name, PeerCircuitBreaker())
+        if not breaker.allow_probe(time.time()):
+            skipped_capabilities = breaker.apply_to(PeerCapabilities(available=False))
+            skipped_capabilities.last_error = PeerError(ErrorType.NETWORK_ERROR, "Circuit open, probe skipped", peer_name)
+            return peer_name, skipped_capabilities
+        # A half-open peer gets a single cheap probe without retries or sleeps
+        attempts = 1 if breaker.state == CIRCUIT_HALF_OPEN else 3
         
         # Try multiple endpoints for resilience
         endpoints = [
@@ -138,7 +156,7 @@ class EnhancedPeerDiscovery:
             f"http://{peer_ip}:8080/capabilities"
         ]
         
-        for attempt in range(3):  # 3 retry attempts
+        for attempt in range(attempts):
             for endpoint in endpoints:
                 response = self._safe_network_request(endpoint, peer_name=peer_name)
                 if response:
@@ -155,7 +173,8 @@ class EnhancedPeerDiscovery:
                             gpu_memory=data.get('gpu_memory_gb', 0.0),
                             cpu_cores=data.get('cpu_cores', 0)
                         )
-                        return peer_name, capabilities
+                        breaker.record_success()
+                        return peer_name, breaker.apply_to(capabilities)
                         
                     except (json.JSONDecodeError, KeyError) as e:
                         error = PeerError(ErrorType.VALIDATION_ERROR, f"Invalid response format: {e}", peer_name)
@@ -163,11 +182,12 @@ class EnhancedPeerDiscovery:
                         continue
             
             # Wait before retry
-            if attempt < 2:
+            if attempt < attempts - 1:
                 time.sleep(1 * (attempt + 1))  # Exponential backoff
         
         # All attempts failed
-        failed_capabilities = PeerCapabilities(available=False)
+        breaker.record_failure(time.time())
+        failed_capabilities = breaker.apply_to(PeerCapabilities(available=False))
         failed_capabilities.last_error = PeerError(ErrorType.NETWORK_ERROR, "All connection attempts failed", peer_name)
         return peer_name, failed_capabilities
     
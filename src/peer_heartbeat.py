@@ -0,0 +1,137 @@
+# src/peer_heartbeat.py
+
+import os
+import socket
+import time
+from threading import Thread, Event
+from typing import Dict, Any, Optional, Callable
+
+import requests
+from rich.console import Console
+
+console = Console()
+
+# Coordinator that receives heartbeats (the API service running PeerDiscovery), e.g. http://zeroai-api:3939
+COORDINATOR_URL = os.getenv('ZEROAI_COORDINATOR_URL', '')
+# How often the peer samples its capabilities, and the longest it stays silent when nothing changed
+PEER_HEARTBEAT_INTERVAL = float(os.getenv('PEER_HEARTBEAT_INTERVAL', '2'))
+PEER_HEARTBEAT_KEEPALIVE = float(os.getenv('PEER_HEARTBEAT_KEEPALIVE', '10'))
+PEER_HEARTBEAT_TIMEOUT = 3
+# Shared secret sent with every heartbeat; the coordinator refuses all heartbeats while it is unset
+PEER_HEARTBEAT_TOKEN = os.getenv('PEER_HEARTBEAT_TOKEN', '')
+PEER_TOKEN_HEADER = "X-ZeroAI-Peer-Token"
+
+# Minimum change before a numeric field is considered worth pushing
+HEARTBEAT_THRESHOLDS = {
+    "load_avg": 5.0,
+    "memory_gb": 0.25,
+    "gpu_memory_gb": 0.25,
+}
+
+
+def capabilities_to_metrics(capabilities) -> Dict[str, Any]:
+    """Serialize PeerCapabilities to the same payload shape served at /capabilities"""
+    return {
+        'available': capabilities.available,
+        'models': capabilities.models or [],
+        'load_avg': capabilities.load_avg,
+        'memory_gb': capabilities.memory,
+        'gpu_available': capabilities.gpu_available,
+        'gpu_memory_gb': capabilities.gpu_memory,
+        'cpu_cores': capabilities.cpu_cores,
+    }
+
+
+def compute_capability_delta(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Return only the fields of ``current`` that changed meaningfully since ``previous``"""
+    if previous is None:
+        return dict(current)
+
+    delta = {}
+    for key, value in current.items():
+        old_value = previous.get(key)
+        threshold = HEARTBEAT_THRESHOLDS.get(key)
+        if threshold is not None and isinstance(value, (int, float)) and isinstance(old_value, (int, float)):
+            if abs(value - old_value) >= threshold:
+                delta[key] = value
+        elif value != old_value:
+            delta[key] = value
+    return delta
+
+
+class HeartbeatSender:
+    """
+    Pushes compact capability deltas from a peer to the coordinator.
+
+    A delta is sent as soon as a sampled field changes meaningfully, and an empty
+    keep-alive is sent at least every PEER_HEARTBEAT_KEEPALIVE seconds so the
+    coordinator knows the peer is alive and does not need to poll it.
+    """
+
+    def __init__(self, get_capabilities: Callable[[], Any], coordinator_url: str = COORDINATOR_URL,
+                 peer_name: Optional[str] = None, peer_ip: Optional[str] = None):
+        self.get_capabilities = get_capabilities
+        self.coordinator_url = coordinator_url.rstrip('/')
+        self.peer_name = peer_name or os.getenv('PEER_NAME', socket.gethostname())
+        self.peer_ip = peer_ip or os.getenv('PEER_ADVERTISE_IP')
+        self.session = requests.Session()
+        self.session.headers[PEER_TOKEN_HEADER] = PEER_HEARTBEAT_TOKEN
+        self.last_sent: Optional[Dict[str, Any]] = None
+        self.last_sent_at = 0.0
+        self.stop_event = Event()
+        self.thread: Optional[Thread] = None
+
+    def _post(self, delta: Dict[str, Any], full: bool) -> bool:
+        payload = {"name": self.peer_name, "ip": self.peer_ip, "full": full, "capabilities": delta}
+        response = self.session.post(f"{self.coordinator_url}/peers/heartbeat", json=payload,
+                                     timeout=PEER_HEARTBEAT_TIMEOUT)
+        response.raise_for_status()
+        # The coordinator asks for a full snapshot when it does not know this peer (e.g. after a restart)
+        return not response.json().get("resync", False)
+
+    def beat(self) -> None:
+        """Sample capabilities once and push a delta if needed"""
+        current = capabilities_to_metrics(self.get_capabilities())
+        full = self.last_sent is None
+        delta = compute_capability_delta(self.last_sent, current)
+        if not delta and time.time() - self.last_sent_at < PEER_HEARTBEAT_KEEPALIVE:
+            return
+
+        try:
+            accepted = self._post(delta, full)
+        except requests.exceptions.RequestException as e:
+            console.print(f"⚠️ Heartbeat to {self.coordinator_url} failed: {e}", style="yellow")
+            self.last_sent = None
+            return
+
+        if accepted:
+            merged = dict(self.last_sent or {})
+            merged.update(delta)
+            self.last_sent = merged
+            self.last_sent_at = time.time()
+        else:
+            self.last_sent = None
+
+    def _loop(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                self.beat()
+            except Exception as e:
+                console.print(f"⚠️ Heartbeat error: {e}", style="yellow")
+            self.stop_event.wait(PEER_HEARTBEAT_INTERVAL)
+
+    def start(self) -> None:
+        if not self.coordinator_url:
+            console.print("ℹ️ ZEROAI_COORDINATOR_URL not set, heartbeat mode disabled", style="dim")
+            return
+        if not PEER_HEARTBEAT_TOKEN:
+            console.print("⚠️ PEER_HEARTBEAT_TOKEN not set, heartbeat mode disabled (the coordinator "
+                          "refuses heartbeats without it)", style="yellow")
+            return
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = Thread(target=self._loop, name="peer-heartbeat", daemon=True)
+            self.thread.start()
+
+    def stop(self) -> None:
+        self.stop_event.set()
@@ -0,0 +1,47 @@
+# src/peer_service_metrics.py
+
+import time
+from functools import wraps
+from typing import Any, Callable
+
+from flask import Flask, Response, request
+
+from metrics import metrics, CONTENT_TYPE_LATEST
+
+NODE_RESOURCES = metrics.gauge("zeroai_peer_node", "Capabilities this node advertises", ["resource"])
+TASK_SECONDS = metrics.histogram("zeroai_peer_task_seconds", "Duration of /process_task requests", ["type", "outcome"])
+
+
+def update_node_resources(capabilities) -> None:
+    """Publish a PeerCapabilities snapshot on the zeroai_peer_node gauge"""
+    NODE_RESOURCES.replace({
+        ("memory_gb",): capabilities.memory,
+        ("gpu_memory_gb",): capabilities.gpu_memory,
+        ("cpu_cores",): capabilities.cpu_cores,
+        ("load_avg",): capabilities.load_avg,
+        ("models",): len(capabilities.models or []),
+        ("available",): 1 if capabilities.available else 0,
+    })
+
+
+def timed_task(handler: Callable[[], Response]) -> Callable[[], Response]:
+    """Record a /process_task handler's duration by task type and success flag"""
+    @wraps(handler)
+    def wrapper():
+        started = time.perf_counter()
+        response = handler()
+        task_type = (request.get_json(silent=True) or {}).get('type') or 'unknown'
+        outcome = "success" if (response.get_json(silent=True) or {}).get('success') else "error"
+        TASK_SECONDS.observe(time.perf_counter() - started, type=task_type, outcome=outcome)
+        return response
+    return wrapper
+
+
+def register_metrics_endpoint(app: Flask, get_capabilities: Callable[[], Any]) -> None:
+    """Serve Prometheus metrics (node capabilities and task timings) at /metrics"""
+    def get_metrics():
+        """Prometheus metrics: node capabilities and task timings"""
+        update_node_resources(get_capabilities())
+        return Response(metrics.render(), content_type=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule('/metrics', 'get_metrics', get_metrics)
@@ -0,0 +1,131 @@
+# src/peer_state_store.py
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Any, Optional, Tuple
+
+# Fields that never count as a change on their own
+VOLATILE_FIELDS = {"last_updated"}
+# Numeric fields are compared in buckets so normal load/memory jitter does not trigger a write
+FIELD_BUCKETS = {
+    "load_avg": 10.0,
+    "memory_gb": 1.0,
+    "gpu_memory_gb": 1.0,
+}
+
+
+def record_fingerprint(record: Dict[str, Any]) -> Tuple:
+    """Reduce a peer record to the parts that are worth persisting"""
+    items = []
+    for key, value in sorted(record.items()):
+        if key in VOLATILE_FIELDS:
+            continue
+        bucket = FIELD_BUCKETS.get(key)
+        if bucket and isinstance(value, (int, float)):
+            value = round(value / bucket)
+        elif isinstance(value, list):
+            value = tuple(sorted(str(v) for v in value))
+        items.append((key, value))
+    return tuple(items)
+
+
+class PeerStateStore:
+    """
+    Delta-aware persistence for the peers config file.
+
+    The discovery service keeps the live peer map in memory; this store only remembers
+    what was last written and rewrites the file (atomically, via write-and-rename) when
+    a peer was added, removed or its capabilities changed meaningfully.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock = Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._loaded_mtime: Optional[float] = None
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _read_file(self) -> None:
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or not isinstance(data.get("peers"), list):
+            raise ValueError(f"{self.path} is not in the correct format.")
+        self._set_records(data["peers"])
+
+    def _set_records(self, records: List[Dict[str, Any]]) -> None:
+        self._records = {r["name"]: dict(r) for r in records if "name" in r}
+        self._fingerprints = {name: record_fingerprint(r) for name, r in self._records.items()}
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Return the persisted peer records, re-reading the file only if it was edited externally"""
+        with self.lock:
+            mtime = self._file_mtime()
+            if mtime is None:
+                self._set_records([])
+                self._loaded_mtime = None
+            elif mtime != self._loaded_mtime:
+                self._read_file()
+                self._loaded_mtime = mtime
+            return [dict(r) for r in self._records.values()]
+
+    def _write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"peers": list(self._records.values())}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._loaded_mtime = self._file_mtime()
+
+    def update(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Replace the persisted peer set with ``records``.
+
+        Returns:
+            True if the file was rewritten, False if nothing meaningful changed.
+        """
+        with self.lock:
+            incoming = {r["name"]: r for r in records}
+            changed = set(incoming) != set(self._records)
+            merged = {}
+            now = time.time()
+            for name, record in incoming.items():
+                fingerprint = record_fingerprint(record)
+                if self._fingerprints.get(name) == fingerprint:
+                    # Unchanged: keep the previously persisted record and its timestamp
+                    merged[name] = self._records[name]
+                else:
+                    changed = True
+                    merged[name] = {**record, "last_updated": now}
+            if not changed:
+                return False
+            self._records = merged
+            self._fingerprints = {name: record_fingerprint(r) for name, r in merged.items()}
+            self._write()
+            return True
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Persist a single new peer record"""
+        with self.lock:
+            self._records[record["name"]] = dict(record)
+            self._fingerprints[record["name"]] = record_fingerprint(record)
+            self._write()
@@ -0,0 +1,168 @@
+# src/prompt_classifier.py
+
+import hashlib
+import math
+import os
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
+
+KEYWORDS_TO_CATEGORY = {
+    "coding": "developer",
+    "php": "developer",
+    "python": "developer",
+    "javascript": "developer",
+    "html": "developer",
+    "css": "developer",
+    "sql": "developer",
+    "fix": "developer",
+    "bug": "developer",
+    "issue": "developer",
+    "research": "research",
+    "analyze": "research",
+    "documentation": "documentation",
+    "write": "documentation",
+    "orchestrator": "devops_orchestrator",
+    "maintenance": "general",
+    "health": "general",
+    "project health": "general",
+    "dependencies": "general",
+    "test suites": "general",
+    "support": "tech_support",
+    "customer": "customer_service",
+    "greeting": "customer_service"
+}
+
+# Generic verbs count for less than specific terms; unlisted keywords weigh 1.0
+KEYWORD_WEIGHTS = {
+    "fix": 0.75,
+    "issue": 0.5,
+    "write": 0.5,
+    "health": 0.75,
+    "project health": 2.0,
+    "test suites": 1.5,
+}
+
+# Matches in the head of the prompt (the instruction) count double, matches further down (usually
+# attached file contents) only a quarter, and nothing past PROMPT_SCAN_CHARS is scanned at all
+PROMPT_HEAD_CHARS = 400
+PROMPT_SCAN_CHARS = 8192
+HEAD_MATCH_WEIGHT = 2.0
+BODY_MATCH_WEIGHT = 0.25
+# Prompts are memoized; long prompts are keyed by digest so the cache does not hold their text
+PROMPT_CLASSIFIER_CACHE_SIZE = int(os.getenv('PROMPT_CLASSIFIER_CACHE_SIZE', '1024'))
+DIGEST_KEY_MIN_LENGTH = 256
+
+# Every keyword also matches its plural (bug -> bugs, fix -> fixes). Other forms must be listed
+# explicitly: a generic suffix list turned "issued" into "issue" and "writer" into "write"
+PLURAL_SUFFIX = r"(?:s|es)?"
+KEYWORD_INFLECTIONS = {
+    "fix": ["fixed", "fixing"],
+    "analyze": ["analyzed", "analyzing"],
+    "research": ["researched", "researching"],
+    "write": ["writing", "written", "wrote"],
+}
+
+
+def _phrase_pattern(phrase: str) -> str:
+    return r"\s+".join(re.escape(part) for part in phrase.lower().split())
+
+
+class PromptClassifier:
+    """
+    Keyword category classifier backed by one precompiled word-boundary regex.
+
+    Every keyword (its plural and listed inflections) is matched as a whole word, so
+    "fixture" does not hit "fix" nor "issued" hit "issue". Each category is scored by the
+    weights of its matched keywords, with repeated occurrences saturating logarithmically
+    and matches in the instruction at the start of the prompt outweighing those in attached
+    content further down; the best-scoring category wins, ties going to the earliest match.
+    """
+
+    def __init__(self, keywords: Dict[str, str] = None, weights: Dict[str, float] = None,
+                 cache_size: int = PROMPT_CLASSIFIER_CACHE_SIZE, inflections: Dict[str, List[str]] = None):
+        self.keywords = dict(keywords if keywords is not None else KEYWORDS_TO_CATEGORY)
+        self.weights = dict(weights if weights is not None else KEYWORD_WEIGHTS)
+        self.inflections = dict(inflections if inflections is not None else KEYWORD_INFLECTIONS)
+        self.group_keywords: Dict[str, str] = {}
+        alternatives = []
+        first_chars = set()
+        # Longest first so "project health" is preferred over "health" at the same position
+        for i, keyword in enumerate(sorted(self.keywords, key=len, reverse=True)):
+            group = f"k{i}"
+            self.group_keywords[group] = keyword
+            forms = sorted(self.inflections.get(keyword, []), key=len, reverse=True)
+            patterns = [_phrase_pattern(form) for form in forms] + [_phrase_pattern(keyword) + PLURAL_SUFFIX]
+            alternatives.append(f"(?P<{group}>{'|'.join(patterns)})")
+            first_chars.update(form[0].lower() for form in forms + [keyword])
+        # The first-character lookahead lets the engine reject most positions before trying the alternation
+        first_chars = re.escape("".join(sorted(first_chars)))
+        self.pattern = re.compile(rf"\b(?=[{first_chars}])(?:" + "|".join(alternatives) + r")\b") \
+            if alternatives else None
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[Union[str, bytes], Optional[str]]" = OrderedDict()
+        self.lock = Lock()
+
+    def scores(self, prompt: str) -> Dict[str, float]:
+        """Weighted score per category for ``prompt``"""
+        return self._score(prompt)[0]
+
+    def _score(self, prompt: str) -> Tuple[Dict[str, float], Dict[str, int]]:
+        head_counts: Dict[str, int] = {}
+        body_counts: Dict[str, int] = {}
+        first_seen: Dict[str, int] = {}
+        if self.pattern is not None:
+            for match in self.pattern.finditer(prompt[:PROMPT_SCAN_CHARS].lower()):
+                keyword = self.group_keywords[match.lastgroup]
+                counts = head_counts if match.start() < PROMPT_HEAD_CHARS else body_counts
+                counts[keyword] = counts.get(keyword, 0) + 1
+                first_seen.setdefault(keyword, match.start())
+
+        scores: Dict[str, float] = {}
+        first_position: Dict[str, int] = {}
+        for keyword in first_seen:
+            category = self.keywords[keyword]
+            weight = self.weights.get(keyword, 1.0)
+            score = 0.0
+            # Repeated occurrences saturate logarithmically
+            if keyword in head_counts:
+                score += HEAD_MATCH_WEIGHT * weight * (1 + math.log(head_counts[keyword]))
+            if keyword in body_counts:
+                score += BODY_MATCH_WEIGHT * weight * (1 + math.log(body_counts[keyword]))
+            scores[category] = scores.get(category, 0.0) + score
+            first_position[category] = min(first_position.get(category, first_seen[keyword]), first_seen[keyword])
+        return scores, first_position
+
+    def _classify(self, prompt: str) -> Optional[str]:
+        scores, first_position = self._score(prompt)
+        if not scores:
+            return None
+        return max(scores, key=lambda category: (scores[category], -first_position[category]))
+
+    def classify(self, prompt: str, default: Optional[str] = None) -> Optional[str]:
+        """Return the best matching category, or ``default`` when no keyword matches"""
+        if not prompt:
+            return default
+        key = hashlib.blake2b(prompt.encode("utf-8", "replace"), digest_size=16).digest() \
+            if len(prompt) >= DIGEST_KEY_MIN_LENGTH else prompt
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                category = self.cache[key]
+                return category if category is not None else default
+
+        category = self._classify(prompt)
+        with self.lock:
+            self.cache[key] = category
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return category if category is not None else default
+
+
+prompt_classifier = PromptClassifier()
+
+
+def classify_prompt(prompt: str, default: Optional[str] = "default") -> Optional[str]:
+    """Category of ``prompt`` using the shared keyword classifier"""
+    return prompt_classifier.classify(prompt, default)
@@ -0,0 +1,143 @@
+# src/request_logging.py
+
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    from src.log_pipeline import JsonLineFormatter, get_logger
+except ImportError:
+    from log_pipeline import JsonLineFormatter, get_logger
+
+logger = get_logger("http")
+
+# Fraction of requests whose bodies are captured (0 = off), bytes kept per body, and where they go
+REQUEST_LOG_BODY_SAMPLE_RATE = float(os.getenv('REQUEST_LOG_BODY_SAMPLE_RATE', '0'))
+REQUEST_LOG_BODY_MAX_BYTES = int(os.getenv('REQUEST_LOG_BODY_MAX_BYTES', '4096'))
+REQUEST_LOG_BODY_FILE = os.getenv('REQUEST_LOG_BODY_FILE', 'logs/http_bodies.jsonl')
+
+STREAMING_CONTENT_TYPES = (b"text/event-stream",)
+
+
+class BodyCaptureLog:
+    """
+    Structured log of sampled request/response bodies.
+
+    Records are put on an in-memory queue by the request path and written to a JSON-lines
+    file by a QueueListener thread, so capturing never blocks the event loop on disk I/O.
+    """
+
+    def __init__(self, path: str = REQUEST_LOG_BODY_FILE):
+        self.path = path
+        self.logger = logging.getLogger("zeroai.http.bodies")
+        self.logger.propagate = False
+        self.listener: Optional[QueueListener] = None
+
+    def _start(self) -> None:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(self.path, encoding="utf-8")
+        handler.setFormatter(JsonLineFormatter())
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.logger.addHandler(QueueHandler(records))
+        self.logger.setLevel(logging.INFO)
+        self.listener = QueueListener(records, handler)
+        self.listener.start()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self.listener is None:
+            self._start()
+        self.logger.info("body capture", extra={"payload": record})
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+def _decode(body: bytearray, truncated: bool) -> Dict[str, Any]:
+    return {"text": body.decode("utf-8", errors="replace"), "bytes_captured": len(body), "truncated": truncated}
+
+
+class RequestLoggingMiddleware:
+    """
+    Pure ASGI access-log middleware.
+
+    Request and response messages are passed straight through; the middleware only observes
+    them to record method, path, status, response size, time to first byte and total latency.
+    For a sampled fraction of requests (REQUEST_LOG_BODY_SAMPLE_RATE) it also copies up to
+    REQUEST_LOG_BODY_MAX_BYTES of each body into the body capture log. Event streams are
+    never captured.
+    """
+
+    def __init__(self, app, sample_rate: float = REQUEST_LOG_BODY_SAMPLE_RATE,
+                 max_body_bytes: int = REQUEST_LOG_BODY_MAX_BYTES, body_log: Optional[BodyCaptureLog] = None):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.max_body_bytes = max_body_bytes
+        self.body_log = body_log if body_log is not None else (BodyCaptureLog() if sample_rate > 0 else None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        state = {"status": 500, "size": 0, "first_byte": None, "streaming": False}
+        capture = self.body_log is not None and random.random() < self.sample_rate
+        request_body = bytearray()
+        response_body = bytearray()
+        truncated = {"request": False, "response": False}
+
+        def keep(buffer: bytearray, chunk: bytes, which: str) -> None:
+            room = self.max_body_bytes - len(buffer)
+            if len(chunk) > room:
+                truncated[which] = True
+            if room > 0:
+                buffer.extend(chunk[:room])
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request":
+                keep(request_body, message.get("body", b""), "request")
+            return message
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                state["first_byte"] = time.perf_counter() - started
+                content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+                state["streaming"] = content_type.startswith(STREAMING_CONTENT_TYPES)
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                state["size"] += len(body)
+                if capture and not state["streaming"]:
+                    keep(response_body, body, "response")
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper if capture else receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            method, path = scope.get("method", ""), scope.get("path", "")
+            first_byte = state["first_byte"] if state["first_byte"] is not None else elapsed
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🌐 %s %s → %s %sB in %.1fms (first byte %.1fms)",
+                            method, path, state["status"], state["size"], elapsed * 1000, first_byte * 1000,
+                            extra={"style": "green" if state["status"] < 400 else "yellow",
+                                   "payload": {"method": method, "path": path, "status": state["status"],
+                                               "bytes": state["size"], "duration_ms": round(elapsed * 1000, 2)}})
+            if capture and not state["streaming"]:
+                self.body_log.write({
+                    "method": method,
+                    "path": path,
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": state["status"],
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "request_body": _decode(request_body, truncated["request"]),
+                    "response_body": _decode(response_body, truncated["response"]),
+                })
@@ -0,0 +1,45 @@
+# src/routed_llm.py
+
+from typing import Any, Optional
+
+from crewai import LLM
+from pydantic import PrivateAttr
+
+try:
+    from src.crew_stream import streaming_llm_call
+    from src.inflight_tracker import InFlightTracker
+except ImportError:
+    from crew_stream import streaming_llm_call
+    from inflight_tracker import InFlightTracker
+
+
+class RoutedLLM(LLM):
+    """
+    crewai LLM (LiteLLM backend) bound to the peer and model the router picked.
+
+    crewai 1.x only runs its own LLM classes and drops LangChain callbacks, so the routing
+    hooks live in call()/acall(): every call counts against the peer's in-flight load and
+    feeds the latency estimate, whether it succeeds or fails. Clients always stream from
+    Ollama; crewai reassembles the answer and emits each chunk on its event bus, from where
+    it reaches the SSE stream of the request that made the call (see crew_stream).
+    """
+
+    _tracker: Optional[InFlightTracker] = PrivateAttr(default=None)
+    _peer: str = PrivateAttr(default="")
+    _model_name: str = PrivateAttr(default="")
+
+    @classmethod
+    def build(cls, tracker: InFlightTracker, peer: str, model_name: str, base_url: str,
+              temperature: float, **kwargs: Any) -> "RoutedLLM":
+        llm = cls(model=f"ollama/{model_name}", is_litellm=True, base_url=base_url,
+                  temperature=temperature, stream=True, **kwargs)
+        llm._tracker, llm._peer, llm._model_name = tracker, peer, model_name
+        return llm
+
+    def call(self, messages, *args, **kwargs):
+        with self._tracker.track(self._peer, self._model_name), streaming_llm_call(self._peer, self._model_name):
+            return super().call(messages, *args, **kwargs)
+
+    async def acall(self, messages, *args, **kwargs):
+        with self._tracker.track(self._peer, self._model_name), streaming_llm_call(self._peer, self._model_name):
+            return await super().acall(messages, *args, **kwargs)
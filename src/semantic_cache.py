@@ -0,0 +1,241 @@
+# src/semantic_cache.py
+
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from rich.console import Console
+
+try:
+    import numpy as np
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+console = Console()
+
+SEMANTIC_CACHE_ENABLED = os.getenv('ZEROAI_SEMANTIC_CACHE', 'false').lower() == 'true'
+SEMANTIC_EMBED_MODEL = os.getenv('ZEROAI_SEMANTIC_EMBED_MODEL', 'nomic-embed-text')
+SEMANTIC_EMBED_TIMEOUT = 5
+# Seconds an embedder that failed is skipped, so an unreachable Ollama does not add its timeout to every request
+SEMANTIC_FAILURE_COOLDOWN = float(os.getenv('ZEROAI_SEMANTIC_FAILURE_COOLDOWN', '60'))
+# Cosine similarity a paraphrase needs to reuse a cached answer. Coding and math answers change
+# with small wording differences, research and support questions tolerate looser matches.
+SEMANTIC_DEFAULT_THRESHOLD = float(os.getenv('ZEROAI_SEMANTIC_THRESHOLD', '0.93'))
+SEMANTIC_THRESHOLDS = {
+    "research": 0.90,
+    "tech_support": 0.90,
+    "customer_service": 0.92,
+    "coding": 0.97,
+    "math": 0.99,
+}
+# Vectors kept per (category, request scope); the oldest are overwritten first
+SEMANTIC_MAX_ENTRIES = int(os.getenv('ZEROAI_SEMANTIC_MAX_ENTRIES', '2048'))
+# Vector rows kept across all indexes; the least recently used (category, scope) index is dropped first
+SEMANTIC_MAX_VECTORS = int(os.getenv('ZEROAI_SEMANTIC_MAX_VECTORS', '32768'))
+HASHING_DIMENSIONS = 512
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedding: hashed word unigrams/bigrams and character trigrams.
+
+    Used when no Ollama embedding model is reachable, and in tests. Catches reordered and
+    lightly reworded prompts, not true paraphrases.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _add(self, vector, feature: str, weight: float) -> None:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % self.dimensions
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[index] += sign * weight
+
+    def embed(self, text: str):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        for token in tokens:
+            self._add(vector, f"w:{token}", 1.0)
+            padded = f" {token} "
+            for i in range(len(padded) - 2):
+                self._add(vector, f"c:{padded[i:i + 3]}", 0.3)
+        for first, second in zip(tokens, tokens[1:]):
+            self._add(vector, f"b:{first} {second}", 0.7)
+        return vector
+
+
+class OllamaEmbedder:
+    """Embeddings from an Ollama embedding model (/api/embeddings)."""
+
+    def __init__(self, base_url: Optional[str] = None, model: str = SEMANTIC_EMBED_MODEL):
+        self.base_url = (base_url or os.getenv("OLLAMA_HOST", "http://ollama:11434")).rstrip('/')
+        self.model = model
+        self.name = f"ollama:{model}"
+        self.session = requests.Session()
+
+    def embed(self, text: str):
+        response = self.session.post(f"{self.base_url}/api/embeddings",
+                                     json={"model": self.model, "prompt": text},
+                                     timeout=SEMANTIC_EMBED_TIMEOUT)
+        response.raise_for_status()
+        embedding = response.json().get("embedding")
+        if not embedding:
+            raise ValueError(f"Ollama returned no embedding for {self.model}")
+        return np.asarray(embedding, dtype=np.float32)
+
+
+class SemanticIndex:
+    """Fixed-capacity matrix of unit vectors and the cache keys they point to."""
+
+    def __init__(self, dimensions: int, capacity: int = SEMANTIC_MAX_ENTRIES):
+        self.capacity = capacity
+        self.matrix = np.zeros((min(64, capacity), dimensions), dtype=np.float32)
+        self.keys: List[Optional[str]] = []
+        self.next_slot = 0
+
+    def add(self, vector, key: str) -> None:
+        if key in self.keys:
+            self.matrix[self.keys.index(key)] = vector
+            return
+        if len(self.keys) < self.capacity:
+            if len(self.keys) == self.matrix.shape[0]:
+                grown = np.zeros((min(self.capacity, self.matrix.shape[0] * 2), self.matrix.shape[1]), dtype=np.float32)
+                grown[:len(self.keys)] = self.matrix[:len(self.keys)]
+                self.matrix = grown
+            slot = len(self.keys)
+            self.keys.append(key)
+        else:
+            slot = self.next_slot
+            self.next_slot = (self.next_slot + 1) % self.capacity
+            self.keys[slot] = key
+        self.matrix[slot] = vector
+
+    @property
+    def rows(self) -> int:
+        """Vector rows allocated, which is what the index costs in memory"""
+        return self.matrix.shape[0]
+
+    def nearest(self, vector) -> Optional[Tuple[str, float]]:
+        if not self.keys:
+            return None
+        similarities = self.matrix[:len(self.keys)] @ vector
+        best = int(np.argmax(similarities))
+        key = self.keys[best]
+        return (key, float(similarities[best])) if key is not None else None
+
+    def remove(self, key: str) -> None:
+        if key in self.keys:
+            slot = self.keys.index(key)
+            self.keys[slot] = None
+            self.matrix[slot] = 0.0
+
+
+class SemanticCache:
+    """
+    Near-duplicate lookup in front of the exact response cache.
+
+    Topics are embedded and indexed per (embedder, category, scope), where the scope is a
+    key over every other request input, so a paraphrase only matches answers produced for
+    the same model, context and output format. A hit returns the exact cache key of the
+    earlier response; the response itself stays in the ResponseCache. Scopes are unbounded,
+    so indexes are kept in LRU order and the least recently used ones are dropped once all
+    of them together hold more than ``max_vectors`` rows.
+    """
+
+    def __init__(self, embedder=None, fallback=None, thresholds: Optional[Dict[str, float]] = None,
+                 max_vectors: int = SEMANTIC_MAX_VECTORS):
+        self.embedder = embedder if embedder is not None else OllamaEmbedder()
+        self.fallback = fallback if fallback is not None else HashingEmbedder()
+        self.thresholds = dict(SEMANTIC_THRESHOLDS if thresholds is None else thresholds)
+        self.max_vectors = max_vectors
+        self.indexes: "OrderedDict[Tuple[str, str, str], SemanticIndex]" = OrderedDict()
+        self.total_rows = 0
+        self.lock = Lock()
+        # Embedder name -> monotonic time until which it is not tried again
+        self.failed_until: Dict[str, float] = {}
+
+    def threshold(self, category: str) -> float:
+        return self.thresholds.get(category, SEMANTIC_DEFAULT_THRESHOLD)
+
+    def _embed(self, text: str):
+        """
+        Embed with the primary embedder, falling back to the local hashing embedder.
+        An embedder that failed is skipped for SEMANTIC_FAILURE_COOLDOWN seconds; with none
+        available the text is not embedded and the caller skips the semantic cache.
+        """
+        for embedder in (self.embedder, self.fallback):
+            if embedder is None or self.failed_until.get(embedder.name, 0.0) > time.monotonic():
+                continue
+            try:
+                vector = embedder.embed(text)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                self.failed_until[embedder.name] = time.monotonic() + SEMANTIC_FAILURE_COOLDOWN
+                console.print(f"⚠️ Semantic cache embedding via {embedder.name} failed, skipping it for "
+                              f"{SEMANTIC_FAILURE_COOLDOWN:.0f}s: {e}", style="yellow")
+                continue
+            norm = float(np.linalg.norm(vector))
+            if norm > 0:
+                return embedder.name, vector / norm
+        return None, None
+
+    def lookup(self, category: str, scope: str, topic: str) -> Optional[Tuple[str, float]]:
+        """Return (cache_key, similarity) of the closest earlier topic above the category threshold"""
+        embedder_name, vector = self._embed(topic)
+        if vector is None:
+            return None
+        index_key = (embedder_name, category, scope)
+        with self.lock:
+            index = self.indexes.get(index_key)
+            if index is None:
+                return None
+            self.indexes.move_to_end(index_key)
+            match = index.nearest(vector)
+        if match and match[1] >= self.threshold(category):
+            return match
+        return None
+
+    def add(self, category: str, scope: str, topic: str, cache_key: str) -> None:
+        embedder_name, vector = self._embed(topic)
+        if vector is None:
+            return
+        index_key = (embedder_name, category, scope)
+        with self.lock:
+            index = self.indexes.get(index_key)
+            if index is None:
+                index = self.indexes[index_key] = SemanticIndex(vector.shape[0])
+                rows = 0
+            else:
+                self.indexes.move_to_end(index_key)
+                rows = index.rows
+            index.add(vector, cache_key)
+            self.total_rows += index.rows - rows
+            # The index just written to is the most recent one and is never dropped
+            while self.total_rows > self.max_vectors and len(self.indexes) > 1:
+                _, dropped = self.indexes.popitem(last=False)
+                self.total_rows -= dropped.rows
+
+    def forget(self, cache_key: str) -> None:
+        """Drop a key whose response has expired from the exact cache"""
+        with self.lock:
+            for index in self.indexes.values():
+                index.remove(cache_key)
+
+
+semantic_cache: Optional[SemanticCache] = None
+if SEMANTIC_CACHE_ENABLED:
+    if has_numpy:
+        semantic_cache = SemanticCache()
+    else:
+        console.print("⚠️ ZEROAI_SEMANTIC_CACHE is set but numpy is not installed; semantic cache disabled",
+                      style="yellow")
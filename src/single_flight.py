@@ -0,0 +1,78 @@
+# src/single_flight.py
+
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+def call_now(fn: Callable[[], Any]) -> Future:
+    """Run ``fn`` on the calling thread and return its outcome as a completed Future"""
+    future = Future()
+    try:
+        future.set_result(fn())
+    except BaseException as e:
+        future.set_exception(e)
+    return future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key.
+
+    The first caller for a key runs the function; callers arriving while it is still running
+    share the same future and receive its result (or its exception). Once the call finishes
+    the key is released, so later calls run again (and normally hit the response cache).
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.calls: Dict[Hashable, Future] = {}
+
+    def submit(self, key: Hashable, start: Callable[[], Future]) -> Tuple[Future, bool]:
+        """
+        Start ``start()`` once per concurrent ``key`` without waiting for it.
+
+        ``start`` returns the Future of the call (e.g. a worker pool submission). Every caller
+        gets a Future that settles with it, so async callers can await it without a thread.
+
+        Returns:
+            (future, shared) where shared is True if the future belongs to another caller's run.
+        """
+        with self.lock:
+            future = self.calls.get(key)
+            if future is not None:
+                return future, True
+            future = self.calls[key] = Future()
+
+        def settle(started: Future) -> None:
+            with self.lock:
+                self.calls.pop(key, None)
+            if started.cancelled():
+                future.cancel()
+            elif started.exception() is not None:
+                future.set_exception(started.exception())
+            else:
+                future.set_result(started.result())
+
+        try:
+            started = start()
+        except BaseException as e:
+            with self.lock:
+                self.calls.pop(key, None)
+            future.set_exception(e)
+            raise
+        started.add_done_callback(settle)
+        return future, False
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` once per concurrent ``key``, on the calling thread, and wait for the result.
+
+        Returns:
+            (result, shared) where shared is True if the result came from another caller's run.
+        """
+        future, shared = self.submit(key, lambda: call_now(fn))
+        return future.result(), shared
+
+    def in_flight(self) -> int:
+        return len(self.calls)
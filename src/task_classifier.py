@@ -0,0 +1,230 @@
+# src/task_classifier.py
+
+import math
+import os
+import re
+from collections import OrderedDict, defaultdict
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+try:
+    from src.prompt_classifier import PromptClassifier
+except ImportError:
+    from prompt_classifier import PromptClassifier
+
+console = Console()
+
+# Categories the crew manager has crews for
+TASK_CATEGORIES = ("coding", "math", "research", "customer_service", "tech_support", "general")
+
+TASK_KEYWORDS = {
+    "code": "coding", "coding": "coding", "program": "coding", "python": "coding", "php": "coding",
+    "javascript": "coding", "typescript": "coding", "java": "coding", "html": "coding", "css": "coding",
+    "sql": "coding", "function": "coding", "class": "coding", "bug": "coding", "debug": "coding",
+    "refactor": "coding", "compile": "coding", "script": "coding", "regex": "coding", "unit test": "coding",
+    "math": "math", "calculate": "math", "equation": "math", "solve": "math", "integral": "math",
+    "derivative": "math", "algebra": "math", "probability": "math", "arithmetic": "math",
+    "percentage": "math", "multiply": "math", "divide": "math", "square root": "math",
+    "research": "research", "analyze": "research", "analysis": "research", "compare": "research",
+    "investigate": "research", "summarize": "research", "trend": "research", "market": "research",
+    "report": "research", "study": "research",
+    "order": "customer_service", "refund": "customer_service", "billing": "customer_service",
+    "subscription": "customer_service", "purchase": "customer_service", "delivery": "customer_service",
+    "complaint": "customer_service", "customer": "customer_service", "cancel": "customer_service",
+    "install": "tech_support", "crash": "tech_support", "troubleshoot": "tech_support",
+    "not working": "tech_support", "wifi": "tech_support", "printer": "tech_support",
+    "reset": "tech_support", "login": "tech_support", "network": "tech_support",
+}
+# Forms matched besides each keyword and its plural
+TASK_KEYWORD_INFLECTIONS = {
+    "code": ["coded"], "program": ["programmed", "programming"], "debug": ["debugged", "debugging"],
+    "refactor": ["refactored", "refactoring"], "compile": ["compiled", "compiling"],
+    "calculate": ["calculated", "calculating", "calculation"], "solve": ["solved", "solving"],
+    "multiply": ["multiplied", "multiplying"], "divide": ["divided", "dividing"],
+    "analyze": ["analyzed", "analyzing"], "compare": ["compared", "comparing"],
+    "investigate": ["investigated", "investigating"], "summarize": ["summarized", "summarizing"],
+    "study": ["studies"], "order": ["ordered"], "refund": ["refunded"], "purchase": ["purchased"],
+    "cancel": ["cancelled", "canceled", "cancelling"], "install": ["installed", "installing", "installation"],
+    "crash": ["crashed", "crashing"], "troubleshoot": ["troubleshooting"],
+}
+TASK_KEYWORD_WEIGHTS = {
+    "order": 0.5, "class": 0.5, "function": 0.75, "report": 0.5, "compare": 0.75,
+    "study": 0.5, "program": 0.75, "reset": 0.75, "network": 0.75, "cancel": 0.75,
+}
+# "12 * 7", "3.5 + 2" and friends are arithmetic regardless of wording
+ARITHMETIC_PATTERN = re.compile(r"\d+(?:\.\d+)?\s*[-+*/^x×÷]\s*\d+")
+ARITHMETIC_SCORE = 4.0
+
+# The keyword tier answers when its best category scores at least KEYWORD_MIN_SCORE and
+# KEYWORD_MARGIN times the runner-up; the learned tier when its posterior reaches the threshold
+KEYWORD_MIN_SCORE = 2.0
+KEYWORD_MARGIN = 2.0
+TASK_CLASSIFIER_CONFIDENCE = float(os.getenv('TASK_CLASSIFIER_CONFIDENCE', '0.8'))
+# Outcomes needed before the learned tier is used, and new outcomes that trigger a retrain
+TASK_CLASSIFIER_MIN_EXAMPLES = int(os.getenv('TASK_CLASSIFIER_MIN_EXAMPLES', '20'))
+TASK_CLASSIFIER_RETRAIN_EVERY = 25
+TASK_CLASSIFIER_CACHE_SIZE = int(os.getenv('TASK_CLASSIFIER_CACHE_SIZE', '2048'))
+MAX_TRAINING_TOKENS = 256
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivially different topics share a cache entry"""
+    return " ".join(TOKEN_PATTERN.findall((topic or "").lower()))
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over topic tokens, trained from recorded task outcomes."""
+
+    def __init__(self):
+        self.class_counts: Dict[str, int] = {}
+        self.token_counts: Dict[str, Dict[str, int]] = {}
+        self.class_totals: Dict[str, int] = {}
+        self.vocabulary_size = 0
+        self.examples = 0
+
+    def train(self, examples: List[Tuple[str, str]]) -> None:
+        class_counts: Dict[str, int] = defaultdict(int)
+        token_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        vocabulary = set()
+        for text, category in examples:
+            class_counts[category] += 1
+            for token in TOKEN_PATTERN.findall(text.lower())[:MAX_TRAINING_TOKENS]:
+                token_counts[category][token] += 1
+                vocabulary.add(token)
+        self.class_counts = dict(class_counts)
+        self.token_counts = {c: dict(t) for c, t in token_counts.items()}
+        self.class_totals = {c: sum(t.values()) for c, t in self.token_counts.items()}
+        self.vocabulary_size = len(vocabulary)
+        self.examples = len(examples)
+
+    def predict(self, text: str) -> Optional[Tuple[str, float]]:
+        """Most likely category and its posterior probability"""
+        if len(self.class_counts) < 2:
+            return None
+        tokens = TOKEN_PATTERN.findall(text.lower())[:MAX_TRAINING_TOKENS]
+        log_probs = {}
+        for category, count in self.class_counts.items():
+            counts = self.token_counts.get(category, {})
+            denominator = self.class_totals.get(category, 0) + self.vocabulary_size + 1
+            log_prob = math.log(count / self.examples)
+            for token in tokens:
+                log_prob += math.log((counts.get(token, 0) + 1) / denominator)
+            log_probs[category] = log_prob
+        best = max(log_probs, key=log_probs.get)
+        top = log_probs[best]
+        normalizer = sum(math.exp(lp - top) for lp in log_probs.values())
+        return best, 1.0 / normalizer
+
+
+class TaskClassifier:
+    """
+    Tiered task classifier in front of the LLM classifier crew.
+
+    1. an LRU cache keyed by the normalized topic
+    2. weighted keyword rules (plus an arithmetic pattern), used when one category clearly wins
+    3. a naive Bayes model trained from past task outcomes, used when its posterior is high enough
+    4. the LLM fallback passed by the caller, for whatever is still ambiguous
+    """
+
+    def __init__(self, outcomes: Optional[Callable[[], List[Dict]]] = None,
+                 cache_size: int = TASK_CLASSIFIER_CACHE_SIZE,
+                 outcome_count: Optional[Callable[[], int]] = None):
+        self.outcomes = outcomes
+        # Total outcomes ever recorded; lets the retrain check skip copying the outcomes,
+        # and keeps counting once the source only holds a bounded tail
+        self.outcome_count = outcome_count
+        self.keywords = PromptClassifier(TASK_KEYWORDS, TASK_KEYWORD_WEIGHTS, cache_size=0,
+                                         inflections=TASK_KEYWORD_INFLECTIONS)
+        self.model = NaiveBayesModel()
+        self.trained_on: Optional[int] = None
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = Lock()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self.lock:
+            category = self.cache.get(key)
+            if category is not None:
+                self.cache.move_to_end(key)
+            return category
+
+    def _cache_put(self, key: str, category: str) -> None:
+        with self.lock:
+            self.cache[key] = category
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def classify_by_keywords(self, topic: str) -> Optional[str]:
+        scores = self.keywords.scores(topic)
+        if ARITHMETIC_PATTERN.search(topic):
+            scores["math"] = scores.get("math", 0.0) + ARITHMETIC_SCORE
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best_score >= KEYWORD_MIN_SCORE and best_score >= KEYWORD_MARGIN * runner_up:
+            return best
+        return None
+
+    def _maybe_retrain(self) -> None:
+        if self.outcomes is None:
+            return
+        try:
+            if self.outcome_count is not None:
+                count = self.outcome_count()
+                if self.trained_on is not None and count - self.trained_on < TASK_CLASSIFIER_RETRAIN_EVERY:
+                    return
+            outcomes = self.outcomes()
+        except Exception as e:
+            console.print(f"⚠️ Could not read task outcomes for the classifier: {e}", style="yellow")
+            return
+        if self.outcome_count is None:
+            count = len(outcomes)
+            if self.trained_on is not None and count - self.trained_on < TASK_CLASSIFIER_RETRAIN_EVERY:
+                return
+        examples = [(o["prompt"], o["category"]) for o in outcomes
+                    if o.get("success") and o.get("prompt") and o.get("category") in TASK_CATEGORIES]
+        with self.lock:
+            self.trained_on = count
+            if len(examples) >= TASK_CLASSIFIER_MIN_EXAMPLES:
+                self.model.train(examples)
+
+    def classify_by_model(self, topic: str) -> Optional[str]:
+        self._maybe_retrain()
+        prediction = self.model.predict(topic)
+        if prediction and prediction[1] >= TASK_CLASSIFIER_CONFIDENCE:
+            return prediction[0]
+        return None
+
+    def classify(self, topic: str, llm_fallback: Optional[Callable[[], Optional[str]]] = None
+                 ) -> Tuple[Optional[str], str]:
+        """
+        Classify ``topic`` and report which tier answered.
+
+        Returns:
+            (category, source) where source is "cache", "keywords", "model", "llm" or "none".
+        """
+        key = normalize_topic(topic)
+        category = self._cache_get(key)
+        if category is not None:
+            return category, "cache"
+
+        for source, tier in (("keywords", self.classify_by_keywords), ("model", self.classify_by_model)):
+            category = tier(topic)
+            if category is not None:
+                self._cache_put(key, category)
+                return category, source
+
+        if llm_fallback is None:
+            return None, "none"
+        category = llm_fallback()
+        # Only answers the crews understand are worth remembering
+        if category in TASK_CATEGORIES:
+            self._cache_put(key, category)
+        return category, "llm"
@@ -3,7 +3,28 @@ import json
 import time
 from rich.console import Console
 
+try:
+    from src.log_pipeline import get_logger
+except ImportError:
+    from log_pipeline import get_logger
+
 console = Console()
+logger = get_logger("crew.steps")
+
+
+def step_to_dict(output: any) -> dict:
+    """Describe one agent step (tool output, agent action or finish) as a plain dict."""
+    if hasattr(output, 'result'):
+        return {
+            "type": "tool_output",
+            "result": output.result,
+            "tool": output.tool
+        }
+    # Handle other types of step output like AgentAction or AgentFinish
+    return {
+        "type": "agent_action",  # Assuming it's an agent action if not a tool output
+        "output": str(output)
+    }
 
 
 class CustomLogger:
@@ -16,26 +37,14 @@ class CustomLogger:
         """
         Logs the output of each agent step.
         """
-        step_output = {}
-        if hasattr(output, 'result'):
-            step_output = {
-                "type": "tool_output",
-                "result": output.result,
-                "tool": output.tool
-            }
-        else:
-            # Handle other types of step output like AgentAction or AgentFinish
-            step_output = {
-                "type": "agent_action",  # Assuming it's an agent action if not a tool output
-                "output": str(output)
-            }
+        step_output = step_to_dict(output)
 
         self.log_data["steps"].append({
             "timestamp": time.time(),
             "output": step_output
         })
 
-        console.print(f"📝 Logged step output: {step_output}", style="dim")
+        logger.debug("📝 Logged step output: %s", step_output, extra={"style": "dim"})
 
     def save_log(self) -> None:
         """
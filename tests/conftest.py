@@ -0,0 +1,110 @@
+# tests/conftest.py
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+API_DIR = Path(__file__).resolve().parent.parent / "API"
+
+# Modules are imported by their plain names, the same way the API service loads them
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+# Use litellm's bundled model cost map instead of fetching it (and retrying in a thread) at import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+# Module-level stores (response cache, job queue, learning log) are created at import time, possibly
+# while tests are being collected, so they are pointed at a scratch directory before anything is imported;
+# files the modules keep under relative paths (knowledge/, config/) land there as well
+STATE_DIR = Path(tempfile.mkdtemp(prefix="zeroai-tests-"))
+os.chdir(STATE_DIR)
+os.environ.update({
+    "ZEROAI_CACHE_DIR": str(STATE_DIR / "cache"),
+    "ZEROAI_JOBS_DB": str(STATE_DIR / "jobs.db"),
+    "ZEROAI_LEARNING_DB": str(STATE_DIR / "learning.db"),
+    "JOB_WORKERS": "0",
+    # crewai must not phone home from a test run
+    "CREWAI_DISABLE_TELEMETRY": "true",
+    "OTEL_SDK_DISABLED": "true",
+})
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    # The API keeps its state under relative paths, and background threads and atexit hooks still
+    # write there after pytest has changed back to the repo, so every path is made absolute up front
+    work_dir = tmp_path_factory.mktemp("api")
+    os.chdir(work_dir)
+    sys.path.insert(0, str(API_DIR))
+    import api as api_module
+    # The router loads the module as src.peer_discovery, the API by its plain name: one singleton each
+    import peer_discovery
+    import src.peer_discovery
+    for module in (peer_discovery, src.peer_discovery):
+        module.PeerDiscovery.get_instance().state_store.path = work_dir / module.PEERS_CONFIG_PATH
+    from learning.feedback_loop import get_feedback_loop
+    feedback_loop = get_feedback_loop()
+    feedback_loop.metrics_file = work_dir / feedback_loop.metrics_file
+    return api_module
+
+
+class FakeOllama(ThreadingHTTPServer):
+    """
+    Ollama /api/generate stand-in answering every prompt with a final answer crewai accepts.
+
+    Each generation waits for ``release`` once the request has arrived (``received``), so a
+    test can look at the caller while the call is outstanding.
+    """
+
+    answer = "Thought: I now can give a great answer\nFinal Answer: hello from the peer"
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.received = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+        self.generations = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/api/generate":
+            # litellm looks up model details (/api/show); a 404 makes it use its defaults
+            self.send_error(404)
+            return
+        self.server.generations.append(body)
+        self.server.received.set()
+        self.server.release.wait(10)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        answer, done = self.server.answer, {"done": True, "prompt_eval_count": 12, "eval_count": 8}
+        if not body.get("stream"):
+            self.wfile.write(json.dumps({"model": body["model"], "response": answer, **done}).encode())
+            return
+        # Streamed generations arrive as one JSON object per line
+        for i in range(0, len(answer), 16):
+            self.wfile.write(json.dumps({"model": body["model"], "response": answer[i:i + 16],
+                                         "done": False}).encode() + b"\n")
+            self.wfile.flush()
+        self.wfile.write(json.dumps({"model": body["model"], "response": "", **done}).encode() + b"\n")
+
+
+@pytest.fixture
+def fake_ollama():
+    server = FakeOllama()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
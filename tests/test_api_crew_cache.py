@@ -0,0 +1,144 @@
+# tests/test_api_crew_cache.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+
+class FailingCrew:
+    step_callback = None
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def kickoff(self):
+        self.calls.append(1)
+        raise RuntimeError("peer unreachable")
+
+
+def test_failed_crew_run_is_not_served_from_cache(api, monkeypatch):
+    calls = []
+    monkeypatch.setattr(api.AICrewManager, "create_crew_for_category", lambda self, router, inputs: FailingCrew(calls))
+    request = {"topic": "Summarize the release notes", "category": "coding"}
+
+    first = api.process_crew_request(dict(request), [], "raw")
+    second = api.process_crew_request(dict(request), [], "raw")
+
+    assert first["final_result"].startswith("Error:")
+    assert second["cache"]["status"] == "miss"
+    assert len(calls) == 2
+    assert api.cache.get_entry(first["cache"]["key"]) is None
+
+
+def test_failed_crew_run_is_not_semantically_indexed(api, monkeypatch):
+    pytest.importorskip("numpy")
+    from semantic_cache import HashingEmbedder, SemanticCache
+
+    semantic = SemanticCache(embedder=HashingEmbedder(), fallback=None)
+    monkeypatch.setattr(api, "semantic_cache", semantic)
+    monkeypatch.setattr(api.AICrewManager, "create_crew_for_category", lambda self, router, inputs: FailingCrew([]))
+
+    api.process_crew_request({"topic": "Compare the two deployment plans", "category": "research"}, [], "raw")
+
+    assert semantic.indexes == {}
+
+
+class BlockingCrew:
+    step_callback = None
+
+    def __init__(self, release):
+        self.release = release
+
+    def kickoff(self):
+        self.release.wait(5)
+        raise RuntimeError("released")
+
+
+def test_crew_request_is_queued_without_waiting_for_the_run(api, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(api.AICrewManager, "create_crew_for_category",
+                        lambda self, router, inputs: BlockingCrew(release))
+    request = {"topic": "Draft the migration checklist", "category": "research"}
+
+    leader = api.start_crew_request(dict(request), [], "raw")
+    follower = api.start_crew_request(dict(request), [], "raw")
+    assert not leader.done() and not follower.done()
+
+    release.set()
+    assert leader.result(5)["cache"]["status"] == "miss"
+    assert follower.result(5)["cache"]["status"] == "coalesced"
+
+
+class CancellingCrew:
+    """Calls its step callback once and, like crewai's agent loop can, carries on when it raises."""
+
+    def __init__(self, api, flights):
+        self.api = api
+        self.flights = flights
+        self.step_callback = None
+
+    def kickoff(self):
+        self.flights.append(dict(self.api.crew_flight.calls))
+        try:
+            self.step_callback("step 1")
+        except Exception:
+            pass
+        return self.api.CrewOutput(tasks_output=[], raw="finished anyway", token_usage={})
+
+
+def test_cancelled_job_is_not_cached_recorded_or_coalesced(api, monkeypatch):
+    flights, failures = [], []
+    monkeypatch.setattr(api.AICrewManager, "create_crew_for_category",
+                        lambda self, router, inputs: CancellingCrew(api, flights))
+    monkeypatch.setattr(api.AICrewManager, "_record_failure", lambda self, *args: failures.append(args))
+    inputs = {"topic": "Write the quarterly summary", "category": "research"}
+    cache_key = api.make_cache_key("research", inputs["topic"], None, {**inputs, "output_format": "raw"})
+
+    def check_cancelled():
+        raise api.JobCancelled("job-1")
+
+    with pytest.raises(api.JobCancelled):
+        api.run_crew_job({"request": {"inputs": dict(inputs)}}, lambda *event: None, check_cancelled)
+
+    assert flights == [{}]
+    assert failures == []
+    assert api.cache.get_entry(cache_key) is None
+
+
+class FinishingCrew:
+    step_callback = None
+
+    def __init__(self, api, release):
+        self.api = api
+        self.release = release
+
+    def kickoff(self):
+        self.release.wait(5)
+        return self.api.CrewOutput(tasks_output=[], raw="the answer", token_usage={})
+
+
+def test_stream_disconnect_stops_waiting_but_still_caches_the_result(api, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(api.AICrewManager, "create_crew_for_category",
+                        lambda self, router, inputs: FinishingCrew(api, release))
+    inputs = {"topic": "Outline the onboarding guide", "category": "research"}
+    cache_key = api.make_cache_key("research", inputs["topic"], None, {**inputs, "output_format": "raw"})
+
+    async def disconnect_mid_run():
+        response = await api.run_crew_ai_stream(api.CrewRequest(inputs=dict(inputs)), request=None)
+        events = response.body_iterator
+        assert (await events.__anext__()).startswith("event: accepted")
+        await asyncio.sleep(0.1)
+        assert len(api.stream_publishers) == 1
+        # The client goes away while the crew is still running
+        await events.aclose()
+        await asyncio.sleep(0.1)
+        assert not api.stream_publishers
+
+    asyncio.run(disconnect_mid_run())
+    release.set()
+    deadline = time.monotonic() + 5
+    while api.cache.get_entry(cache_key) is None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert api.cache.get_entry(cache_key)["final_result"] == "the answer"
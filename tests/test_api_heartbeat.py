@@ -0,0 +1,40 @@
+# tests/test_api_heartbeat.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+
+def post_heartbeat(api, name, token=None, capabilities=None):
+    headers = {api.PEER_TOKEN_HEADER: token} if token is not None else {}
+    request = SimpleNamespace(headers=headers, client=SimpleNamespace(host="10.0.0.9"))
+    heartbeat = api.PeerHeartbeat(name=name, full=True, capabilities=capabilities or {"load_avg": 99.0})
+    return asyncio.run(api.peer_heartbeat(heartbeat, request))
+
+
+def test_heartbeats_are_refused_without_a_configured_token(api, monkeypatch):
+    monkeypatch.setattr(api, "PEER_HEARTBEAT_TOKEN", "")
+    with pytest.raises(HTTPException) as refused:
+        post_heartbeat(api, "local-node", token="")
+    assert refused.value.status_code == 403
+
+
+def test_heartbeat_needs_the_token_and_a_configured_peer(api, monkeypatch):
+    monkeypatch.setattr(api, "PEER_HEARTBEAT_TOKEN", "s3cret")
+    discovery = api.peer_discovery_instance
+    monkeypatch.setattr(discovery, "resolve_heartbeat_peer",
+                        lambda name, ip: ("gpu-1", "10.0.0.2") if name == "gpu-host" else None)
+    recorded = []
+    monkeypatch.setattr(discovery, "record_heartbeat",
+                        lambda name, ip, delta, full=False: recorded.append((name, ip)) or True)
+
+    with pytest.raises(HTTPException) as wrong_token:
+        post_heartbeat(api, "gpu-host", token="guess")
+    with pytest.raises(HTTPException) as unknown:
+        post_heartbeat(api, "intruder", token="s3cret")
+    accepted = post_heartbeat(api, "gpu-host", token="s3cret")
+
+    assert (wrong_token.value.status_code, unknown.value.status_code) == (401, 403)
+    assert accepted == {"status": "ok", "resync": False}
+    assert recorded == [("gpu-1", "10.0.0.2")]
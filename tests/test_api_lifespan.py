@@ -0,0 +1,17 @@
+# tests/test_api_lifespan.py
+import asyncio
+
+
+def test_lifespan_starts_and_stops_background_workers(api, monkeypatch):
+    calls = []
+    for target, name in ((api.distributed_router, "start_warmup"), (api.job_runner, "start"),
+                         (api.job_runner, "stop"), (api.distributed_router, "stop_warmup"),
+                         (api.peer_discovery_instance, "stop_discovery_service")):
+        monkeypatch.setattr(target, name, lambda name=name: calls.append(name))
+
+    async def serve():
+        async with api.lifespan(api.app):
+            calls.append("serving")
+
+    asyncio.run(serve())
+    assert calls == ["start_warmup", "start", "serving", "stop", "stop_warmup", "stop_discovery_service"]
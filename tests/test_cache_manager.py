@@ -0,0 +1,77 @@
+# tests/test_cache_manager.py
+import time
+from types import SimpleNamespace
+
+import cache_manager
+from cache_manager import ResponseCache
+
+
+def worker_caches(tmp_path, count=2, **kwargs):
+    """Separate cache instances on one directory, the way gunicorn workers share the store"""
+    return [ResponseCache(cache_dir=str(tmp_path), **kwargs) for _ in range(count)]
+
+
+def test_size_limit_holds_across_worker_processes(tmp_path):
+    first, second = worker_caches(tmp_path, max_bytes=2000)
+    payload = "x" * 180
+
+    for i in range(10):
+        first.put(f"first-{i}", payload)
+        second.put(f"second-{i}", payload)
+
+    stored = first.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+    assert stored <= 2000
+    assert first.stats()["disk_bytes"] == stored
+
+
+def test_memory_hit_sees_refresh_and_delete_from_another_worker(tmp_path):
+    writer, reader = worker_caches(tmp_path)
+    writer.put("key", {"answer": "old"})
+    assert reader.get_entry("key") == {"answer": "old"}
+    assert reader.get_entry("key") == {"answer": "old"}
+    assert reader.counters["memory_hits"] == 1
+
+    writer.put("key", {"answer": "new"})
+    assert reader.get_entry("key") == {"answer": "new"}
+
+    writer.delete("key")
+    assert reader.get_entry("key") is None
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(cache_manager, "time", SimpleNamespace(time=lambda: clock[0]))
+    cache, other_worker = worker_caches(tmp_path, ttl=60)
+    cache.put("default-ttl", "a")
+    cache.put("short-ttl", "b", ttl=5)
+    assert other_worker.get_entry("short-ttl") == "b"
+
+    clock[0] += 10
+    assert cache.get_entry("short-ttl") is None
+    assert other_worker.get_entry("short-ttl") is None
+    assert cache.get_entry("default-ttl") == "a"
+
+    clock[0] += 60
+    assert other_worker.get_entry("default-ttl") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted_over_max_bytes(tmp_path, monkeypatch):
+    clock = [time.time()]
+    monkeypatch.setattr(cache_manager, "time", SimpleNamespace(time=lambda: clock[0]))
+    cache = ResponseCache(cache_dir=str(tmp_path), max_bytes=1100)
+    payload = "x" * 300
+
+    for key in ("a", "b", "c"):
+        clock[0] += 1
+        cache.put(key, payload)
+    # "a" is served from memory; that still counts as a use for disk eviction
+    clock[0] += 1
+    assert cache.get_entry("a") == payload
+    clock[0] += 1
+    cache.put("d", payload)
+
+    assert cache.get_entry("b") is None
+    assert [cache.get_entry(key) for key in ("a", "c", "d")] == [payload] * 3
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["disk_bytes"] <= 1100
@@ -0,0 +1,33 @@
+# tests/test_crew_pool.py
+from threading import Event
+
+import pytest
+
+import crew_pool
+from crew_pool import CrewWorkerPool, PoolSaturated
+
+
+def test_waiting_submit_shares_the_pool_limit(monkeypatch):
+    monkeypatch.setattr(crew_pool, "SLOT_WAIT_POLL", 0.01)
+    pool = CrewWorkerPool(max_workers=1, max_queue=0)
+    release = Event()
+    running = pool.submit(release.wait, 5)
+
+    with pytest.raises(PoolSaturated):
+        pool.submit(lambda: "interactive")
+
+    # A waiting caller can give up while the pool is full
+    checks = []
+
+    def give_up():
+        checks.append(1)
+        if len(checks) == 3:
+            raise TimeoutError("cancelled")
+
+    with pytest.raises(TimeoutError):
+        pool.submit_waiting(lambda: "job", check=give_up)
+
+    release.set()
+    assert running.result(5) is True
+    assert pool.submit_waiting(lambda: "job").result(5) == "job"
+    assert pool.stats()["rejected"] == 1
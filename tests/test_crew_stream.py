@@ -0,0 +1,40 @@
+# tests/test_crew_stream.py
+import asyncio
+
+from crewai import Agent, Crew, Task
+
+from inflight_tracker import InFlightTracker
+from routed_llm import RoutedLLM
+# The module the routed clients publish to, which is also the one the API imports
+from src.crew_stream import StreamChannel, streaming_to
+
+
+def test_tokens_are_streamed_before_the_result(fake_ollama):
+    llm = RoutedLLM.build(InFlightTracker(), "gpu-1", "llama3.2:1b", fake_ollama.url, 0.2)
+    agent = Agent(role="Researcher", goal="Answer briefly", backstory="A terse assistant", llm=llm)
+    crew = Crew(agents=[agent], tasks=[Task(description="Say hello", expected_output="A greeting", agent=agent)])
+
+    async def stream():
+        channel = StreamChannel(asyncio.get_running_loop())
+
+        def run_crew():
+            with streaming_to(channel):
+                output = crew.kickoff()
+            channel.publish("result", {"raw": output.raw})
+            channel.finish()
+
+        crew_run = asyncio.get_running_loop().run_in_executor(None, run_crew)
+        events = [event async for event in channel.events()]
+        await crew_run
+        return events
+
+    events = asyncio.run(stream())
+    types = [event_type for event_type, _ in events]
+
+    assert fake_ollama.generations[0]["stream"] is True
+    assert types[0] == "llm_start" and types[-2:] == ["llm_end", "result"]
+    tokens = [data for event_type, data in events if event_type == "token"]
+    assert len(tokens) > 1
+    assert {token["run_id"] for token in tokens} == {events[0][1]["run_id"]}
+    assert "hello from the peer" in "".join(token["text"] for token in tokens)
+    assert events[-1][1]["raw"].endswith("hello from the peer")
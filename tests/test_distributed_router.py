@@ -0,0 +1,117 @@
+# tests/test_distributed_router.py
+from types import SimpleNamespace
+
+import pytest
+
+from src.distributed_router import DistributedRouter, LLMClientPool
+from src.peer_discovery import PeerCapabilities, PeerNode
+
+
+class FakeDiscovery:
+    def __init__(self, peers):
+        self.peers = peers
+        self.snapshot_version = 1
+
+    def start_discovery_service(self):
+        pass
+
+    def get_peers(self):
+        return list(self.peers)
+
+    def publish(self, peers):
+        self.peers = peers
+        self.snapshot_version += 1
+
+
+class FakeInventory:
+    def __init__(self, models):
+        self.models = models
+        self.version = 1
+
+    def get_models(self):
+        return list(self.models)
+
+
+LOCAL_NODE = PeerNode("local-node", "127.0.0.1", PeerCapabilities(available=True, memory=16))
+
+
+def gpu_peer(name, models, gpu_memory):
+    return PeerNode(name, "10.0.0.2", PeerCapabilities(available=True, models=models, gpu_available=True,
+                                                       gpu_memory=gpu_memory, memory=32))
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr("src.distributed_router.ROUTER_WARMUP_ENABLED", False)
+    router = DistributedRouter(FakeDiscovery([LOCAL_NODE, gpu_peer("small", ["llama3.2:1b"], 4),
+                                              gpu_peer("large", ["llama3.2:1b", "llama3.1:8b"], 24)]))
+    router.model_inventory = FakeInventory(["llama3.2:1b"])
+    return router
+
+
+def names(index, model):
+    return [peer.name for _, peer in index.candidates(model)]
+
+
+def test_model_index_is_reused_until_its_inputs_change(router):
+    index = router._get_model_index()
+    assert router._get_model_index() is index
+    assert names(index, "llama3.2:1b") == ["large", "small", "local-node"]
+    assert names(index, "llama3.1:8b") == ["large"]
+
+    router.peer_discovery.publish([LOCAL_NODE, gpu_peer("small", ["llama3.2:1b", "llama3.1:8b"], 8)])
+    rebuilt = router._get_model_index()
+    assert rebuilt is not index
+    assert names(rebuilt, "llama3.1:8b") == ["small"]
+    assert names(rebuilt, "llama3.2:1b") == ["small", "local-node"]
+
+
+def test_model_index_is_rebuilt_for_local_models_and_learned_footprints(router):
+    assert names(router._get_model_index(), "llama3.1:8b") == ["large"]
+
+    router.model_inventory.models, router.model_inventory.version = ["llama3.1:8b"], 2
+    index = router._get_model_index()
+    assert names(index, "llama3.1:8b") == ["large", "local-node"]
+    assert "local-node" not in names(index, "llama3.2:1b")
+
+    # A footprint learned from Ollama that no longer fits a peer drops it from the candidates
+    router.footprints._learn("llama3.1:8b", 20.0)
+    assert names(router._get_model_index(), "llama3.1:8b") == ["large"]
+
+
+def counting_pool(**kwargs):
+    built = []
+
+    def factory(base_url, model_name, temperature, peer_name):
+        built.append((base_url, model_name, temperature))
+        return object()
+
+    return LLMClientPool(factory, **kwargs), built
+
+
+def test_llm_pool_shares_one_client_per_peer_model_and_temperature():
+    pool, built = counting_pool()
+    client = pool.get("http://10.0.0.2:11434", "llama3.2:1b", 0.2, "gpu-1")
+
+    assert pool.get("http://10.0.0.2:11434", "llama3.2:1b", 0.2, "gpu-1") is client
+    assert pool.get("http://10.0.0.2:11434", "llama3.2:1b", 0.7, "gpu-1") is not client
+    assert pool.get("http://10.0.0.3:11434", "llama3.2:1b", 0.2, "gpu-2") is not client
+    assert len(built) == 3
+
+
+def test_llm_pool_drops_idle_and_least_recently_used_clients(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.distributed_router.time", SimpleNamespace(monotonic=lambda: clock[0]))
+    pool, built = counting_pool(idle_ttl=30, max_size=2)
+
+    first = pool.get("http://a", "llama3.2:1b", 0.2, "a")
+    pool.get("http://b", "llama3.2:1b", 0.2, "b")
+    assert pool.get("http://a", "llama3.2:1b", 0.2, "a") is first
+    # Pool is full: "b" is the least recently used client and makes room for "c"
+    pool.get("http://c", "llama3.2:1b", 0.2, "c")
+    assert [key[0] for key in pool.clients] == ["http://a", "http://c"]
+
+    clock[0] += 31
+    assert pool.get("http://a", "llama3.2:1b", 0.2, "a") is not first
+    assert [key[0] for key in pool.clients] == ["http://a"]
+    assert len(built) == 4
@@ -0,0 +1,23 @@
+# tests/test_job_queue.py
+import job_queue
+from job_queue import JOB_QUEUED, JOB_RUNNING, JOB_SUCCEEDED, JobStore
+
+
+def test_worker_that_lost_its_job_cannot_finish_it(tmp_path, monkeypatch):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    job_id = store.submit({"inputs": {"topic": "lease"}})
+    assert store.claim_next("host:1:0")["id"] == job_id
+
+    # The first worker stalls past its lease; the job is requeued and claimed by another worker
+    monkeypatch.setattr(job_queue, "JOB_LEASE_SECONDS", -1)
+    assert store.requeue_expired() == 1
+    assert store.get(job_id)["status"] == JOB_QUEUED
+    assert store.claim_next("host:2:0")["id"] == job_id
+
+    assert not store.finish(job_id, "host:1:0", JOB_SUCCEEDED, result={"stale": True})
+    assert store.get(job_id)["status"] == JOB_RUNNING
+
+    assert store.finish(job_id, "host:2:0", JOB_SUCCEEDED, result={"stale": False})
+    job = store.get(job_id)
+    assert (job["status"], job["result"]) == (JOB_SUCCEEDED, {"stale": False})
+    assert [event["type"] for event in store.events_since(job_id)].count(JOB_SUCCEEDED) == 1
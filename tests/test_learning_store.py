@@ -0,0 +1,116 @@
+# tests/test_learning_store.py
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import learning.feedback_loop as feedback_loop_module
+from learning.event_store import LearningEventStore
+from learning.feedback_loop import FeedbackLoop
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def outcome(model="llama3.2:1b", success=True):
+    return {"model": model, "peer": "local-node", "category": "coding", "success": success,
+            "execution_time": 1.5, "tokens": 10, "learning_tokens": 1}
+
+
+def test_reset_keeps_the_store_usable_for_processes_that_have_it_open(tmp_path):
+    path = tmp_path / "learning.db"
+    admin, worker = LearningEventStore(str(path)), LearningEventStore(str(path))
+    worker.append_many([outcome(), outcome(success=False)])
+
+    admin.backup(tmp_path / "learning.db.bak")
+    assert admin.reset() == 2
+    admin.close()
+
+    assert worker.count() == 0 and worker.stats() == []
+    worker.append_many([outcome()])
+    assert worker.count() == 1
+    backup = sqlite3.connect(str(tmp_path / "learning.db.bak"))
+    assert backup.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 2
+
+
+def test_pending_outcomes_stay_bounded_while_the_store_is_down(tmp_path, monkeypatch):
+    monkeypatch.setattr(feedback_loop_module, "LEARNING_MAX_PENDING", 5)
+    loop = FeedbackLoop(db_path=str(tmp_path / "learning.db"))
+    loop.metrics_file = tmp_path / "learning_metrics.json"
+
+    def locked(events):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(loop.store, "append_many", locked)
+    for i in range(8):
+        loop.record_task({"task_id": str(i), "model_used": "llama3.2:1b", "category": "coding",
+                          "success": True, "start_time": 0, "end_time": 1})
+    loop.flush()
+
+    assert len(loop.pending) == 5
+    assert loop.dropped == 3
+
+
+def stats_by_key(store):
+    return {(row["scope"], row["name"], row["model"]): row for row in store.stats()}
+
+
+def test_append_many_keeps_aggregates_per_scope_across_writers(tmp_path):
+    path = str(tmp_path / "learning.db")
+    first, second = LearningEventStore(path), LearningEventStore(path)
+    assert first.append_many([]) is None
+
+    first_id = first.append_many([outcome(), outcome(success=False)])
+    last_id = second.append_many([outcome(model="codellama:7b")])
+    assert last_id == first_id + 1 == first.last_id()
+    assert [event["model"] for _, event in first.since(first_id - 1)] == ["llama3.2:1b", "codellama:7b"]
+
+    stats = stats_by_key(second)
+    llama = stats[("model", "llama3.2:1b", "")]
+    assert (llama["tasks"], llama["successes"], llama["failures"], llama["total_tokens"]) == (2, 1, 1, 20)
+    assert llama["total_time"] == 3.0
+    assert stats[("peer", "local-node", "")]["tasks"] == 3
+    assert stats[("category", "coding", "")]["successes"] == 2
+    assert stats[("category_model", "coding", "codellama:7b")]["tasks"] == 1
+
+
+def test_aggregates_are_rebuilt_for_logs_without_them(tmp_path):
+    path = str(tmp_path / "learning.db")
+    store = LearningEventStore(path)
+    store.append_many([outcome(), outcome(), outcome(model="codellama:7b", success=False)])
+    expected = stats_by_key(store)
+    store.db.execute("DELETE FROM stats")
+    store.close()
+
+    assert stats_by_key(LearningEventStore(path)) == expected
+
+
+CHILD_PROCESS = """
+from learning.feedback_loop import feedback_loop
+for model in ("codellama:7b", "codellama:7b", "llama3.2:1b"):
+    feedback_loop.record_task({"task_id": "child", "model_used": model, "peer_used": "gpu-1",
+                               "category": "coding", "success": True, "start_time": 0, "end_time": 20})
+feedback_loop.flush()
+"""
+
+
+def test_snapshot_picks_up_outcomes_recorded_by_another_process(tmp_path, monkeypatch):
+    path = tmp_path / "learning.db"
+    loop = FeedbackLoop(db_path=str(path))
+    loop.metrics_file = tmp_path / "learning_metrics.json"
+    loop.record_task({"task_id": "parent", "model_used": "llama3.2:1b", "peer_used": "local-node",
+                      "category": "coding", "success": False, "start_time": 0, "end_time": 20})
+    loop.flush()
+    assert loop.get_model_preference("coding") == "llama3.2:1b"
+
+    env = {**os.environ, "ZEROAI_LEARNING_DB": str(path),
+           "PYTHONPATH": os.pathsep.join([str(ROOT_DIR / "src"), str(ROOT_DIR)])}
+    subprocess.run([sys.executable, "-c", CHILD_PROCESS], cwd=tmp_path, env=env, check=True, timeout=120)
+
+    # Nothing was recorded here since, so this flush only reloads the snapshot
+    monkeypatch.setattr(feedback_loop_module, "LEARNING_REFRESH_INTERVAL", 0)
+    loop.flush()
+
+    assert loop.get_model_preferences("coding") == ["codellama:7b", "llama3.2:1b"]
+    assert loop.metrics["peers"]["gpu-1"]["tasks"] == 3 and loop.outcome_count == 4
+    assert [outcome["task_id"] for outcome in loop.recent_outcomes()] == ["parent", "child", "child", "child"]
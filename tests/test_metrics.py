@@ -0,0 +1,63 @@
+# tests/test_metrics.py
+import os
+
+import pytest
+
+from metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(worker_label=False)
+    requests = registry.counter("zeroai_requests", "Handled requests", ["path"])
+    queue_depth = registry.gauge("zeroai_queue_depth", 'Jobs "waiting"\nin the queue')
+    latency = registry.histogram("zeroai_latency_seconds", "Latency", buckets=(0.1, 1))
+
+    requests.inc(path="/run_crew")
+    requests.inc(2, path='/odd"path')
+    queue_depth.set(3)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.render() == "\n".join([
+        "# HELP zeroai_latency_seconds Latency",
+        "# TYPE zeroai_latency_seconds histogram",
+        'zeroai_latency_seconds_bucket{le="0.1"} 1',
+        'zeroai_latency_seconds_bucket{le="1"} 2',
+        'zeroai_latency_seconds_bucket{le="+Inf"} 3',
+        "zeroai_latency_seconds_sum 5.55",
+        "zeroai_latency_seconds_count 3",
+        '# HELP zeroai_queue_depth Jobs \\"waiting\\"\\nin the queue',
+        "# TYPE zeroai_queue_depth gauge",
+        "zeroai_queue_depth 3",
+        "# HELP zeroai_requests Handled requests",
+        "# TYPE zeroai_requests counter",
+        'zeroai_requests_total{path="/run_crew"} 1',
+        'zeroai_requests_total{path="/odd\\"path"} 2',
+    ]) + "\n"
+
+
+def test_worker_label_and_scrape_time_gauges():
+    registry = MetricsRegistry(worker_label=True)
+    tiers = registry.gauge("zeroai_cache_bytes", "Cache bytes", ["tier"])
+    tiers.set_function(lambda: {("memory",): 1024, ("disk",): 2.5})
+    broken = registry.gauge("zeroai_broken", "Raises at scrape time")
+    broken.set_function(lambda: 1 / 0)
+
+    lines = registry.render().splitlines()
+    worker = f'worker="{os.getpid()}"'
+    assert f'zeroai_cache_bytes{{{worker},tier="memory"}} 1024' in lines
+    assert f'zeroai_cache_bytes{{{worker},tier="disk"}} 2.5' in lines
+    assert not [line for line in lines if line.startswith("zeroai_broken")]
+
+
+def test_registration_returns_the_existing_metric():
+    registry = MetricsRegistry()
+    counter = registry.counter("zeroai_events", "Events", ["event"])
+    assert registry.counter("zeroai_events", "Events", ["event"]) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("zeroai_events", "Events")
+    with pytest.raises(ValueError):
+        counter.inc(event="hit", extra="label")
+    with pytest.raises(ValueError):
+        counter.inc(-1, event="hit")
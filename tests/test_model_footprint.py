@@ -0,0 +1,27 @@
+# tests/test_model_footprint.py
+from threading import Event
+
+from model_footprint import ModelFootprintRegistry
+
+
+def test_residency_sweeps_are_coalesced():
+    registry = ModelFootprintRegistry()
+    started, release = Event(), Event()
+    sweeps = []
+
+    def refresh_residency(peers):
+        sweeps.append(peers)
+        started.set()
+        release.wait(5)
+
+    registry.refresh_residency = refresh_residency
+    registry.schedule_residency_refresh(["a"])
+    assert started.wait(5)
+    # While the first sweep runs, further snapshots collapse into one pending sweep with the latest peers
+    for peers in (["a", "b"], ["a", "b", "c"], ["c"]):
+        registry.schedule_residency_refresh(peers)
+    release.set()
+    registry.executor.shutdown(wait=True)
+
+    assert sweeps == [["a"], ["c"]]
+    assert not registry.sweep_scheduled
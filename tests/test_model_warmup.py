@@ -0,0 +1,44 @@
+# tests/test_model_warmup.py
+from threading import Event
+
+import model_warmup
+from model_warmup import ModelWarmer
+
+
+def make_warmer(tmp_path):
+    return ModelWarmer(router=None, model_preferences={}, footprints=None,
+                       lock_path=str(tmp_path / "warmup.lock"))
+
+
+def test_one_warmer_is_elected_per_host(tmp_path):
+    first, second = make_warmer(tmp_path), make_warmer(tmp_path)
+
+    assert first._try_elect()
+    assert not second._try_elect()
+
+    # Another worker takes over once the elected one exits
+    first._release()
+    assert second._try_elect()
+    second._release()
+
+
+def test_first_warm_up_failure_does_not_kill_the_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_warmup, "WARMUP_REFRESH_INTERVAL", 0.01)
+    warmer = make_warmer(tmp_path)
+    calls, warmed = [], Event()
+
+    def refresh_residency():
+        calls.append("refresh")
+        if len(calls) == 1:
+            raise ConnectionError("discovery not ready")
+
+    warmer.refresh_residency = refresh_residency
+    warmer.warm_up = warmed.set
+    warmer.start()
+    try:
+        assert warmed.wait(5)
+    finally:
+        warmer.stop()
+
+    assert calls[:2] == ["refresh", "refresh"]
+    assert not warmer.is_elected()
@@ -0,0 +1,46 @@
+# tests/test_peer_circuit_breaker.py
+import pytest
+
+import peer_discovery
+from peer_discovery import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, PeerCapabilities, PeerCircuitBreaker
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(peer_discovery, "PEER_BREAKER_THRESHOLD", 2)
+    monkeypatch.setattr(peer_discovery, "PEER_BREAKER_BASE_BACKOFF", 30.0)
+    monkeypatch.setattr(peer_discovery, "PEER_BREAKER_MAX_BACKOFF", 100.0)
+
+
+def test_breaker_opens_after_threshold_and_backs_off():
+    breaker = PeerCircuitBreaker()
+    breaker.record_failure(now=0)
+    assert breaker.state == CIRCUIT_CLOSED and breaker.allow_probe(1)
+
+    breaker.record_failure(now=10)
+    assert breaker.state == CIRCUIT_OPEN and breaker.next_probe_at == 40
+    assert not breaker.allow_probe(39)
+
+    # Once the backoff is over a single trial probe is allowed; failing it doubles the backoff
+    assert breaker.allow_probe(40) and breaker.state == CIRCUIT_HALF_OPEN
+    breaker.record_failure(now=40)
+    assert breaker.state == CIRCUIT_OPEN and breaker.next_probe_at == 100
+
+    assert breaker.allow_probe(100)
+    breaker.record_failure(now=100)
+    assert breaker.next_probe_at == 200, "backoff is capped at PEER_BREAKER_MAX_BACKOFF"
+
+
+def test_successful_trial_closes_the_circuit():
+    breaker = PeerCircuitBreaker()
+    breaker.record_failure(now=0)
+    breaker.record_failure(now=0)
+    assert breaker.allow_probe(30)
+
+    breaker.record_success()
+    assert (breaker.state, breaker.consecutive_failures, breaker.open_count) == (CIRCUIT_CLOSED, 0, 0)
+    breaker.record_failure(now=50)
+    assert breaker.state == CIRCUIT_CLOSED, "a closed circuit needs the full threshold to reopen"
+
+    capabilities = breaker.apply_to(PeerCapabilities(available=True))
+    assert (capabilities.circuit_state, capabilities.consecutive_failures) == (CIRCUIT_CLOSED, 1)
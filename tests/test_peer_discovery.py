@@ -0,0 +1,24 @@
+# tests/test_peer_discovery.py
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from peer_discovery_async import AsyncPeerProber
+
+
+def test_async_probe_gives_half_open_peers_a_single_trial():
+    prober = AsyncPeerProber(timeout=1, concurrency=4)
+    attempts = {}
+
+    async def unreachable(session, ip):
+        attempts[ip] = attempts.get(ip, 0) + 1
+        raise OSError("connection refused")
+
+    prober._probe_peer = unreachable
+    try:
+        results = prober.probe({"closed": "10.0.0.1", "half-open": "10.0.0.2"}, retries=3, trial={"half-open"})
+    finally:
+        prober.close()
+
+    assert attempts == {"10.0.0.1": 3, "10.0.0.2": 1}
+    assert results == {"closed": (None, None), "half-open": (None, None)}
@@ -0,0 +1,66 @@
+# tests/test_peer_discovery_refresh.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+import pytest
+
+import peer_discovery
+from peer_discovery import PeerCapabilities, PeerDiscovery, PeerNode
+
+
+@pytest.fixture
+def discovery(monkeypatch):
+    """A fresh PeerDiscovery (bypassing the singleton) whose discovery cycle blocks until released"""
+    instance = object.__new__(PeerDiscovery)
+    instance._initialized = False
+    instance.__init__()
+    instance.cycles = 0
+    instance.cycle_started, instance.release = Event(), Event()
+
+    def slow_cycle():
+        instance.cycles += 1
+        instance.cycle_started.set()
+        assert instance.release.wait(5)
+        with instance.peers_lock:
+            instance.peers = {"fresh": PeerNode("fresh", "10.0.0.3", PeerCapabilities())}
+            instance.cache_timestamp = time.time()
+
+    monkeypatch.setattr(instance, "_discovery_cycle", slow_cycle)
+    monkeypatch.setattr(peer_discovery, "PEER_CACHE_MODE", "swr")
+    instance.peers = {"stale": PeerNode("stale", "10.0.0.2", PeerCapabilities())}
+    instance.cache_timestamp = 0
+    yield instance
+    instance.release.set()
+    if instance.async_prober is not None:
+        instance.async_prober.close()
+
+
+def test_stale_snapshot_is_served_while_one_background_refresh_runs(discovery):
+    for _ in range(5):
+        assert [peer.name for peer in discovery.get_peers()] == ["stale"]
+    assert discovery.cycle_started.wait(5)
+    assert discovery.cycles == 1
+
+    discovery.release.set()
+    assert discovery.refresh_lock.acquire(timeout=5)
+    discovery.refresh_lock.release()
+    assert [peer.name for peer in discovery.get_peers()] == ["fresh"]
+    assert discovery.cycles == 1
+
+
+def test_waiting_callers_join_the_cycle_in_flight(discovery):
+    discovery.peers = {}
+    with ThreadPoolExecutor(4) as pool:
+        started = pool.submit(discovery.refresh, True)
+        assert discovery.cycle_started.wait(5)
+        joined = [pool.submit(discovery.refresh, True) for _ in range(3)]
+        cold = pool.submit(discovery.get_peers)
+        time.sleep(0.1)
+        assert not any(future.done() for future in joined + [cold])
+
+        discovery.release.set()
+        assert started.result(5) is True
+        assert [future.result(5) for future in joined] == [False, False, False]
+        assert [peer.name for peer in cold.result(5)] == ["fresh"]
+    assert discovery.cycles == 1
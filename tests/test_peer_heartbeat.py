@@ -0,0 +1,40 @@
+# tests/test_peer_heartbeat.py
+import pytest
+
+import peer_discovery
+from peer_discovery import PeerDiscovery
+
+
+@pytest.fixture
+def discovery(tmp_path, monkeypatch):
+    monkeypatch.setattr(peer_discovery, "PEERS_CONFIG_PATH", tmp_path / "peers.json")
+    monkeypatch.setattr(PeerDiscovery, "_instance", None)
+    monkeypatch.setattr(PeerDiscovery, "_initialized", False)
+    return PeerDiscovery()
+
+
+def test_keepalive_does_not_bump_snapshot_or_notify(discovery):
+    snapshots = []
+    discovery.snapshot_listeners.append(snapshots.append)
+    assert discovery.record_heartbeat("gpu-1", "10.0.0.2", {"models": ["llama3.2:1b"], "load_avg": 12.0}, full=True)
+    version = discovery.snapshot_version
+    snapshots.clear()
+
+    assert discovery.record_heartbeat("gpu-1", "10.0.0.2", {})
+    assert discovery.record_heartbeat("gpu-1", "10.0.0.2", {"load_avg": 12.0})
+
+    assert snapshots == []
+    assert discovery.snapshot_version == version
+    assert discovery._has_fresh_heartbeat("gpu-1", discovery.heartbeats["gpu-1"])
+
+
+def test_changed_field_notifies(discovery):
+    snapshots = []
+    discovery.snapshot_listeners.append(snapshots.append)
+    discovery.record_heartbeat("gpu-1", "10.0.0.2", {"models": ["llama3.2:1b"]}, full=True)
+    version = discovery.snapshot_version
+
+    assert discovery.record_heartbeat("gpu-1", "10.0.0.2", {"load_avg": 80.0})
+
+    assert discovery.snapshot_version == version + 1
+    assert snapshots[-1]["gpu-1"].capabilities.load_avg == 80.0
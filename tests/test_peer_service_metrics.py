@@ -0,0 +1,29 @@
+# tests/test_peer_service_metrics.py
+from types import SimpleNamespace
+
+import pytest
+
+flask = pytest.importorskip("flask")
+
+from peer_service_metrics import register_metrics_endpoint, timed_task
+
+
+def test_peer_service_exposes_node_and_task_metrics():
+    app = flask.Flask(__name__)
+    capabilities = SimpleNamespace(memory=12.5, gpu_memory=8.0, cpu_cores=16, load_avg=25.0,
+                                   models=["llama3.2:1b", "codellama:7b"], available=True)
+    register_metrics_endpoint(app, lambda: capabilities)
+
+    @app.route('/process_task', methods=['POST'])
+    @timed_task
+    def process_task():
+        return flask.jsonify({'success': True})
+
+    client = app.test_client()
+    client.post('/process_task', json={'type': 'research'})
+    body = client.get('/metrics').get_data(as_text=True)
+
+    node = [line for line in body.splitlines() if line.startswith("zeroai_peer_node{")]
+    tasks = [line for line in body.splitlines() if line.startswith("zeroai_peer_task_seconds_count{")]
+    assert any('resource="models"' in line and line.endswith(" 2") for line in node)
+    assert any('type="research",outcome="success"' in line and line.endswith(" 1") for line in tasks)
@@ -0,0 +1,50 @@
+# tests/test_peer_state_store.py
+import json
+import os
+
+import pytest
+
+from peer_state_store import PeerStateStore
+
+
+def peer(name="gpu-1", **fields):
+    return {"name": name, "ip": "10.0.0.2", "models": ["llama3.2:1b"], "load_avg": 31.0,
+            "memory_gb": 12.2, **fields}
+
+
+def test_jitter_does_not_rewrite_the_file(tmp_path):
+    store = PeerStateStore(tmp_path / "peers.json")
+    assert store.update([peer()])
+    written = (tmp_path / "peers.json").read_text()
+
+    assert not store.update([peer(load_avg=33.0, memory_gb=12.4)])
+    assert (tmp_path / "peers.json").read_text() == written
+
+    assert store.update([peer(models=["llama3.2:1b", "codellama:7b"])])
+    assert store.update([peer(), peer("gpu-2")])
+    assert not store.update([peer("gpu-2"), peer()])
+    assert [record["name"] for record in json.loads((tmp_path / "peers.json").read_text())["peers"]] == \
+        ["gpu-1", "gpu-2"]
+
+
+def test_failed_write_keeps_the_previous_file(tmp_path):
+    store = PeerStateStore(tmp_path / "peers.json")
+    store.update([peer()])
+    written = (tmp_path / "peers.json").read_text()
+
+    with pytest.raises(TypeError):
+        store.update([peer(owner=object())])
+
+    assert (tmp_path / "peers.json").read_text() == written
+    assert os.listdir(tmp_path) == ["peers.json"]
+
+
+def test_external_edits_are_picked_up(tmp_path):
+    path = tmp_path / "peers.json"
+    store = PeerStateStore(path)
+    store.update([peer()])
+    assert [record["name"] for record in store.load()] == ["gpu-1"]
+
+    path.write_text(json.dumps({"peers": [peer("added-by-hand")]}))
+    os.utime(path, (1, 1))
+    assert [record["name"] for record in store.load()] == ["added-by-hand"]
@@ -0,0 +1,29 @@
+# tests/test_prompt_classifier.py
+import pytest
+
+from prompt_classifier import PromptClassifier
+
+
+@pytest.fixture
+def classifier():
+    return PromptClassifier(cache_size=0)
+
+
+@pytest.mark.parametrize("prompt", [
+    "Update the fixture data for the staging database",
+    "Send the customer a copy of the issued invoice",
+    "Who is the writer of this novel?",
+])
+def test_words_that_only_look_like_keywords_do_not_match(classifier, prompt):
+    assert "developer" not in classifier.scores(prompt)
+    assert "documentation" not in classifier.scores(prompt)
+
+
+@pytest.mark.parametrize("prompt, category", [
+    ("Fixing the login bugs in the checkout page", "developer"),
+    ("Open issues for the PHP service", "developer"),
+    ("Writing the documentation for the new endpoint", "documentation"),
+    ("Analyzed the results of the last release", "research"),
+])
+def test_plurals_and_listed_inflections_match(classifier, prompt, category):
+    assert classifier.classify(prompt) == category
@@ -0,0 +1,64 @@
+# tests/test_request_logging.py
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+import request_logging
+from request_logging import RequestLoggingMiddleware
+
+
+class RecordingBodyLog:
+    def __init__(self):
+        self.records = []
+
+    def write(self, record):
+        self.records.append(record)
+
+
+async def echo(request: Request):
+    return JSONResponse({"echo": (await request.body()).decode()})
+
+
+async def events(request: Request):
+    async def stream():
+        for token in ("hello", "world"):
+            yield f"data: {token}\n\n"
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def client_for(**kwargs):
+    app = Starlette(routes=[Route("/echo", echo, methods=["POST"]), Route("/events", events)])
+    return TestClient(RequestLoggingMiddleware(app, **kwargs))
+
+
+def test_responses_pass_through_unchanged():
+    client = client_for(sample_rate=0)
+    assert client.app.body_log is None
+
+    response = client.post("/echo", content=b"ping")
+    assert response.status_code == 200 and response.json() == {"echo": "ping"}
+
+    with client.stream("GET", "/events") as response:
+        assert "".join(response.iter_text()) == "data: hello\n\ndata: world\n\n"
+    assert client.get("/missing").status_code == 404
+
+
+def test_sampled_bodies_are_captured_up_to_the_limit(monkeypatch):
+    body_log = RecordingBodyLog()
+    client = client_for(sample_rate=0.5, max_body_bytes=8, body_log=body_log)
+
+    monkeypatch.setattr(request_logging.random, "random", lambda: 0.9)
+    client.post("/echo", content=b"not sampled")
+    assert body_log.records == []
+
+    monkeypatch.setattr(request_logging.random, "random", lambda: 0.1)
+    assert client.post("/echo?lang=en", content=b"a longer request body").json() == {"echo": "a longer request body"}
+    client.get("/events")
+
+    assert len(body_log.records) == 1, "event streams are never captured"
+    record = body_log.records[0]
+    assert (record["path"], record["query"], record["status"]) == ("/echo", "lang=en", 200)
+    assert record["request_body"] == {"text": "a longer", "bytes_captured": 8, "truncated": True}
+    assert record["response_body"] == {"text": '{"echo":', "bytes_captured": 8, "truncated": True}
@@ -0,0 +1,37 @@
+# tests/test_routed_llm.py
+import threading
+
+from crewai import Agent, Crew, Task
+
+from inflight_tracker import InFlightTracker
+from routed_llm import RoutedLLM
+
+
+def one_task_crew(llm):
+    agent = Agent(role="Researcher", goal="Answer briefly", backstory="A terse assistant", llm=llm)
+    task = Task(description="Say hello", expected_output="A greeting", agent=agent)
+    return Crew(agents=[agent], tasks=[task])
+
+
+def test_crew_kickoff_counts_the_call_while_it_is_in_flight(fake_ollama):
+    tracker = InFlightTracker()
+    llm = RoutedLLM.build(tracker, "gpu-1", "llama3.2:1b", fake_ollama.url, 0.2)
+    crew = one_task_crew(llm)
+    fake_ollama.release.clear()
+    result = {}
+
+    kickoff = threading.Thread(target=lambda: result.setdefault("output", crew.kickoff()))
+    kickoff.start()
+    try:
+        assert fake_ollama.received.wait(30)
+        assert crew.agents[0].llm is llm
+        assert tracker.outstanding("gpu-1") == 1
+        assert tracker.active_models("gpu-1") == {"llama3.2:1b"}
+    finally:
+        fake_ollama.release.set()
+        kickoff.join(60)
+
+    assert "hello from the peer" in result["output"].raw
+    assert tracker.outstanding("gpu-1") == 0
+    assert tracker.latency_estimate("gpu-1", "llama3.2:1b") is not None
+    assert fake_ollama.generations[0]["model"] == "llama3.2:1b"
@@ -0,0 +1,58 @@
+# tests/test_semantic_cache.py
+import time
+
+import pytest
+import requests
+
+pytest.importorskip("numpy")
+
+from semantic_cache import HashingEmbedder, SemanticCache
+
+
+class UnreachableEmbedder:
+    def __init__(self, name="ollama:test"):
+        self.name = name
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        raise requests.exceptions.ConnectionError("connection refused")
+
+
+def test_failed_embedder_is_skipped_during_cooldown():
+    embedder = UnreachableEmbedder()
+    cache = SemanticCache(embedder=embedder, fallback=HashingEmbedder())
+
+    cache.add("research", "scope", "history of the printing press", "key-1")
+    match = cache.lookup("research", "scope", "the history of the printing press")
+
+    assert embedder.calls == 1
+    assert match is not None and match[0] == "key-1"
+
+    # Once the cooldown is over the primary embedder is tried again
+    cache.failed_until[embedder.name] = time.monotonic() - 1
+    cache.lookup("research", "scope", "printing press history")
+    assert embedder.calls == 2
+
+
+def test_lookup_is_skipped_when_no_embedder_is_available():
+    embedder = UnreachableEmbedder()
+    cache = SemanticCache(embedder=embedder, fallback=UnreachableEmbedder("hashing"))
+
+    assert cache.lookup("research", "scope", "history of the printing press") is None
+    assert cache.lookup("research", "scope", "history of the printing press") is None
+    assert embedder.calls == 1
+
+
+def test_least_recently_used_scopes_are_dropped_over_the_vector_budget():
+    cache = SemanticCache(embedder=HashingEmbedder(), fallback=None, max_vectors=128)
+
+    cache.add("research", "scope-a", "history of the printing press", "key-a")
+    cache.add("research", "scope-b", "history of the steam engine", "key-b")
+    # Using scope-a makes scope-b the least recently used index
+    assert cache.lookup("research", "scope-a", "history of the printing press")[0] == "key-a"
+    cache.add("research", "scope-c", "history of the telegraph", "key-c")
+
+    assert [scope for _, _, scope in cache.indexes] == ["scope-a", "scope-c"]
+    assert cache.total_rows == sum(index.rows for index in cache.indexes.values()) <= 128
+    assert cache.lookup("research", "scope-b", "history of the steam engine") is None
@@ -0,0 +1,32 @@
+# tests/test_single_flight.py
+from concurrent.futures import Future
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_followers_share_the_leaders_future_until_it_settles():
+    flight = SingleFlight()
+    started = Future()
+
+    leader, leader_shared = flight.submit("key", lambda: started)
+    follower, follower_shared = flight.submit("key", lambda: pytest.fail("second run started"))
+
+    assert (leader_shared, follower_shared) == (False, True)
+    assert follower is leader and not leader.done()
+
+    started.set_result("answer")
+    assert leader.result() == "answer"
+    assert flight.in_flight() == 0
+
+
+def test_a_failed_start_releases_the_key():
+    flight = SingleFlight()
+
+    def saturated():
+        raise RuntimeError("pool full")
+
+    with pytest.raises(RuntimeError):
+        flight.submit("key", saturated)
+    assert flight.do("key", lambda: "ran") == ("ran", False)